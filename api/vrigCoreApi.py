@@ -5,9 +5,15 @@ from functools import partial
 
 from validateRig import insideDCC as vr_insideDCC
 from validateRig.const import serialization as c_serialization
+from validateRig.const import constants as c_constants
+from validateRig.core import backend as c_backend
 from validateRig.core import validator as c_validator
 from validateRig.core import nodes as c_nodes
 from validateRig.core import parser as c_parser
+from validateRig.core import loader as c_loader
+from validateRig.core import delta as c_delta
+from validateRig.core import offsetIndex as c_offsetIndex
+from validateRig.core import store as c_store
 from validateRig.core import factory as c_factory
 from validateRig.core.nodes import SourceNode, DefaultValueNode, ConnectionValidityNode
 from validateRig.uiElements.dialogs import (
@@ -46,17 +52,126 @@ def createConnectionValidityNode(name, longName):
     return node
 
 
-def saveValidatorsToFile(validators, filepath):
-    # type: (list, str) -> bool
+def saveValidatorsToFile(validators, filepath, sortKeys=True, index=False):
+    # type: (list, str, bool, bool) -> bool
+    """
+    :param sortKeys: sort the json keys, pass False for large saves
+    :param index: also save an offset index next to the file for readSourceNodeData
+    """
     validatorDataList = list()
     for eachValidator in validators:
         validatorDataList.append(eachValidator.toData())
 
-    c_parser.write(filepath=filepath, data=validatorDataList)
+    c_parser.write(filepath=filepath, data=validatorDataList, sortKeys=sortKeys)
+    if index:
+        c_offsetIndex.writeIndex(filepath)
 
     return filepath
 
 
+def saveValidatorsAsDelta(validators, filepath, basePath, sortKeys=True):
+    # type: (list, str, str, bool) -> str
+    """
+    Saves the validators as a patch against a previously saved file, see core.delta. loadValidatorsFromFiles
+    applies it again.
+
+    :param filepath: the delta file, named with c_constants.DELTA_EXT before the codec extension,
+        eg: rig_v002.vdelta.json
+    :param basePath: the validator file the delta is against, it needs to stay next to the delta at the same
+        relative path
+    """
+    if not c_delta.isDeltaFile(filepath):
+        raise ValueError("%s isn't named as a delta file, eg: rig%s.json" % (filepath, c_constants.DELTA_EXT))
+
+    validatorDataList = [eachValidator.toData() for eachValidator in validators]
+    c_delta.write(filepath, basePath, validatorDataList, sortKeys=sortKeys)
+
+    return filepath
+
+
+def loadValidatorsFromFiles(paths, workers=c_constants.LOAD_WORKERS, lazy=False):
+    # type: (list[str], int, bool) -> list[c_validator.Validator]
+    """
+    Loads the validators of many files on a pool of worker threads.
+
+    :param paths: session saves or single validator files, any supported format, or delta files
+    :param workers: number of files loaded at once
+    :param lazy: only read the headers, the sourceNodes are hydrated on first use. See LazyValidator
+    :return: the validators of every file, in the order of paths
+    """
+    return c_loader.loadFiles(paths, workers=workers, lazy=lazy)
+
+
+def readSourceNodeData(filepath, longName, validatorName=None):
+    # type: (str, str, str) -> dict
+    """
+    Reads a single sourceNode's data from a validator file without loading the rest, using its offset index.
+
+    :param longName: the sourceNode's longName as saved
+    :param validatorName: the validator to look in, defaults to the first one having the sourceNode
+    :return: SourceNode.toData(), None if it isn't in the file
+    """
+    return c_offsetIndex.readSourceNodeData(filepath, longName, validatorName=validatorName)
+
+
+def importFilesToStore(paths, storePath):
+    # type: (list[str], str) -> list[int]
+    """
+    Imports the validators of the files into a sqlite validator store, replacing those previously imported from
+    the same files. See core.store
+
+    :param storePath: the store's database file, created if it doesn't exist
+    :return: the ids of the imported validators
+    """
+    with c_store.ValidatorStore(storePath) as store:
+        validatorIds = list()
+        for eachPath in paths:
+            validatorIds.extend(store.importFile(eachPath))
+
+    return validatorIds
+
+
+def querySourceNodes(
+    storePath, validatorName=None, nameSpace=None, longName=None, name=None, attrName=None, nodeType=None
+):
+    # type: (str, str, str, str, str, str, int) -> list[SourceNode]
+    """
+    Finds sourceNodes across every validator of a store, eg: which sourceNodes check rotateOrder on *_ctrl nodes
+        querySourceNodes(storePath, attrName="rotateOrder", longName="*_ctrl")
+    Only the matching sourceNodes are hydrated.
+
+    :param validatorName: the validator's name
+    :param nameSpace: the validator's nameSpace
+    :param longName: the sourceNode's longName
+    :param name: the sourceNode's short name
+    :param attrName: an attribute one of the sourceNode's validityNodes checks
+    :param nodeType: the nodeType of one of the sourceNode's validityNodes, eg: c_serialization.NT_DEFAULTVALUE
+    :return: the matching sourceNodes. Strings match exactly, or as a glob pattern if they have any of *?[
+    """
+    with c_store.ValidatorStore(storePath) as store:
+        return store.querySourceNodes(
+            validatorName=validatorName,
+            nameSpace=nameSpace,
+            longName=longName,
+            name=name,
+            attrName=attrName,
+            nodeType=nodeType,
+        )
+
+
+def getPlugCacheStats():
+    # type: () -> dict
+    """
+    :return: the hit / miss counters and size of the DCC backend's plug cache, see core.plugCache.
+        None outside of any DCC
+    """
+    backend = c_backend.getBackend()
+    if backend is None:
+        return None
+
+    return backend.plugCache.stats()
+
+
 def updateNodeValuesFromDCC(node):
     # type: (c_nodes.Node) -> bool
     nodeType = node.nodeType
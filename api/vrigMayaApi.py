@@ -5,6 +5,7 @@ from validateRig.api.vrigCoreApi import *
 from validateRig.const import constants as vrconst_constants
 from validateRig.core.maya import plugs as vrcm_plugs
 from validateRig.core.maya import utils as vrcm_utils
+from validateRig.core.strings import StringPool
 
 logger = logging.getLogger(__name__)
 reload(vrcm_utils)
@@ -22,6 +23,7 @@ import validateRig.core.maya.utils as vr_vrcm_utils
 #########################################################################################
 sourceNodes = list()
 crvs = [cmds.listRelatives(crv, p=True, f=True)[0] for crv in cmds.ls(type="nurbsCurve")]
+validator = vr_maya_api.createValidator("testRig")
 for eachCurve in crvs:
     attributes = ["translate", "rotate", "scale", "rotateOrder"]
     ud = cmds.listAttr(eachCurve, ud=True)
@@ -30,10 +32,10 @@ for eachCurve in crvs:
 
     srcNode = vr_maya_api.asSourceNode(nodeLongName=eachCurve, 
                                        attributes=attributes, 
-                                       connections=True)
+                                       connections=True,
+                                       stringPool=validator.stringPool)
     sourceNodes.append(srcNode)
 
-validator = vr_maya_api.createValidator("testRig")
 validator.nameSpace = vr_vrcm_utils.getNamespaceFromLongName(crvs[0])
 validator.addSourceNodes(sourceNodes, True)
 validator.to_fileJSON(filePath="C:/Temp/testMayaValidator.json")
@@ -41,15 +43,23 @@ validator.to_fileJSON(filePath="C:/Temp/testMayaValidator.json")
 """
 
 
-def asSourceNode(nodeLongName, attributes=None, connections=False):
-    # type: (str, list[str], bool, bool) -> SourceNode
+def asSourceNode(nodeLongName, attributes=None, connections=False, stringPool=None):
+    # type: (str, list[str], bool, StringPool) -> SourceNode
+    """
+    Args:
+        stringPool: pass validator.stringPool so the captured names are shared with the rest of the validator
+    """
+    if stringPool is None:
+        stringPool = StringPool()
+    nodeLongName = stringPool.intern(nodeLongName)
+
     logger.debug("###################")
     logger.debug("%s as sourceNode." % nodeLongName)
     validityNodes = list()
     connAttrNames = list()
     if connections:
         logger.debug("connections: %s" % connections)
-        connNodes = list(__createConnectionNodes(nodeLongName))
+        connNodes = list(__createConnectionNodes(nodeLongName, stringPool))
         validityNodes += connNodes
         connAttrNames = [n.connectionData.get("srcData")["attrName"] for n in connNodes]
     logger.debug("validityNodes: %s" % validityNodes)
@@ -63,11 +73,11 @@ def asSourceNode(nodeLongName, attributes=None, connections=False):
                 validDefaultValueAttributes.append(eachAttrName)
     logger.debug("Creating dvNodes for: %s" % validDefaultValueAttributes)
 
-    defaultNodes = list(__createDefaultValueNodes(nodeLongName, validDefaultValueAttributes))
+    defaultNodes = list(__createDefaultValueNodes(nodeLongName, validDefaultValueAttributes, stringPool))
     validityNodes += defaultNodes
 
     # Now the sourceNodes
-    shortName = vrcm_utils.cleanMayaLongName(nodeLongName)
+    shortName = stringPool.intern(vrcm_utils.cleanMayaLongName(nodeLongName))
     sourceNode = createSourceNode(name=shortName, longName=nodeLongName, validityNodes=validityNodes)
     logger.debug("shortName: %s" % shortName)
     logger.debug("sourceNode: %s" % sourceNode)
@@ -75,17 +85,18 @@ def asSourceNode(nodeLongName, attributes=None, connections=False):
     logger.debug("nameSpace: %s" % nameSpace)
     if nameSpace:
         nsShortName = "{}:{}".format(nameSpace, shortName)
-        sourceNode.displayName = nsShortName
+        sourceNode.displayName = stringPool.intern(nsShortName)
 
     return sourceNode
 
 
-def __createDefaultValueNodes(nodeLongName, defaultAttributes):
-    # type: (str, list[str]) -> DefaultValueNode
+def __createDefaultValueNodes(nodeLongName, defaultAttributes, stringPool):
+    # type: (str, list[str], StringPool) -> DefaultValueNode
     for eachAttr in defaultAttributes:
         if eachAttr in vrconst_constants.MAYA_DEFAULTVALUEATTRIBUTE_IGNORES:
             continue
 
+        eachAttr = stringPool.intern(eachAttr)
         dvMPlug = vrcm_plugs.getMPlugFromLongName(nodeLongName, eachAttr)
         dvMPlugValue = vrcm_plugs.getMPlugValue(dvMPlug)
         attrData = {eachAttr: dvMPlugValue}
@@ -96,13 +107,15 @@ def __createDefaultValueNodes(nodeLongName, defaultAttributes):
         yield defaultValueNode
 
 
-def __createConnectionNodes(nodeLongName):
-    # type: (str) -> ConnectionValidityNode
+def __createConnectionNodes(nodeLongName, stringPool):
+    # type: (str, StringPool) -> ConnectionValidityNode
 
     # We list only the destinations of these attributes.
     for destNodeName, destLongName, connectionData in vrcm_utils.createConnectionData(nodeLongName):
-        connectionNode = createConnectionValidityNode(name=destNodeName, longName=destLongName)
-        connectionNode.connectionData = connectionData
+        connectionNode = createConnectionValidityNode(
+            name=stringPool.intern(destNodeName), longName=stringPool.intern(destLongName)
+        )
+        connectionNode.connectionData = stringPool.internConnectionData(connectionData)
         logger.debug("ConnectionNode created successfully.")
         logger.debug("destNodeName: %s" % destNodeName)
         logger.debug("destLongName: %s" % destLongName)
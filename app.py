@@ -2,6 +2,7 @@
 import sys
 import os
 import logging
+from functools import partial
 from PySide2 import QtWidgets, QtCore
 
 from validateRig.const import constants as vrconst_constants
@@ -9,7 +10,10 @@ from validateRig.const import serialization as vrconst_serialization
 from validateRig.core import factory as vrc_factory
 from validateRig.core import validator as vrc_validator
 from validateRig.core import parser as vrc_parser
+from validateRig.core import delta as vrc_delta
+from validateRig.core import offsetIndex as vrc_offsetIndex
 
+from validateRig.uiElements import fileLoader as vruie_fileLoader
 from validateRig.uiElements.themes import factory as vruieth_factory
 from validateRig.const import constants as vrconst_constants
 from validateRig.uiElements.trees import validationTreeWidget as vruiet_validationTreeWidget
@@ -38,6 +42,11 @@ class ValidationUI(QtWidgets.QMainWindow):
 
         self._validators = [] # list of tuples of validators and widgets (Validator, QTreeWidget)
 
+        # Files are parsed and hydrated on this pool, see __loadFiles
+        self._loadPool = QtCore.QThreadPool(self)
+        self._loadPool.setMaxThreadCount(vrconst_constants.LOAD_WORKERS)
+        self._fileLoaderSignals = set()
+
         # MAIN MENU
         self.appMenu = QtWidgets.QMenuBar()
         self.newButton = self.appMenu.addAction("New")
@@ -61,6 +70,7 @@ class ValidationUI(QtWidgets.QMainWindow):
 
         self.groupBoxesLayout = QtWidgets.QTabWidget()
         self.groupBoxesLayout.setObjectName("groupBoxLayout")
+        self.groupBoxesLayout.currentChanged.connect(self.__populateTab)
 
         # Buttons
         treeButtons = QtWidgets.QHBoxLayout()
@@ -139,6 +149,8 @@ class ValidationUI(QtWidgets.QMainWindow):
         treeWidgets = list(self.__iterTreeWidgets())
 
         for eachValidationTreeWidget in treeWidgets:
+            if searchString:
+                eachValidationTreeWidget.populateAllChildItems()
             topLevelItems = list(eachValidationTreeWidget.iterTopLevelTreeWidgetItems())
 
             for treeWidgetItem in topLevelItems:
@@ -244,15 +256,9 @@ class ValidationUI(QtWidgets.QMainWindow):
     def __updateTreeWidgetDisplayNames(self):
         # Connected to via the signals from the validator if nameSpace or displayName change on the validator
         # in __addValidationPairFromData
+        # The items read the displayName from their node when painted, so a repaint is all that's needed.
         for eachValidationTreeWidget in self.__iterTreeWidgets():
-            topLevelItems = list(eachValidationTreeWidget.iterTopLevelTreeWidgetItems())
-            for treeWidgetItem in topLevelItems:
-                treeWidgetItem.updateDisplayName()
-
-                for x in range(treeWidgetItem.childCount()):
-                    child = treeWidgetItem.child(x)
-                    child.updateDisplayName()
-
+            eachValidationTreeWidget.viewport().update()
             eachValidationTreeWidget.resizeColumnToContents(
                 vrconst_constants.SRC_NODENAME_COLUMN
             )
@@ -297,9 +303,23 @@ class ValidationUI(QtWidgets.QMainWindow):
         for eachValidator, eachTreeWidget in self._validators:
             yield eachValidator, eachTreeWidget
 
+    def __populateTab(self, index):
+        # type: (int) -> None
+        """Validators loaded from headers are hydrated and get their tree items when their tab is first opened."""
+        groupBox = self.groupBoxesLayout.widget(index)
+        for _, treeWidget in self._validators:
+            if treeWidget.parent() is not groupBox or treeWidget.populated():
+                continue
+
+            treeWidget.populate()
+            if self.searchInput.text():
+                self.__filterTreeWidgetItems()
+
     def __toggleIsolateFailed(self, sender):
         treeWidgets = list(self.__iterTreeWidgets())
         for eachTWI in treeWidgets:
+            if sender:
+                eachTWI.populateAllChildItems()
             topLevelItems = list(eachTWI.iterTopLevelTreeWidgetItems())
             for treeWidgetItem in topLevelItems:
                 if not sender:
@@ -328,15 +348,39 @@ class ValidationUI(QtWidgets.QMainWindow):
         dialog = vruied_loadFromJSON.LoadFromJSONFileDialog(parent=None)
         dialog.setStyleSheet(self.sheet)
         if dialog.exec_():
-            for filepath in dialog.selectedFiles():
-                data = vrc_parser.read(filepath)
-                if (
-                    type(data) == list
-                ):  # We have a sessionSave from the UI of multiple validators
-                    for validationData in data:
-                        self.__addValidationPairFromData(validationData, expanded=True)
-                else:
-                    self.__addValidationPairFromData(data, expanded=True)
+            self.__loadFiles(dialog.selectedFiles())
+
+    def __loadFiles(self, filepaths):
+        # type: (list[str]) -> None
+        """
+        Parses and hydrates the files on the load pool, each file's validators get their tabs as it completes.
+        Handles both a sessionSave from the UI of multiple validators and a single validator.
+        """
+        for filepath in filepaths:
+            runnable = vruie_fileLoader.FileLoaderRunnable(filepath, self.thread())
+            signals = runnable.signals
+            signals.loaded.connect(partial(self.__addValidationPairsFromFile, signals=signals))
+            signals.failed.connect(partial(self.__fileLoadFailed, signals=signals))
+            # The runnable is deleted by the pool once it ran, hold onto its signals until they're delivered.
+            # Keyed by the signals themselves, the same file can be loading more than once.
+            self._fileLoaderSignals.add(signals)
+            self._loadPool.start(runnable)
+
+    def __addValidationPairsFromFile(self, filepath, validators, signals=None):
+        # type: (str, list[vrc_validator.Validator], vruie_fileLoader.FileLoaderSignals) -> None
+        self._fileLoaderSignals.discard(signals)
+        for eachValidator in validators:
+            if self.__findValidatorByName(eachValidator.name) is not None:
+                logger.warning("Validator named: `%s` already exists! Skipping!" % eachValidator.name)
+                continue
+
+            # The tree items are built when the tab is opened
+            self.__addValidationPair(eachValidator, expanded=True, populate=False)
+
+    def __fileLoadFailed(self, filepath, error, signals=None):
+        # type: (str, str, vruie_fileLoader.FileLoaderSignals) -> None
+        self._fileLoaderSignals.discard(signals)
+        logger.warning("Failed to load %s: %s" % (filepath, error))
 
     # UI QT Drag and Drop
     def dragEnterEvent(self, QDragEnterEvent):
@@ -345,21 +389,26 @@ class ValidationUI(QtWidgets.QMainWindow):
 
     def dropEvent(self, QDropEvent):
         super(ValidationUI, self).dropEvent(QDropEvent)
-        if QDropEvent.mimeData().text().endswith(".json"):
+        if vrc_parser.isSupported(QDropEvent.mimeData().text()):
             self.processJSONDrop(QDropEvent)
         return QDropEvent.accept()
 
     def processJSONDrop(self, sender):
-        data = vrc_parser.read(sender.mimeData().text().replace("file:///", ""))
-        self.__addValidationPairFromData(data)
+        filepath = sender.mimeData().text().replace("file:///", "")
+        if vrc_delta.isDeltaFile(filepath):
+            # Deltas are applied to their base as a whole, so they can't be opened from their headers
+            self.__loadFiles([filepath])
+            return
+
+        for header in vrc_parser.iterReadHeaders(filepath):
+            self.__addValidationPairFromData(header, filepath=filepath)
 
     # App Creators
-    def __createValidatorTreeWidgetPair(self, data):
-        # type: (dict) -> tuple
+    def __createValidatorTreeWidgetPair(self, validator, populate=True):
+        # type: (vrc_validator.Validator, bool) -> tuple
         """The (validator, treeWidget) tuple pair creator."""
 
-        validator = self.__createValidatorFromData(data)
-        treeWidget = self.__createValidationTreeWidget(validator=validator)
+        treeWidget = self.__createValidationTreeWidget(validator=validator, populate=populate)
         treeWidget.setStyleSheet(self.sheet)
 
         validatorpair = (validator, treeWidget)
@@ -372,8 +421,9 @@ class ValidationUI(QtWidgets.QMainWindow):
 
         return validatorpair
 
-    def __createValidatorFromData(self, data):
-        # type: (dict) -> vrc_validator.Validator
+    def __createValidatorFromData(self, data, filepath=None):
+        # type: (dict, str) -> vrc_validator.Validator
+        """:param filepath: if supplied data is a header of parser.iterReadHeaders(filepath), see LazyValidator"""
 
         validatorName = data.get(vrconst_serialization.KEY_VALIDATOR_NAME)
         if self.__findValidatorByName(validatorName) is not None:
@@ -381,16 +431,19 @@ class ValidationUI(QtWidgets.QMainWindow):
             logger.warning(msg)
             raise Exception(msg)
 
+        if filepath is not None:
+            return vrc_factory.createLazyValidator(filepath=filepath, header=data)
+
         validator = vrc_factory.createValidator(
             name=data.get(vrconst_serialization.KEY_VALIDATOR_NAME, ""), data=data
         )
 
         return validator
 
-    def __createValidationTreeWidget(self, validator):
-        # type: (vrc_validator.Validator) -> vruiet_validationTreeWidget.ValidationTreeWidget
+    def __createValidationTreeWidget(self, validator, populate=True):
+        # type: (vrc_validator.Validator, bool) -> vruiet_validationTreeWidget.ValidationTreeWidget
         """Creates a treeView widget for the treeWidget/validator pair for adding source nodes to."""
-        treewidget = vruiett_factory.getValidationTreeWidget(validator, self)
+        treewidget = vruiett_factory.getValidationTreeWidget(validator, self, populate=populate)
         treewidget.remove.connect(self.__removeValidatorFromUI)
 
         return treewidget
@@ -409,14 +462,24 @@ class ValidationUI(QtWidgets.QMainWindow):
         self.__addValidationPairFromData(data=validatorData)
 
     # App Create from
-    def __addValidationPairFromData(self, data, expanded=False, depth=0):
-        # type: (dict, bool) -> None
+    def __addValidationPairFromData(self, data, expanded=False, depth=0, filepath=None):
+        # type: (dict, bool, int, str) -> None
         """
         Sets up a new validator/treeWidget pair from the validation data and connects the validator to the global RUN button
 
         :param data: Validation data
+        :param filepath: if supplied data is a validator header read from this file, see parser.iterReadHeaders
+        """
+        validator = self.__createValidatorFromData(data, filepath=filepath)
+        self.__addValidationPair(validator, expanded=expanded, depth=depth)
+
+    def __addValidationPair(self, validator, expanded=False, depth=0, populate=True):
+        # type: (vrc_validator.Validator, bool, int, bool) -> None
         """
-        validator, treeWidget = self.__createValidatorTreeWidgetPair(data)
+        :param validator: a validator that isn't in the UI yet
+        :param populate: build the tree items now, otherwise they're built when the validator's tab is opened
+        """
+        validator, treeWidget = self.__createValidatorTreeWidgetPair(validator, populate=populate)
 
         # Connect to main UI
         self.runButton.clicked.connect(validator.validateValidatorSourceNodes)
@@ -430,7 +493,7 @@ class ValidationUI(QtWidgets.QMainWindow):
 
         validator.displayNameChanged.connect(self.__updateTreeWidgetDisplayNames)
 
-        groupBoxName = data.get(vrconst_serialization.KEY_VALIDATOR_NAME, "None")
+        groupBoxName = validator.name or "None"
         self.__createValidationGroupBox(name=groupBoxName, treeWidget=treeWidget)
 
         if expanded:
@@ -468,11 +531,18 @@ class ValidationUI(QtWidgets.QMainWindow):
 
         return validatorDataList
 
-    def to_fileJSON(self, filepath):
-        # type: (str) -> bool
-        """:param filepath: output path to validation.json file"""
-        data = self.toData()
-        vrc_parser.write(filepath=filepath, data=data)
+    def to_fileJSON(self, filepath, index=False):
+        # type: (str, bool) -> bool
+        """
+        :param filepath: output path to validation.json file
+        :param index: also save an offset index next to the file, see offsetIndex. It rescans the file just saved,
+            readSourceNodeData builds it on first use otherwise
+        """
+        # One validator's data at a time is handed to the writer, session saves are large so skip sorting the keys.
+        data = (eachValidator.toData() for eachValidator, _ in self._validators)
+        vrc_parser.write(filepath=filepath, data=data, sortKeys=False)
+        if index:
+            vrc_offsetIndex.writeIndex(filepath)
 
         return True
 
@@ -487,14 +557,10 @@ class ValidationUI(QtWidgets.QMainWindow):
         if not os.path.isfile(filepath):
             raise RuntimeError("%s is not valid!" % filepath)
 
-        previousValidatorAppData = vrc_parser.read(filepath)
-
-        # Handle loading from either a previously saved sessionList or a Validator.toData()
-        if type(previousValidatorAppData) != list:
-            previousValidatorAppData = [previousValidatorAppData]
-
-        for eachValidatiorData in previousValidatorAppData:
-            inst.__addValidationPairFromData(data=eachValidatiorData, expanded=expanded)
+        # Handles loading from either a previously saved sessionList or a Validator.toData(), the validators are
+        # hydrated as their tabs are opened.
+        for eachHeader in vrc_parser.iterReadHeaders(filepath):
+            inst.__addValidationPairFromData(data=eachHeader, expanded=expanded, filepath=filepath)
 
         return inst
 
@@ -13,6 +13,18 @@ if vr_insideDCC.insideMaya():
                                         ]
 
 JSON_EXT = ".json"
+BINARY_EXT = ".vrig"
+GZIP_EXT = ".gz"
+ZLIB_EXT = ".zlib"
+INDEX_EXT = ".idx"
+DELTA_EXT = ".vdelta"  # goes before the codec extension, eg: rig_v002.vdelta.json
+LOAD_WORKERS = 4  # threads loading files in parallel, see core.loader
+CACHE_EXT = ".vcache"
+CACHE_MAX_MB = 512  # default size of the local cache of parsed files, see core.cache
+PAGES_EXT = ".vrpages"
+PAGE_BATCH_SIZE = 500  # pages read / looked up per query, see core.pageStore
+PAGED_CACHE_SIZE = 10000  # sourceNodes a PagedValidator keeps hydrated
+PLUG_CACHE_SIZE = 200000  # resolved plugs a validation backend keeps between runs, see core.plugCache
 UINAME = "Validate Rig:"
 
 DEFAULT_REPORTSTATUS = "--"
@@ -27,6 +39,16 @@ NODE_VALIDATION_PASSED = "Passed"
 NODE_VALIDATION_FAILED = "Failed"
 NODE_VALIDATION_MISSINGSRC = "MISSING SRC NODE"
 NODE_VALIDATION_MISSINGDEST = "MISSING DEST NODE"
+NODE_VALIDATION_FAILURES = (
+    NODE_VALIDATION_FAILED,
+    NODE_VALIDATION_MISSINGSRC,
+    NODE_VALIDATION_MISSINGDEST,
+)
+
+# How a validator derives the displayName of its nodes
+DISPLAYNAME_STORED = 0  # whatever the node's displayName was set to
+DISPLAYNAME_LONGNAME = 1
+DISPLAYNAME_NAMESPACESHORTNAME = 2
 
 TOTALHEADERCOUNT = 8
 SRC_NODENAME_COLUMN = 0
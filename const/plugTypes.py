@@ -0,0 +1,13 @@
+#  Copyright (c) 2020.  James Dunlop
+# Plug types returned by Backend.plugType, see core/backend.py
+MESSAGE = 10
+FLOAT = 20
+INT = 30
+SHORT = 40
+DOUBLE = 50
+MATRIXF44 = 60
+BOOL = 70
+STRING = 80
+
+# Plug types whose values aren't compared when validating connections
+GETATTR_IGNORESTYPES = (MESSAGE, MATRIXF44)
@@ -11,6 +11,10 @@ KEY_NODETYPE = "nT"
 # Connection node
 KEY_CONNDATA = "cND"
 
+# Schema, bump SCHEMA_VERSION along with a migration in core/migrations.py when the layout changes
+SCHEMA_VERSION = 1
+KEY_VALIDATOR_SCHEMAVERSION = "vSV"
+
 # Validator
 KEY_VALIDATOR_NAME = "vN"
 KEY_VALIDATOR_NODES = "vNodes"
@@ -18,6 +22,24 @@ KEY_VALIDATORNAMESPACE = "vNS"
 KEY_VAILIDITYNODES = "vdn"
 KEY_DEFAULTVALUEDATA = "dvD"
 
+# Validator headers, see parser.iterReadHeaders. These are never written to disk.
+KEY_VALIDATOR_NODECOUNT = "vNodeCount"
+KEY_VALIDATOR_NODESOFFSET = "vNodesOffset"
+
+# Delta files, see core/delta.py
+DELTA_VERSION = 1
+KEY_DELTA_VERSION = "dV"
+KEY_DELTA_BASE = "dBase"
+KEY_DELTA_BASESIZE = "dBaseSize"
+KEY_DELTA_BASEHASH = "dBaseHash"  # sha1 of the base file's bytes
+KEY_DELTA_BASESTAMP = "dBaseStamp"  # [mtime, inode] of the base file, see parser.fileStamp
+KEY_DELTA_SESSION = "dSession"
+KEY_DELTA_VALIDATORS = "dValidators"
+KEY_DELTA_ADDED = "dAdded"
+KEY_DELTA_REMOVED = "dRemoved"
+KEY_DELTA_MODIFIED = "dModified"
+KEY_DELTA_ORDER = "dOrder"
+
 # Node types
 NT_VALIDATIONNODE = 0
 NT_SOURCENODE = 10
@@ -0,0 +1,80 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Crash safe file writes.
+
+atomicWrite hands out a temporary file next to the target. Once the caller is done it is flushed, fsynced and renamed
+over the target, so the target is either the previous save or the complete new one, never a half written file.
+The temporary file is in the target's directory so the rename never crosses a filesystem. It gets the target's
+permissions before the rename, or the umask's defaults for a new file, so a save doesn't leave a file shared on the
+filer readable only by whoever saved it.
+"""
+import contextlib
+import io
+import logging
+import os
+import stat
+import ctypes
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+_MOVEFILE_REPLACE_EXISTING = 0x1
+_MOVEFILE_WRITE_THROUGH = 0x8
+
+
+def _replace(src, dst):
+    # type: (str, str) -> None
+    replace = getattr(os, "replace", None)
+    if replace is not None:
+        replace(src, dst)
+        return
+
+    if os.name == "nt":
+        # python 2, rename won't overwrite on windows. MoveFileEx replaces the target in one step like os.replace.
+        flags = _MOVEFILE_REPLACE_EXISTING | _MOVEFILE_WRITE_THROUGH
+        if not ctypes.windll.kernel32.MoveFileExW(ctypes.c_wchar_p(src), ctypes.c_wchar_p(dst), flags):
+            raise ctypes.WinError()
+        return
+
+    os.rename(src, dst)
+
+
+def _copyMode(filepath, tempPath):
+    # type: (str, str) -> None
+    """Gives tempPath the permissions of filepath, mkstemp creates it owner only"""
+    try:
+        mode = stat.S_IMODE(os.stat(filepath).st_mode)
+    except OSError:
+        # A new file, the umask can only be read by setting it.
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    os.chmod(tempPath, mode)
+
+
+@contextlib.contextmanager
+def atomicWrite(filepath):
+    # type: (str) -> Generator[file]
+    """
+    Usage:
+        with atomicWrite(filepath) as f:
+            f.write(b"...")
+
+    Yields a binary file object. The target is only replaced if the block finishes without raising.
+    """
+    directory, fileName = os.path.split(os.path.abspath(filepath))
+    fd, tempPath = tempfile.mkstemp(prefix=".{}.".format(fileName), suffix=".tmp", dir=directory)
+    try:
+        with io.open(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+        _copyMode(filepath, tempPath)
+        _replace(tempPath, filepath)
+    except BaseException:
+        logger.debug("Discarding the partial write of %s" % filepath)
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
@@ -0,0 +1,183 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+The DCC the validation engine runs against, see core/validation.py.
+
+A Backend resolves nodes and plugs and reads / writes / connects them. Plugs are whatever handle the backend
+uses (an om2.MPlug in Maya), validation only passes them back to the backend and compares them with ==.
+A plug that can't be found on an existing node resolves to the backend's null plug (None unless documented
+otherwise), its plugType and plugValue are None.
+
+Resolved plugs are kept in the backend's plugCache between runs, see resolvePlug and core/plugCache.py. A backend
+invalidates the cached plugs of nodes that are deleted, renamed, reparented or re-namespaced.
+
+core/maya/backend.py wraps Maya, core/fakeScene.py is a pure python scene for running validation headless.
+"""
+import logging
+
+from validateRig import insideDCC as vr_insideDCC
+from validateRig.const import constants as vrconst_constants
+from validateRig.core import plugCache as vrc_plugCache
+
+logger = logging.getLogger(__name__)
+
+_backend = None  # See setBackend
+
+
+def plugPath(plugData):
+    # type: (list) -> tuple[str]
+    """:return: the path of the plug described by plugData, eg: ("cvs", "[0]", ".1"). See Backend.plugFromPlugData"""
+    path = list()
+    for isElement, isChild, plugName, index in reversed(plugData):
+        if not path:
+            path.append(plugName)
+
+        if isElement:
+            path.append("[%s]" % index)
+        elif isChild:
+            path.append(".%s" % index)
+
+    return tuple(path)
+
+
+class Backend(object):
+    def __init__(self, plugCacheSize=vrconst_constants.PLUG_CACHE_SIZE):
+        # type: (int) -> None
+        self._plugCache = vrc_plugCache.PlugCache(plugCacheSize)
+
+    @property
+    def plugCache(self):
+        # type: () -> vrc_plugCache.PlugCache
+        """The plugs resolvePlug resolved, with its hit / miss counters"""
+        return self._plugCache
+
+    def exists(self, nodeLongName):
+        # type: (str) -> bool
+        raise NotImplementedError
+
+    def findPlug(self, nodeLongName, plugName):
+        # type: (str, str) -> any
+        """:return: the plug plugName of the node. :raises RuntimeError: if the node doesn't exist"""
+        raise NotImplementedError
+
+    def plugFromPlugData(self, nodeLongName, plugData):
+        # type: (str, list) -> any
+        """
+        Args:
+            plugData: [[isElement, isChild, plugName, index], ...] from the plug up to its root plug, see
+                core.maya.plugs.fetchIndexedPlugData
+        :return: the element / child plug the plugData describes
+        """
+        raise NotImplementedError
+
+    def resolveNodes(self, nodeLongNames):
+        # type: (Iterable[str]) -> dict
+        """
+        Resolves many nodes in one pass, validation does so once per run for every node a validator checks.
+        The default handle is the longName itself, backends with a cheaper way to look plugs up than by name
+        return their own handle.
+
+        :return: {nodeLongName: node} of the nodes that exist, for nodePlug / nodePlugFromPlugData
+        """
+        return dict((eachLongName, eachLongName) for eachLongName in set(nodeLongNames) if self.exists(eachLongName))
+
+    def nodePlug(self, node, plugName):
+        # type: (any, str) -> any
+        """findPlug on a node from resolveNodes"""
+        return self.findPlug(node, plugName)
+
+    def nodePlugFromPlugData(self, node, plugData):
+        # type: (any, list) -> any
+        """plugFromPlugData on a node from resolveNodes"""
+        return self.plugFromPlugData(node, plugData)
+
+    def resolvePlug(self, nodeLongName, node, attrName, plugData=None):
+        # type: (str, any, str, list) -> any
+        """
+        Element / child plugs are resolved from their plugData, others by attrName. Found plugs are kept in the
+        plugCache, a null plug is looked up again next time.
+
+        Args:
+            nodeLongName: the node's longName, which the cached plug is keyed on
+            node: the node from resolveNodes
+        """
+        if plugData is not None and (plugData[0][0] or plugData[0][1]):
+            path = plugPath(plugData)
+        else:
+            if isinstance(attrName, list):
+                attrName = attrName[0]
+            plugData = None
+            path = (attrName,)
+
+        plug = self._plugCache.get(nodeLongName, path)
+        if plug is not None:
+            return plug
+
+        if plugData is None:
+            plug = self.nodePlug(node, attrName)
+        else:
+            plug = self.nodePlugFromPlugData(node, plugData)
+
+        if not self.isNullPlug(plug):
+            self._plugCache.put(nodeLongName, path, plug)
+
+        return plug
+
+    def isNullPlug(self, plug):
+        # type: (any) -> bool
+        return plug is None
+
+    def plugName(self, plug):
+        # type: (any) -> str
+        raise NotImplementedError
+
+    def plugType(self, plug):
+        # type: (any) -> int
+        """:return: one of const.plugTypes, a list of them for compound plugs"""
+        raise NotImplementedError
+
+    def plugValue(self, plug):
+        # type: (any) -> any
+        raise NotImplementedError
+
+    def valueMatches(self, plug, value):
+        # type: (any, any) -> bool
+        """:return: True if the plug's value is the serialized value"""
+        return self.plugValue(plug) == value
+
+    def setPlugValue(self, plug, value):
+        # type: (any, any) -> bool
+        """:return: True if the value was set"""
+        raise NotImplementedError
+
+    def isDestination(self, plug):
+        # type: (any) -> bool
+        raise NotImplementedError
+
+    def connectedSource(self, plug):
+        # type: (any) -> any
+        """:return: the plug connected into plug, None if it isn't connected"""
+        raise NotImplementedError
+
+    def createModifier(self):
+        # type: () -> any
+        """:return: an object with connect(srcPlug, destPlug) queuing connections, which doIt() makes"""
+        raise NotImplementedError
+
+
+def setBackend(backend):
+    # type: (Backend) -> None
+    """The backend validation uses when none is passed to it, None goes back to the DCC's"""
+    global _backend
+    _backend = backend
+
+
+def getBackend():
+    # type: () -> Backend
+    """:return: the backend set by setBackend, or the backend of the DCC we're in. None outside of any DCC"""
+    global _backend
+    if _backend is None and vr_insideDCC.insideMaya():
+        from validateRig.core.maya import backend as vrcm_backend
+
+        _backend = vrcm_backend.getMayaBackend()
+
+    return _backend
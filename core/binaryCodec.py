@@ -0,0 +1,572 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Compact binary codec for validator files (.vrig), an alternative to the .json written by parser.write.
+
+Layout, all little endian:
+    MAGIC, version (u8)
+    string table: count (u32), then per string its utf-8 length (u32) and bytes
+    root value
+
+Every value starts with a one byte tag. Strings (dict keys included) are u32 ids into the string table, so the
+long DAG paths repeated through a validator are stored once. Float triples and 4x4 matrices are stored as packed
+doubles. Lists and dicts carry their byte length ahead of their item count so a reader can skip over them.
+"""
+import logging
+import struct
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import atomicFile as vrc_atomicFile
+from validateRig.core import compression as vrc_compression
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VRIG"
+VERSION = 1
+
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STRING = 5
+TAG_FLOAT3 = 6
+TAG_MATRIX44 = 7
+TAG_LIST = 8
+TAG_DICT = 9
+TAG_BIGINT = 10  # ints outside of int64, stored as their decimal string
+
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_FLOAT3 = struct.Struct("<3d")
+_MATRIX44 = struct.Struct("<16d")
+_CONTAINER = struct.Struct("<II")  # byte length of the items, item count
+_INT_MIN = -(2 ** 63)
+_INT_MAX = 2 ** 63 - 1
+STRING_STRIDE = 64  # strings between two string table offsets kept by stringOffsets
+
+try:
+    _STRING_TYPES = (str, unicode)
+    _INT_TYPES = (int, long)
+except NameError:  # python 3
+    _STRING_TYPES = (str,)
+    _INT_TYPES = (int,)
+
+
+def _isFloats(value, count):
+    # type: (list, int) -> bool
+    if len(value) != count:
+        return False
+
+    for eachValue in value:
+        if eachValue.__class__ is not float:
+            return False
+
+    return True
+
+
+class _EncodedList(object):
+    """A list whose items were encoded ahead of the rest of the value, see StreamEncoder"""
+
+    __slots__ = ("items", "count", "complete")
+
+    def __init__(self):
+        self.items = list()
+        self.count = 0
+        self.complete = False
+
+
+class _Encoder(object):
+    def __init__(self):
+        self._strings = list()
+        self._stringIds = dict()
+
+    def stringId(self, value):
+        # type: (str) -> int
+        stringId = self._stringIds.get(value, None)
+        if stringId is None:
+            stringId = len(self._strings)
+            self._strings.append(value)
+            self._stringIds[value] = stringId
+
+        return stringId
+
+    def encode(self, value, out):
+        # type: (any, list[bytes]) -> None
+        if value is None:
+            out.append(_U8.pack(TAG_NONE))
+        elif value is True:
+            out.append(_U8.pack(TAG_TRUE))
+        elif value is False:
+            out.append(_U8.pack(TAG_FALSE))
+        elif isinstance(value, float):
+            out.append(_U8.pack(TAG_FLOAT) + _FLOAT.pack(value))
+        elif isinstance(value, _INT_TYPES):
+            if _INT_MIN <= value <= _INT_MAX:
+                out.append(_U8.pack(TAG_INT) + _INT.pack(value))
+            else:
+                out.append(_U8.pack(TAG_BIGINT) + _U32.pack(self.stringId(str(value))))
+        elif isinstance(value, _STRING_TYPES):
+            out.append(_U8.pack(TAG_STRING) + _U32.pack(self.stringId(value)))
+        elif value.__class__ is _EncodedList:
+            self._appendContainer(TAG_LIST, value.count, value.items, out)
+        elif isinstance(value, (list, tuple)):
+            if _isFloats(value, 3):
+                out.append(_U8.pack(TAG_FLOAT3) + _FLOAT3.pack(*value))
+            elif _isFloats(value, 16):
+                out.append(_U8.pack(TAG_MATRIX44) + _MATRIX44.pack(*value))
+            else:
+                items = list()
+                for eachValue in value:
+                    self.encode(eachValue, items)
+                self._appendContainer(TAG_LIST, len(value), items, out)
+        elif isinstance(value, dict):
+            items = list()
+            for key, eachValue in value.items():
+                items.append(_U32.pack(self.stringId(key)))
+                self.encode(eachValue, items)
+            self._appendContainer(TAG_DICT, len(value), items, out)
+        elif hasattr(value, "__iter__"):
+            # eg: a generator of sourceNode dicts, see parser.write
+            self.encode(list(value), out)
+        else:
+            raise TypeError("%r can not be encoded to a binary validator file" % (value,))
+
+    @staticmethod
+    def _appendContainer(tag, count, items, out):
+        # type: (int, int, list[bytes], list[bytes]) -> None
+        body = b"".join(items)
+        out.append(_U8.pack(tag) + _CONTAINER.pack(len(body), count))
+        out.append(body)
+
+    def stringTable(self):
+        # type: () -> bytes
+        out = [_U32.pack(len(self._strings))]
+        for eachString in self._strings:
+            encoded = eachString.encode("utf-8")
+            out.append(_U32.pack(len(encoded)))
+            out.append(encoded)
+
+        return b"".join(out)
+
+
+def _dumps(encoder, data):
+    # type: (_Encoder, any) -> bytes
+    body = list()
+    encoder.encode(data, body)
+
+    return b"".join([MAGIC, _U8.pack(VERSION), encoder.stringTable()] + body)
+
+
+def dumps(data):
+    # type: (any) -> bytes
+    return _dumps(_Encoder(), data)
+
+
+class StreamEncoder(object):
+    """
+    Encodes the validators of a stream, eg: jsonStream.iterValidatorData, as the stream is consumed.
+    Each sourceNode is encoded as the consumer reads it, so only the encoded bytes are held, not the dicts.
+
+    Usage:
+        encoder = StreamEncoder(session=True)
+        for eachData in encoder.iterValidators(jsonStream.iterValidatorData(filepath)):
+            Validator.fromData(eachData["vN"], eachData)
+        data = encoder.dumps()
+    """
+
+    def __init__(self, session=True):
+        # type: (bool) -> None
+        """
+        Args:
+            session: the stream came from a session save (list of validators) rather than a single validator file
+        """
+        self._encoder = _Encoder()
+        self._session = session
+        self._validators = list()
+        self._complete = False
+
+    def iterValidators(self, validators):
+        # type: (Iterable[dict]) -> Generator[dict]
+        """Yields the validators, their sourceNodes are encoded as they're consumed"""
+        for eachData in validators:
+            nodes = eachData.get(vrconst_serialization.KEY_VALIDATOR_NODES, None)
+            encoded = dict(eachData)
+            if nodes is not None:
+                encodedNodes = _EncodedList()
+                encoded[vrconst_serialization.KEY_VALIDATOR_NODES] = encodedNodes
+                eachData[vrconst_serialization.KEY_VALIDATOR_NODES] = self._iterEncodeList(nodes, encodedNodes)
+            self._validators.append(encoded)
+            yield eachData
+
+        self._complete = True
+
+    def _iterEncodeList(self, values, encodedList):
+        # type: (Iterable[any], _EncodedList) -> Generator[any]
+        for eachValue in values:
+            self._encoder.encode(eachValue, encodedList.items)
+            encodedList.count += 1
+            yield eachValue
+
+        encodedList.complete = True
+
+    def dumps(self):
+        # type: () -> bytes
+        """:return: the bytes dumps would give for the stream's data, None if it wasn't consumed to the end"""
+        if not self._complete:
+            return None
+
+        for eachData in self._validators:
+            nodes = eachData.get(vrconst_serialization.KEY_VALIDATOR_NODES, None)
+            if nodes.__class__ is _EncodedList and not nodes.complete:
+                return None
+
+        if not self._session and len(self._validators) == 1:
+            return _dumps(self._encoder, self._validators[0])
+
+        return _dumps(self._encoder, self._validators)
+
+
+class _LazyStrings(object):
+    """
+    The strings of a file's string table decoded on demand, for reading a single value without the whole table.
+    A string is found from the nearest offset of stringOffsets by skipping at most STRING_STRIDE - 1 strings.
+    """
+
+    def __init__(self, buffer, stringOffsets):
+        # type: (bytes, list[int]) -> None
+        self._buffer = buffer
+        self._stringOffsets = stringOffsets
+        self._strings = dict()
+
+    def __getitem__(self, stringId):
+        # type: (int) -> str
+        string = self._strings.get(stringId, None)
+        if string is not None:
+            return string
+
+        buffer = self._buffer
+        pos = self._stringOffsets[stringId // STRING_STRIDE]
+        for _ in range(stringId % STRING_STRIDE):
+            pos += _U32.size + _U32.unpack_from(buffer, pos)[0]
+
+        length = _U32.unpack_from(buffer, pos)[0]
+        pos += _U32.size
+        string = bytes(buffer[pos : pos + length]).decode("utf-8")
+        self._strings[stringId] = string
+
+        return string
+
+
+class _Decoder(object):
+    def __init__(self, buffer, strings=None):
+        # type: (bytearray, _LazyStrings) -> None
+        """
+        Args:
+            strings: the file's strings when buffer is only a value's bytes, see loadsAt
+        """
+        self._buffer = buffer
+        self.stringOffsets = list()
+        if strings is not None:
+            self._strings = strings
+            self.rootOffset = 0
+            return
+
+        if bytes(buffer[: len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a %s validator file!" % MAGIC)
+
+        pos = len(MAGIC)
+        version = _U8.unpack_from(buffer, pos)[0]
+        if version > VERSION:
+            raise ValueError("Unsupported binary validator version %s" % version)
+        pos += _U8.size
+
+        count = _U32.unpack_from(buffer, pos)[0]
+        pos += _U32.size
+        strings = list()
+        for x in range(count):
+            if not x % STRING_STRIDE:
+                self.stringOffsets.append(pos)
+            length = _U32.unpack_from(buffer, pos)[0]
+            pos += _U32.size
+            strings.append(bytes(buffer[pos : pos + length]).decode("utf-8"))
+            pos += length
+
+        self._strings = strings
+        self.rootOffset = pos
+
+    def decode(self, pos):
+        # type: (int) -> tuple[any, int]
+        """:return: the value at pos and the offset just past it"""
+        buffer = self._buffer
+        tag = buffer[pos]
+        pos += 1
+        if tag == TAG_STRING:
+            return self._strings[_U32.unpack_from(buffer, pos)[0]], pos + _U32.size
+        if tag == TAG_DICT:
+            _, count = _CONTAINER.unpack_from(buffer, pos)
+            pos += _CONTAINER.size
+            strings = self._strings
+            value = dict()
+            for _ in range(count):
+                key = strings[_U32.unpack_from(buffer, pos)[0]]
+                value[key], pos = self.decode(pos + _U32.size)
+            return value, pos
+        if tag == TAG_LIST:
+            _, count = _CONTAINER.unpack_from(buffer, pos)
+            pos += _CONTAINER.size
+            value = list()
+            for _ in range(count):
+                item, pos = self.decode(pos)
+                value.append(item)
+            return value, pos
+        if tag == TAG_FLOAT3:
+            return list(_FLOAT3.unpack_from(buffer, pos)), pos + _FLOAT3.size
+        if tag == TAG_MATRIX44:
+            return list(_MATRIX44.unpack_from(buffer, pos)), pos + _MATRIX44.size
+        if tag == TAG_FLOAT:
+            return _FLOAT.unpack_from(buffer, pos)[0], pos + _FLOAT.size
+        if tag == TAG_INT:
+            return _INT.unpack_from(buffer, pos)[0], pos + _INT.size
+        if tag == TAG_NONE:
+            return None, pos
+        if tag == TAG_TRUE:
+            return True, pos
+        if tag == TAG_FALSE:
+            return False, pos
+        if tag == TAG_BIGINT:
+            return int(self._strings[_U32.unpack_from(buffer, pos)[0]]), pos + _U32.size
+
+        raise ValueError("Unknown tag %s at offset %s" % (tag, pos - 1))
+
+    def skip(self, pos):
+        # type: (int) -> int
+        """:return: the offset just past the value at pos, containers are skipped by their byte length"""
+        tag = self._buffer[pos]
+        if tag in (TAG_LIST, TAG_DICT):
+            length, _ = _CONTAINER.unpack_from(self._buffer, pos + 1)
+            return pos + 1 + _CONTAINER.size + length
+
+        _, pos = self.decode(pos)
+        return pos
+
+    def iterList(self, pos):
+        # type: (int) -> Generator[any]
+        """Decodes the items of the list at pos one at a time"""
+        if self._buffer[pos] != TAG_LIST:
+            raise ValueError("Expected a list at offset %s" % pos)
+
+        _, count = _CONTAINER.unpack_from(self._buffer, pos + 1)
+        pos += 1 + _CONTAINER.size
+        for _ in range(count):
+            item, pos = self.decode(pos)
+            yield item
+
+    def decodeValidatorHeader(self, pos):
+        # type: (int) -> tuple[dict, int]
+        """Decodes a validator dict leaving its sourceNodes as a generator, see jsonStream.iterValidatorData"""
+        buffer = self._buffer
+        if buffer[pos] != TAG_DICT:
+            raise ValueError("Expected a validator dict at offset %s" % pos)
+
+        _, count = _CONTAINER.unpack_from(buffer, pos + 1)
+        pos += 1 + _CONTAINER.size
+        header = dict()
+        for _ in range(count):
+            key = self._strings[_U32.unpack_from(buffer, pos)[0]]
+            pos += _U32.size
+            if key == vrconst_serialization.KEY_VALIDATOR_NODES and buffer[pos] == TAG_LIST:
+                header[key] = self.iterList(pos)
+                pos = self.skip(pos)
+            else:
+                header[key], pos = self.decode(pos)
+
+        return header, pos
+
+    def decodeValidatorSummary(self, pos):
+        # type: (int) -> tuple[dict, int]
+        """Decodes a validator dict skipping its sourceNodes, see jsonStream.iterValidatorHeaders"""
+        buffer = self._buffer
+        if buffer[pos] != TAG_DICT:
+            raise ValueError("Expected a validator dict at offset %s" % pos)
+
+        _, count = _CONTAINER.unpack_from(buffer, pos + 1)
+        pos += 1 + _CONTAINER.size
+        header = dict()
+        for _ in range(count):
+            key = self._strings[_U32.unpack_from(buffer, pos)[0]]
+            pos += _U32.size
+            if key == vrconst_serialization.KEY_VALIDATOR_NODES and buffer[pos] == TAG_LIST:
+                header[vrconst_serialization.KEY_VALIDATOR_NODESOFFSET] = pos
+                header[vrconst_serialization.KEY_VALIDATOR_NODECOUNT] = _CONTAINER.unpack_from(buffer, pos + 1)[1]
+                pos = self.skip(pos)
+            else:
+                header[key], pos = self.decode(pos)
+
+        return header, pos
+
+    def _decodeDictKey(self, pos, wanted):
+        # type: (int, str) -> any
+        """:return: the value of the wanted key of the dict at pos, None if it doesn't have it"""
+        buffer = self._buffer
+        _, count = _CONTAINER.unpack_from(buffer, pos + 1)
+        pos += 1 + _CONTAINER.size
+        for _ in range(count):
+            key = self._strings[_U32.unpack_from(buffer, pos)[0]]
+            pos += _U32.size
+            if key == wanted:
+                return self.decode(pos)[0]
+            pos = self.skip(pos)
+
+        return None
+
+    def decodeValidatorIndex(self, pos):
+        # type: (int) -> tuple[tuple[str, int, list], int]
+        """See jsonStream.iterValidatorIndex"""
+        buffer = self._buffer
+        _, count = _CONTAINER.unpack_from(buffer, pos + 1)
+        pos += 1 + _CONTAINER.size
+        name = None
+        version = 0
+        nodes = list()
+        for _ in range(count):
+            key = self._strings[_U32.unpack_from(buffer, pos)[0]]
+            pos += _U32.size
+            if key == vrconst_serialization.KEY_VALIDATOR_NAME:
+                name, pos = self.decode(pos)
+            elif key == vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION:
+                version, pos = self.decode(pos)
+            elif key == vrconst_serialization.KEY_VALIDATOR_NODES and buffer[pos] == TAG_LIST:
+                _, nodeCount = _CONTAINER.unpack_from(buffer, pos + 1)
+                pos += 1 + _CONTAINER.size
+                for _ in range(nodeCount):
+                    end = self.skip(pos)
+                    longName = self._decodeDictKey(pos, vrconst_serialization.KEY_NODELONGNAME)
+                    nodes.append((longName, pos, end - pos))
+                    pos = end
+            else:
+                pos = self.skip(pos)
+
+        return (name, version, nodes), pos
+
+    def iterValidators(self, decodeHeader):
+        # type: (callable) -> Generator[dict]
+        """Calls decodeHeader on the root validator dict or on each validator of a session list"""
+        buffer = self._buffer
+        pos = self.rootOffset
+        if buffer[pos] == TAG_DICT:
+            header, _ = decodeHeader(pos)
+            yield header
+            return
+
+        if buffer[pos] != TAG_LIST:
+            raise ValueError("The file doesn't hold a validator or a list of validators!")
+
+        _, count = _CONTAINER.unpack_from(buffer, pos + 1)
+        pos += 1 + _CONTAINER.size
+        for _ in range(count):
+            header, pos = decodeHeader(pos)
+            yield header
+
+
+def loads(buffer):
+    # type: (bytes) -> any
+    decoder = _Decoder(bytearray(buffer))
+    value, _ = decoder.decode(decoder.rootOffset)
+
+    return value
+
+
+def write(filepath, data):
+    # type: (str, any) -> bool
+    logger.debug("Saving binary data to %s" % filepath)
+    with vrc_atomicFile.atomicWrite(filepath) as rawFile:
+        with vrc_compression.wrapWrite(rawFile, filepath) as outfile:
+            outfile.write(dumps(data))
+
+    return True
+
+
+def read(filepath):
+    # type: (str) -> any
+    logger.debug("Reading binary data from %s" % filepath)
+    return loads(vrc_compression.readBytes(filepath))
+
+
+def _readDecoder(filepath):
+    # type: (str) -> _Decoder
+    return _Decoder(bytearray(vrc_compression.readBytes(filepath)))
+
+
+def iterLoads(buffer):
+    # type: (bytes) -> Generator[dict]
+    """Yields one dict per validator of the buffer with its sourceNodes as a generator, see iterValidatorData"""
+    decoder = _Decoder(bytearray(buffer))
+    for header in decoder.iterValidators(decoder.decodeValidatorHeader):
+        yield header
+
+
+def iterValidatorData(filepath):
+    # type: (str) -> Generator[dict]
+    """
+    Yields one dict per validator with its sourceNodes as a generator, like jsonStream.iterValidatorData.
+    The file is read in one go, it is compact, but the nodes are only decoded as they're consumed.
+    """
+    logger.debug("Streaming binary data from %s" % filepath)
+    for header in iterLoads(vrc_compression.readBytes(filepath)):
+        yield header
+
+
+def iterValidatorHeaders(filepath):
+    # type: (str) -> Generator[dict]
+    """Yields one header per validator with its sourceNodes skipped, like jsonStream.iterValidatorHeaders"""
+    logger.debug("Reading binary validator headers from %s" % filepath)
+    decoder = _readDecoder(filepath)
+    for header in decoder.iterValidators(decoder.decodeValidatorSummary):
+        yield header
+
+
+def iterValidatorIndex(filepath):
+    # type: (str) -> Generator[tuple[str, int, list]]
+    """Yields (validatorName, schemaVersion, [(sourceNode longName, offset, length)]) per validator, like jsonStream"""
+    entries, _ = readValidatorIndex(filepath)
+    for entry in entries:
+        yield entry
+
+
+def readValidatorIndex(filepath):
+    # type: (str) -> tuple[list[tuple[str, int, list]], list[int]]
+    """:return: the iterValidatorIndex entries and the stringOffsets of filepath, for loadsAt"""
+    decoder = _readDecoder(filepath)
+    entries = list(decoder.iterValidators(decoder.decodeValidatorIndex))
+
+    return entries, decoder.stringOffsets
+
+
+def loadsAt(buffer, offset, length, stringOffsets=None):
+    # type: (bytes, int, int, list[int]) -> any
+    """
+    Decodes the value at offset of a whole file's bytes, eg: an mmap.
+
+    Args:
+        stringOffsets: the file's string table offsets from readValidatorIndex. With them only the value's bytes and
+            the strings it uses are read from the buffer, without them the whole string table is decoded first.
+    """
+    if stringOffsets is None:
+        strings = _Decoder(buffer)._strings
+    else:
+        strings = _LazyStrings(buffer, stringOffsets)
+
+    decoder = _Decoder(bytearray(buffer[offset : offset + length]), strings=strings)
+    value, _ = decoder.decode(0)
+
+    return value
+
+
+def iterListValues(filepath, offset):
+    # type: (str, int) -> Generator[any]
+    """Decodes the items of the list at offset one at a time, like jsonStream.iterArrayValues"""
+    decoder = _readDecoder(filepath)
+    for item in decoder.iterList(offset):
+        yield item
@@ -0,0 +1,343 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Local on disk cache of parsed validator files.
+
+Artists reopen the same validator files many times a day, often from a network filer. parser.read and parser.iterRead
+(the loader, the UI) keep what they parsed here, in the .vrig binaryCodec, and serve it back while the file's path,
+size, mtime and inode are unchanged. Decoding the local binary entry is quicker than decoding the json off the filer.
+
+parser.iterRead still streams: a hit decodes the entry one sourceNode at a time, a miss streams the file and encodes
+each sourceNode as it's consumed, the entry is written once the whole file was read. Header reads
+(parser.iterReadHeaders, LazyValidator) always go to the file, their sourceNode offsets point into it and an entry
+can be evicted at any time.
+
+Entries live in the cache directory (VALIDATERIG_CACHE_DIR, defaults to ~/.validateRig/cache) as one file each: a
+json header holding the cached file's stamp then the .vrig data. Entries not owned by the current user are ignored.
+A hit touches the entry's mtime and every put evicts the least recently used entries until the cache fits in
+maxBytes (VALIDATERIG_CACHE_MAX_MB, 512 by default).
+
+The cache is off unless VALIDATERIG_CACHE=1 or setEnabled(True).
+
+Usage:
+    python -m validateRig.core.cache list
+    python -m validateRig.core.cache clear
+    python -m validateRig.core.cache prune --max-mb 128
+"""
+import gc
+import os
+import sys
+import errno
+import struct
+import hashlib
+import logging
+import argparse
+
+import simplejson as json
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.core import atomicFile as vrc_atomicFile
+from validateRig.core import binaryCodec as vrc_binaryCodec
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 3
+ENV_ENABLED = "VALIDATERIG_CACHE"
+ENV_DIR = "VALIDATERIG_CACHE_DIR"
+ENV_MAX_MB = "VALIDATERIG_CACHE_MAX_MB"
+
+_cacheDir = None  # overrides ENV_DIR, see setCacheDir
+_enabled = None  # overrides ENV_ENABLED, see setEnabled
+_HEADER_LENGTH = struct.Struct("<I")  # byte length of an entry's json header
+KEY_STAMP = "stamp"
+
+
+def enabled():
+    # type: () -> bool
+    if _enabled is not None:
+        return _enabled
+
+    return os.environ.get(ENV_ENABLED, "0") == "1"
+
+
+def setEnabled(state):
+    # type: (bool) -> None
+    """Turns the cache on / off for this process, None goes back to VALIDATERIG_CACHE"""
+    global _enabled
+    _enabled = state
+
+
+def cacheDir():
+    # type: () -> str
+    if _cacheDir is not None:
+        return _cacheDir
+
+    return os.environ.get(ENV_DIR) or os.path.join(os.path.expanduser("~"), ".validateRig", "cache")
+
+
+def setCacheDir(path):
+    # type: (str) -> None
+    """Points the cache at path, None goes back to VALIDATERIG_CACHE_DIR / the default"""
+    global _cacheDir
+    _cacheDir = path
+
+
+def maxBytes():
+    # type: () -> int
+    return int(float(os.environ.get(ENV_MAX_MB, vrconst_constants.CACHE_MAX_MB)) * 1024 * 1024)
+
+
+def entryStamp(filepath):
+    # type: (str) -> tuple[str, int, float, int]
+    """:return: (path, size, mtime, inode) of filepath, its entry is only served while they're unchanged"""
+    # The inode changes on every atomic rewrite, even one of the same size within the mtime's resolution.
+    stat = os.stat(filepath)
+    return os.path.abspath(filepath), stat.st_size, stat.st_mtime, stat.st_ino
+
+
+def _entryPath(stamp):
+    # type: (tuple) -> str
+    key = repr((CACHE_VERSION,) + stamp)
+    return os.path.join(cacheDir(), hashlib.sha1(key.encode("utf-8")).hexdigest() + vrconst_constants.CACHE_EXT)
+
+
+def _ownedByUser(stat):
+    # type: (os.stat_result) -> bool
+    # Anyone able to write to the cache directory could otherwise plant the data of a file.
+    getuid = getattr(os, "getuid", None)
+    return getuid is None or stat.st_uid == getuid()
+
+
+def _readHeader(f):
+    # type: (file) -> dict
+    length = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))[0]
+    return json.loads(f.read(length).decode("utf-8"))
+
+
+def _readEntry(filepath):
+    # type: (str) -> bytes
+    """:return: the .vrig data of filepath's entry, None on a miss or if filepath changed since it was cached"""
+    stamp = entryStamp(filepath)
+    path = _entryPath(stamp)
+    try:
+        with open(path, "rb") as f:
+            if not _ownedByUser(os.fstat(f.fileno())):
+                logger.warning("Ignoring cache entry %s, it isn't owned by the current user" % path)
+                return None
+            if tuple(_readHeader(f)[KEY_STAMP]) != stamp:
+                return None
+            data = f.read()
+    except (IOError, OSError):
+        return None
+    except Exception as e:  # A truncated / foreign entry is just a miss
+        logger.debug("Ignoring unreadable cache entry %s: %s" % (path, e))
+        return None
+
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+    logger.debug("Cache hit for %s" % filepath)
+    return data
+
+
+def get(filepath):
+    # type: (str) -> any
+    """:return: the cached data of filepath, None on a miss or if filepath changed since it was cached"""
+    data = _readEntry(filepath)
+    if data is None:
+        return None
+
+    # Decoding allocates millions of containers, which keeps triggering the cyclic gc for nothing.
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        return vrc_binaryCodec.loads(data)
+    except Exception as e:
+        logger.debug("Ignoring undecodable cache entry of %s: %s" % (filepath, e))
+        return None
+    finally:
+        if gcEnabled:
+            gc.enable()
+
+
+def iterGet(filepath):
+    # type: (str) -> Generator[dict]
+    """:return: the cached validators of filepath streamed like parser.iterRead, None on a miss"""
+    data = _readEntry(filepath)
+    if data is None:
+        return None
+
+    return vrc_binaryCodec.iterLoads(data)
+
+
+def putBytes(filepath, data, stamp=None):
+    # type: (str, bytes, tuple) -> bool
+    """
+    Caches the .vrig encoded data of filepath. :return: False if the entry couldn't be written
+
+    Args:
+        stamp: entryStamp(filepath) from before filepath was read, the current one by default
+    """
+    if stamp is None:
+        stamp = entryStamp(filepath)
+    path = _entryPath(stamp)
+    try:
+        os.makedirs(cacheDir())
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            logger.warning("Couldn't create the cache directory %s: %s" % (cacheDir(), e))
+            return False
+
+    header = json.dumps({KEY_STAMP: stamp}).encode("utf-8")
+    try:
+        with vrc_atomicFile.atomicWrite(path) as f:
+            # The header goes first so listing the cache doesn't load the data.
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            f.write(data)
+    except (IOError, OSError) as e:
+        logger.warning("Couldn't cache %s: %s" % (filepath, e))
+        return False
+
+    prune()
+    return True
+
+
+def put(filepath, data):
+    # type: (str, any) -> bool
+    """Caches the parsed data of filepath. :return: False if the entry couldn't be written"""
+    try:
+        encoded = vrc_binaryCodec.dumps(data)
+    except TypeError as e:
+        logger.warning("Couldn't cache %s: %s" % (filepath, e))
+        return False
+
+    return putBytes(filepath, encoded)
+
+
+def iterPut(filepath, validators, session=True):
+    # type: (str, Iterable[dict], bool) -> Generator[dict]
+    """
+    Yields the validators streamed from filepath, eg: by jsonStream.iterValidatorData, caching them once they were
+    all consumed. Only the encoded sourceNodes are held meanwhile, see binaryCodec.StreamEncoder.
+
+    Args:
+        session: filepath is a session save (list of validators) rather than a single validator file
+    """
+    stamp = entryStamp(filepath)
+    encoder = vrc_binaryCodec.StreamEncoder(session=session)
+    for eachData in encoder.iterValidators(validators):
+        yield eachData
+
+    data = encoder.dumps()
+    if data is None:
+        logger.debug("Not caching %s, its sourceNodes weren't all read" % filepath)
+        return
+
+    putBytes(filepath, data, stamp=stamp)
+
+
+def _iterEntryStats():
+    # type: () -> Generator[tuple[str, int, float]]
+    """Yields (entry path, bytes, last used time) per entry, entries removed meanwhile are skipped"""
+    directory = cacheDir()
+    if not os.path.isdir(directory):
+        return
+
+    for eachName in os.listdir(directory):
+        if not eachName.endswith(vrconst_constants.CACHE_EXT):
+            continue
+
+        path = os.path.join(directory, eachName)
+        try:
+            stat = os.stat(path)
+        except OSError:  # Pruned by another load
+            continue
+
+        yield path, stat.st_size, stat.st_mtime
+
+
+def iterEntries():
+    # type: () -> Generator[tuple[str, int, float, str]]
+    """Yields (entry path, bytes, last used time, cached file path) per entry"""
+    for path, size, mtime in _iterEntryStats():
+        try:
+            with open(path, "rb") as f:
+                sourcePath = _readHeader(f)[KEY_STAMP][0]
+        except Exception:
+            sourcePath = None
+
+        yield path, size, mtime, sourcePath
+
+
+def _remove(path):
+    # type: (str) -> None
+    try:
+        os.remove(path)
+    except OSError:  # Another process got there first
+        pass
+
+
+def prune(limit=None):
+    # type: (int) -> int
+    """Evicts the least recently used entries until the cache fits in limit bytes. :return: number evicted"""
+    if limit is None:
+        limit = maxBytes()
+
+    entries = sorted(_iterEntryStats(), key=lambda entry: entry[2])
+    total = sum(entry[1] for entry in entries)
+    evicted = 0
+    for path, size, _ in entries:
+        if total <= limit:
+            break
+
+        _remove(path)
+        total -= size
+        evicted += 1
+
+    return evicted
+
+
+def clear():
+    # type: () -> int
+    """Removes every entry. :return: number removed"""
+    count = 0
+    for path, _, _ in list(_iterEntryStats()):
+        _remove(path)
+        count += 1
+
+    return count
+
+
+def main(args=None):
+    # type: (list[str]) -> int
+    argParser = argparse.ArgumentParser(prog="python -m validateRig.core.cache", description=__doc__.split("\n\n")[0])
+    argParser.add_argument("--dir", help="cache directory, defaults to %s" % cacheDir())
+    commands = argParser.add_subparsers(dest="command")
+    commands.add_parser("list", help="list the entries, most recently used first")
+    commands.add_parser("clear", help="remove every entry")
+    pruneParser = commands.add_parser("prune", help="evict the least recently used entries")
+    pruneParser.add_argument("--max-mb", type=float, default=None, help="size to prune down to")
+    parsed = argParser.parse_args(args)
+
+    if parsed.dir:
+        setCacheDir(parsed.dir)
+
+    if parsed.command == "clear":
+        print("Removed %s entries from %s" % (clear(), cacheDir()))
+    elif parsed.command == "prune":
+        limit = None if parsed.max_mb is None else int(parsed.max_mb * 1024 * 1024)
+        print("Evicted %s entries from %s" % (prune(limit), cacheDir()))
+    else:
+        entries = sorted(iterEntries(), key=lambda entry: entry[2], reverse=True)
+        for _, size, _, sourcePath in entries:
+            print("%10.2fMB  %s" % (size / (1024.0 * 1024.0), sourcePath))
+        total = sum(entry[1] for entry in entries)
+        print("%s entries, %.2fMB of %.2fMB in %s" % (len(entries), total / 1048576.0, maxBytes() / 1048576.0, cacheDir()))
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Transparent compression of validator files, picked from a trailing extension:
+    .gz     gzip, eg: myRig.json.gz
+    .zlib   zlib, eg: myRig.vrig.zlib
+
+The codec (json / binary) is chosen from the extension in front of it, see parser.codecExtension. Validator files
+are mostly repeated DAG paths and values so they compress very well, which pays off when the files live on a
+network filer and the bytes moved dominate the load time.
+
+Everything streams with the stdlib codecs. openRead returns a file object that decompresses as it's read and
+supports the forward seeks jsonStream uses, a seek backwards starts decompressing again from the top.
+"""
+import gzip
+import logging
+import zlib
+
+from validateRig.const import constants as vrconst_constants
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_LEVEL = 6  # zlib's default, 9 is markedly slower for a couple of percent
+CHUNK_SIZE = 1024 * 1024
+
+
+def compressionExtension(filepath):
+    # type: (str) -> str
+    """:return: GZIP_EXT, ZLIB_EXT or "" if the file isn't compressed"""
+    lowered = filepath.lower()
+    for eachExt in (vrconst_constants.GZIP_EXT, vrconst_constants.ZLIB_EXT):
+        if lowered.endswith(eachExt):
+            return eachExt
+
+    return ""
+
+
+def stripCompressionExtension(filepath):
+    # type: (str) -> str
+    ext = compressionExtension(filepath)
+    if not ext:
+        return filepath
+
+    return filepath[: -len(ext)]
+
+
+class _ZlibReader(object):
+    """Read only file object over a zlib stream"""
+
+    def __init__(self, filepath):
+        # type: (str) -> None
+        self._filepath = filepath
+        self._file = None
+        self._rewind()
+
+    def _rewind(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._filepath, "rb")
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b""
+        self._offset = 0  # uncompressed offset of self._buffer[0]
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        while size < 0 or len(self._buffer) < size:
+            chunk = self._file.read(CHUNK_SIZE)
+            if not chunk:
+                self._buffer += self._decompressor.flush()
+                break
+            self._buffer += self._decompressor.decompress(chunk)
+
+        if size < 0:
+            size = len(self._buffer)
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        self._offset += len(data)
+
+        return data
+
+    def tell(self):
+        # type: () -> int
+        return self._offset
+
+    def seek(self, offset):
+        # type: (int) -> None
+        if offset < self._offset:
+            self._rewind()
+
+        while self._offset < offset:
+            if not self.read(min(CHUNK_SIZE, offset - self._offset)):
+                break
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _ZlibWriter(object):
+    """Write only file object compressing into fileObj, close() flushes but leaves fileObj open like GzipFile"""
+
+    def __init__(self, fileObj):
+        # type: (file) -> None
+        self._file = fileObj
+        self._compressor = zlib.compressobj(COMPRESSION_LEVEL)
+
+    def write(self, data):
+        # type: (bytes) -> None
+        self._file.write(self._compressor.compress(data))
+
+    def close(self):
+        self._file.write(self._compressor.flush())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _Uncompressed(object):
+    def __init__(self, fileObj):
+        # type: (file) -> None
+        self.write = fileObj.write
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def openRead(filepath):
+    # type: (str) -> file
+    """:return: a binary file object over the uncompressed bytes of filepath"""
+    ext = compressionExtension(filepath)
+    if ext == vrconst_constants.GZIP_EXT:
+        return gzip.GzipFile(filepath, "rb")
+    if ext == vrconst_constants.ZLIB_EXT:
+        return _ZlibReader(filepath)
+
+    return open(filepath, "rb")
+
+
+def readBytes(filepath):
+    # type: (str) -> bytes
+    with openRead(filepath) as f:
+        return f.read()
+
+
+def wrapWrite(fileObj, filepath):
+    # type: (file, str) -> file
+    """
+    Args:
+        fileObj: binary file object to write the compressed bytes to, eg: an atomicFile.atomicWrite
+        filepath: the target path, its extension picks the compression
+    :return: a file object to write the uncompressed bytes to, close it before closing fileObj
+    """
+    ext = compressionExtension(filepath)
+    if ext == vrconst_constants.GZIP_EXT:
+        return gzip.GzipFile(filename="", mode="wb", fileobj=fileObj, compresslevel=COMPRESSION_LEVEL)
+    if ext == vrconst_constants.ZLIB_EXT:
+        return _ZlibWriter(fileObj)
+
+    return _Uncompressed(fileObj)
@@ -0,0 +1,283 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Delta files store a revision of a validator file as a patch against a base file.
+
+Rigs are re-captured each publish with a handful of changes, a delta holds just those. Per validator it records the
+sourceNodes added, the longNames of those removed and the sourceNodes modified. A modified sourceNode keeps its
+validityNodes as a list of either the index of an unchanged validityNode of the base sourceNode or the data of an
+added / modified one, validityNodes missing from the list were removed.
+
+A delta records the base's size and sha1, reading it against any other base raises a ValueError rather than mapping
+the validityNode indices onto the wrong validityNodes. It also records the base's mtime and inode, while those and
+the size still match the base is taken as unchanged without hashing it. The sha1 is only checked once the base was
+touched, copied or re-published.
+
+The base is read through parser.read, so applying a delta to an unchanged base that's in the local cache doesn't
+open the base at all, see cache.
+
+Delta files are regular validator files of any codec, named with DELTA_EXT before the codec extension,
+eg: rig_v002.vdelta.json. loader.loadFile recognises them by name.
+"""
+import os
+import hashlib
+import logging
+
+import simplejson as json
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import compression as vrc_compression
+from validateRig.core import migrations as vrc_migrations
+from validateRig.core import parser as vrc_parser
+
+logger = logging.getLogger(__name__)
+
+
+def isDeltaFile(filepath):
+    # type: (str) -> bool
+    return os.path.splitext(vrc_compression.stripCompressionExtension(filepath))[0].lower().endswith(
+        vrconst_constants.DELTA_EXT
+    )
+
+
+def isDelta(data):
+    # type: (any) -> bool
+    return isinstance(data, dict) and vrconst_serialization.KEY_DELTA_VERSION in data
+
+
+def _iterValidatorData(data):
+    # type: (any) -> Generator[dict]
+    """Yields the validators of a session save or a single validator, migrated to the current schema"""
+    if isinstance(data, dict):
+        data = [data]
+
+    for eachData in data:
+        eachData, version = vrc_migrations.migrateValidatorData(eachData)
+        sourceNodes = eachData.get(vrconst_serialization.KEY_VALIDATOR_NODES, list())
+        eachData[vrconst_serialization.KEY_VALIDATOR_NODES] = list(
+            vrc_migrations.migrateSourceNodes(sourceNodes, version)
+        )
+        yield eachData
+
+
+def _validityKey(validityData):
+    # type: (dict) -> str
+    return json.dumps(validityData, sort_keys=True)
+
+
+def _diffSourceNode(baseData, revisedData):
+    # type: (dict, dict) -> dict
+    baseIndices = dict()
+    for index, eachData in enumerate(baseData.get(vrconst_serialization.KEY_VAILIDITYNODES, list())):
+        baseIndices.setdefault(_validityKey(eachData), index)
+
+    validityNodes = list()
+    for eachData in revisedData.get(vrconst_serialization.KEY_VAILIDITYNODES, list()):
+        validityNodes.append(baseIndices.get(_validityKey(eachData), eachData))
+
+    modified = dict(revisedData)
+    modified[vrconst_serialization.KEY_VAILIDITYNODES] = validityNodes
+
+    return modified
+
+
+def _patchSourceNode(baseData, modified):
+    # type: (dict, dict) -> dict
+    baseValidityNodes = baseData.get(vrconst_serialization.KEY_VAILIDITYNODES, list())
+    revisedData = dict(modified)
+    revisedData[vrconst_serialization.KEY_VAILIDITYNODES] = [
+        baseValidityNodes[eachNode] if isinstance(eachNode, int) else eachNode
+        for eachNode in modified.get(vrconst_serialization.KEY_VAILIDITYNODES, list())
+    ]
+
+    return revisedData
+
+
+def _patchedOrder(baseLongNames, removed, added):
+    # type: (list[str], set[str], list[str]) -> list[str]
+    """The sourceNode order apply gives without a KEY_DELTA_ORDER, the base's order then the added sourceNodes"""
+    return [longName for longName in baseLongNames if longName not in removed] + added
+
+
+def diffValidatorData(baseData, revisedData):
+    # type: (dict, dict) -> dict
+    """
+    Args:
+        baseData: Validator.toData() of the base, current schema. An empty dict for a validator the base doesn't have
+        revisedData: Validator.toData() of the revision, current schema
+    :return: the validator's patch
+    """
+    baseNodes = baseData.get(vrconst_serialization.KEY_VALIDATOR_NODES, list())
+    baseByLongName = dict((n[vrconst_serialization.KEY_NODELONGNAME], n) for n in baseNodes)
+    revisedNodes = revisedData.get(vrconst_serialization.KEY_VALIDATOR_NODES, list())
+    revisedLongNames = [n[vrconst_serialization.KEY_NODELONGNAME] for n in revisedNodes]
+
+    added = list()
+    modified = list()
+    for eachData in revisedNodes:
+        baseNode = baseByLongName.get(eachData[vrconst_serialization.KEY_NODELONGNAME], None)
+        if baseNode is None:
+            added.append(eachData)
+        elif baseNode != eachData:
+            modified.append(_diffSourceNode(baseNode, eachData))
+
+    revisedLongNameSet = set(revisedLongNames)
+    removed = [longName for longName in baseByLongName if longName not in revisedLongNameSet]
+
+    patch = dict()
+    patch[vrconst_serialization.KEY_VALIDATOR_NAME] = revisedData.get(vrconst_serialization.KEY_VALIDATOR_NAME, "")
+    patch[vrconst_serialization.KEY_VALIDATORNAMESPACE] = revisedData.get(
+        vrconst_serialization.KEY_VALIDATORNAMESPACE, ""
+    )
+    patch[vrconst_serialization.KEY_DELTA_ADDED] = added
+    patch[vrconst_serialization.KEY_DELTA_REMOVED] = removed
+    patch[vrconst_serialization.KEY_DELTA_MODIFIED] = modified
+
+    baseLongNames = [n[vrconst_serialization.KEY_NODELONGNAME] for n in baseNodes]
+    addedLongNames = [n[vrconst_serialization.KEY_NODELONGNAME] for n in added]
+    if _patchedOrder(baseLongNames, set(removed), addedLongNames) != revisedLongNames:
+        patch[vrconst_serialization.KEY_DELTA_ORDER] = revisedLongNames
+
+    return patch
+
+
+def applyValidatorPatch(baseData, patch):
+    # type: (dict, dict) -> dict
+    """:return: Validator.toData() of the revision"""
+    baseNodes = baseData.get(vrconst_serialization.KEY_VALIDATOR_NODES, list())
+    byLongName = dict((n[vrconst_serialization.KEY_NODELONGNAME], n) for n in baseNodes)
+    for eachModified in patch.get(vrconst_serialization.KEY_DELTA_MODIFIED, list()):
+        longName = eachModified[vrconst_serialization.KEY_NODELONGNAME]
+        if longName not in byLongName:
+            raise KeyError("The delta modifies %s, which isn't in the base!" % longName)
+        byLongName[longName] = _patchSourceNode(byLongName[longName], eachModified)
+
+    removed = set(patch.get(vrconst_serialization.KEY_DELTA_REMOVED, list()))
+    added = patch.get(vrconst_serialization.KEY_DELTA_ADDED, list())
+    for eachData in added:
+        byLongName[eachData[vrconst_serialization.KEY_NODELONGNAME]] = eachData
+
+    order = patch.get(vrconst_serialization.KEY_DELTA_ORDER, None)
+    if order is None:
+        order = _patchedOrder(
+            [n[vrconst_serialization.KEY_NODELONGNAME] for n in baseNodes],
+            removed,
+            [n[vrconst_serialization.KEY_NODELONGNAME] for n in added],
+        )
+
+    data = dict()
+    data[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+    data[vrconst_serialization.KEY_VALIDATOR_NAME] = patch.get(vrconst_serialization.KEY_VALIDATOR_NAME, "")
+    data[vrconst_serialization.KEY_VALIDATORNAMESPACE] = patch.get(vrconst_serialization.KEY_VALIDATORNAMESPACE, "")
+    data[vrconst_serialization.KEY_VALIDATOR_NODES] = [byLongName[longName] for longName in order]
+
+    return data
+
+
+def diff(baseData, revisedData):
+    # type: (any, any) -> dict
+    """
+    Args:
+        baseData: a session list or a single Validator.toData(), eg: parser.read of the base file
+        revisedData: a session list or a single Validator.toData() of the revision
+    :return: the delta, validators are matched by name
+    """
+    baseByName = dict(
+        (v.get(vrconst_serialization.KEY_VALIDATOR_NAME, ""), v) for v in _iterValidatorData(baseData)
+    )
+
+    delta = dict()
+    delta[vrconst_serialization.KEY_DELTA_VERSION] = vrconst_serialization.DELTA_VERSION
+    delta[vrconst_serialization.KEY_DELTA_SESSION] = not isinstance(revisedData, dict)
+    delta[vrconst_serialization.KEY_DELTA_VALIDATORS] = [
+        diffValidatorData(baseByName.get(v.get(vrconst_serialization.KEY_VALIDATOR_NAME, ""), dict()), v)
+        for v in _iterValidatorData(revisedData)
+    ]
+
+    return delta
+
+
+def apply(baseData, delta):
+    # type: (any, dict) -> any
+    """:return: the revision, a session list or a single Validator.toData() as it was diffed"""
+    version = delta.get(vrconst_serialization.KEY_DELTA_VERSION, None)
+    if version != vrconst_serialization.DELTA_VERSION:
+        raise ValueError("Unsupported delta version %s!" % version)
+
+    baseByName = dict(
+        (v.get(vrconst_serialization.KEY_VALIDATOR_NAME, ""), v) for v in _iterValidatorData(baseData)
+    )
+    revision = [
+        applyValidatorPatch(baseByName.get(p.get(vrconst_serialization.KEY_VALIDATOR_NAME, ""), dict()), p)
+        for p in delta.get(vrconst_serialization.KEY_DELTA_VALIDATORS, list())
+    ]
+    if not delta.get(vrconst_serialization.KEY_DELTA_SESSION, True) and len(revision) == 1:
+        return revision[0]
+
+    return revision
+
+
+def _fileHash(filepath):
+    # type: (str) -> str
+    sha1 = hashlib.sha1()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(vrc_parser.WRITE_CHUNK_SIZE), b""):
+            sha1.update(chunk)
+
+    return sha1.hexdigest()
+
+
+def _baseMatches(basePath, delta):
+    # type: (str, dict) -> bool
+    """:return: True if basePath is the file the delta was saved against"""
+    size, mtime, inode = vrc_parser.fileStamp(basePath)
+    baseSize = delta.get(vrconst_serialization.KEY_DELTA_BASESIZE, None)
+    if baseSize is not None and size != baseSize:
+        return False
+
+    # Untouched since the delta was saved, no need to read it for its hash.
+    if delta.get(vrconst_serialization.KEY_DELTA_BASESTAMP, None) == [mtime, inode]:
+        return True
+
+    baseHash = delta.get(vrconst_serialization.KEY_DELTA_BASEHASH, None)
+    return baseHash is None or _fileHash(basePath) == baseHash
+
+
+def _basePath(deltaPath, base):
+    # type: (str, str) -> str
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(deltaPath)), base))
+
+
+def write(deltaPath, basePath, revisedData, sortKeys=True):
+    # type: (str, str, any, bool) -> dict
+    """
+    Saves the revision as a delta against basePath, which is stored relative to the delta so the two can move together.
+
+    :param revisedData: a session list or a single Validator.toData()
+    :return: the delta
+    """
+    delta = diff(vrc_parser.read(basePath), revisedData)
+    deltaDir = os.path.dirname(os.path.abspath(deltaPath))
+    delta[vrconst_serialization.KEY_DELTA_BASE] = os.path.relpath(os.path.abspath(basePath), deltaDir).replace("\\", "/")
+    size, mtime, inode = vrc_parser.fileStamp(basePath)
+    delta[vrconst_serialization.KEY_DELTA_BASESIZE] = size
+    delta[vrconst_serialization.KEY_DELTA_BASESTAMP] = [mtime, inode]
+    delta[vrconst_serialization.KEY_DELTA_BASEHASH] = _fileHash(basePath)
+    vrc_parser.write(deltaPath, delta, sortKeys=sortKeys)
+
+    return delta
+
+
+def read(deltaPath):
+    # type: (str) -> any
+    """:return: the revision the delta file holds, its base comes from the cache when it's unchanged"""
+    delta = vrc_parser.read(deltaPath)
+    if not isDelta(delta):
+        raise ValueError("%s isn't a delta file!" % deltaPath)
+
+    basePath = _basePath(deltaPath, delta[vrconst_serialization.KEY_DELTA_BASE])
+    if not _baseMatches(basePath, delta):
+        raise ValueError("%s changed since %s was saved against it!" % (basePath, deltaPath))
+
+    logger.debug("Applying %s to %s" % (deltaPath, basePath))
+    return apply(vrc_parser.read(basePath), delta)
@@ -1,6 +1,10 @@
 #  Copyright (c) 2020.  James Dunlop
 import logging
+from functools import partial
+
 from validateRig import insideDCC as vr_insideDCC
+from validateRig.core import backend as vrc_backend
+from validateRig.core import validation as vrc_validation
 from validateRig.core import validator as vrc_validator
 if vr_insideDCC.insideMaya():
     import validateRig.core.maya.validation as cm_mayaValidation
@@ -8,19 +12,70 @@ if vr_insideDCC.insideMaya():
 logger = logging.getLogger(__name__)
 
 
-def createValidator(name, nameSpace="", data=None):
-    # type: (str, dict) -> Validator
+def createValidator(name, nameSpace="", data=None, columnar=False, backend=None):
+    # type: (str, str, dict, bool, Backend) -> Validator
     """
     Args:
         name: The name for the validator. Eg: MyCat
         data: if supplied will create from data instead
+        columnar: if creating from data, store validityNodes in columnar tables (large validators)
+        backend: the DCC to validate / repair against, defaults to Maya's inside Maya or backend.getBackend().
+            Eg: a fakeScene.FakeBackend to validate headless
     """
     if data is None:
         validator = vrc_validator.Validator(name=name, nameSpace=nameSpace)
     else:
-        validator = vrc_validator.Validator.fromData(name=name, data=data)
+        validator = vrc_validator.Validator.fromData(name=name, data=data, columnar=columnar)
+
+    _connectValidator(validator, backend=backend)
+
+    return validator
+
+
+def createLazyValidator(filepath, header, columnar=False, backend=None):
+    # type: (str, dict, bool, Backend) -> LazyValidator
+    """
+    Args:
+        filepath: the file the header was read from
+        header: one of parser.iterReadHeaders(filepath), the sourceNodes are hydrated from the file when needed
+        columnar: store validityNodes in columnar tables once hydrated (large validators)
+        backend: see createValidator
+    """
+    validator = vrc_validator.LazyValidator.fromHeader(filepath, header, columnar=columnar)
+    _connectValidator(validator, backend=backend)
+
+    return validator
+
+
+def createPagedValidator(name, nameSpace="", data=None, columnar=False, pagesPath=None, backend=None):
+    # type: (str, str, dict, bool, str, Backend) -> PagedValidator
+    """
+    A validator whose sourceNodes are kept on disk, for validators too large to hold in memory. See PagedValidator
 
-    if vr_insideDCC.insideMaya():  # pragma: no cover
+    Args:
+        pagesPath: the page database, defaults to a file in the temp dir
+        backend: see createValidator
+    """
+    if data is None:
+        validator = vrc_validator.PagedValidator(name=name, nameSpace=nameSpace, pagesPath=pagesPath)
+    else:
+        validator = vrc_validator.PagedValidator.fromData(name=name, data=data, columnar=columnar, pagesPath=pagesPath)
+
+    _connectValidator(validator, backend=backend)
+
+    return validator
+
+
+def _connectValidator(validator, backend=None):
+    # type: (Validator, Backend) -> None
+    if backend is None and not vr_insideDCC.insideMaya():
+        backend = vrc_backend.getBackend()
+
+    if backend is not None:
+        validator.validate.connect(partial(vrc_validation.validateValidatorSourceNodes, backend=backend))
+        validator.repair.connect(partial(vrc_validation.repairValidatorSourceNodes, backend=backend))
+
+    elif vr_insideDCC.insideMaya():  # pragma: no cover
         validator.validate.connect(cm_mayaValidation.validateValidatorSourceNodes)
         validator.repair.connect(cm_mayaValidation.repairValidatorSourceNodes)
 
@@ -30,5 +85,3 @@ def createValidator(name, nameSpace="", data=None):
             validator.validate.connect(msg("No stand alone validation is possible!!"))
         except RuntimeError:
             pass
-
-    return validator
@@ -0,0 +1,332 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+A pure python stand in for a DCC scene, to run validation headless, eg: on farm nodes, in CI or when profiling.
+
+    scene = FakeScene.fromValidatorData(validator.toData())  # a scene the validator passes against
+    scene.setValue(scene.plug(longName, ("translate",)), [0.0, 1.0, 0.0])
+    validation.validateValidatorSourceNodes(validator, backend=FakeBackend(scene))
+
+Nodes are their longNames. A plug is identified by its path: the root attribute name followed by the element /
+child index steps of its plugData, eg: ("cvs", "[0]", ".1"). Each path is a plug of its own, a compound's children
+aren't tied to the compound's value.
+
+Removing and renaming nodes sends EVENT_* events to the scene's listeners, the way Maya's scene callbacks do,
+FakeBackend invalidates its plugCache from them.
+"""
+import logging
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import plugTypes as vrconst_plugTypes
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import backend as vrc_backend
+
+logger = logging.getLogger(__name__)
+
+_UNSETTABLE_TYPES = (vrconst_plugTypes.MESSAGE, vrconst_plugTypes.MATRIXF44, vrconst_plugTypes.STRING)
+
+EVENT_NODEREMOVED = "nodeRemoved"  # listener(EVENT_NODEREMOVED, longName, None)
+EVENT_NODERENAMED = "nodeRenamed"  # listener(EVENT_NODERENAMED, oldLongName, newLongName)
+
+plugPath = vrc_backend.plugPath
+
+
+def inferPlugType(value):
+    # type: (any) -> int
+    """The plug type of a serialized value, a value of None is taken as a message plug"""
+    if value is None:
+        return vrconst_plugTypes.MESSAGE
+    if isinstance(value, bool):
+        return vrconst_plugTypes.BOOL
+    if isinstance(value, int):
+        return vrconst_plugTypes.INT
+    if isinstance(value, float):
+        return vrconst_plugTypes.DOUBLE
+    if isinstance(value, (list, tuple)):
+        if len(value) == 16:
+            return vrconst_plugTypes.MATRIXF44
+        return [inferPlugType(eachValue) for eachValue in value]
+
+    return vrconst_plugTypes.STRING
+
+
+class FakePlug(object):
+    __slots__ = ("nodeLongName", "path", "plugType", "value", "source", "destinations")
+
+    def __init__(self, nodeLongName, path, value=None, plugType=None):
+        # type: (str, tuple[str], any, int) -> None
+        self.nodeLongName = nodeLongName
+        self.path = path
+        self.value = value
+        self.plugType = inferPlugType(value) if plugType is None else plugType
+        self.source = None  # FakePlug connected into this one
+        self.destinations = list()
+
+    def name(self):
+        # type: () -> str
+        return "%s.%s" % (self.nodeLongName, "".join(self.path))
+
+    def __repr__(self):
+        return "FakePlug(%s)" % self.name()
+
+
+class FakeScene(object):
+    def __init__(self):
+        self._nodes = dict()  # {longName: {path: FakePlug}}
+        self._listeners = list()
+
+    def addListener(self, listener):
+        # type: (callable) -> None
+        """listener(event, longName, newLongName) is called for each EVENT_*"""
+        self._listeners.append(listener)
+
+    def removeListener(self, listener):
+        # type: (callable) -> None
+        self._listeners.remove(listener)
+
+    def _emit(self, event, longName, newLongName=None):
+        # type: (str, str, str) -> None
+        for eachListener in list(self._listeners):
+            eachListener(event, longName, newLongName)
+
+    def hasNode(self, longName):
+        # type: (str) -> bool
+        return longName in self._nodes
+
+    def addNode(self, longName):
+        # type: (str) -> None
+        self._nodes.setdefault(longName, dict())
+
+    def removeNode(self, longName):
+        # type: (str) -> None
+        if longName not in self._nodes:
+            return
+
+        for eachPlug in self._nodes.pop(longName).values():
+            self.disconnect(eachPlug)
+            for eachDestination in list(eachPlug.destinations):
+                self.disconnect(eachDestination)
+
+        self._emit(EVENT_NODEREMOVED, longName)
+
+    def renameNode(self, longName, newLongName):
+        # type: (str, str) -> None
+        """Renames or reparents the node, its dag descendants are renamed along with it"""
+        renames = dict()
+        for eachLongName in self._nodes:
+            if eachLongName == longName:
+                renames[eachLongName] = newLongName
+            elif eachLongName.startswith(longName + "|"):
+                renames[eachLongName] = newLongName + eachLongName[len(longName):]
+
+        self._renameNodes(renames)
+
+    def renameNameSpace(self, nameSpace, newNameSpace):
+        # type: (str, str) -> None
+        """Moves the nodes of nameSpace to newNameSpace, eg: |grp|ns:ctrl -> |grp|newNs:ctrl"""
+        prefix = "%s:" % nameSpace
+        renames = dict()
+        for eachLongName in self._nodes:
+            names = eachLongName.split("|")
+            for x, eachName in enumerate(names):
+                leading = ":" if eachName.startswith(":") else ""
+                if eachName[len(leading):].startswith(prefix):
+                    names[x] = "%s%s:%s" % (leading, newNameSpace, eachName[len(leading) + len(prefix):])
+            newLongName = "|".join(names)
+            if newLongName != eachLongName:
+                renames[eachLongName] = newLongName
+
+        self._renameNodes(renames)
+
+    def _renameNodes(self, renames):
+        # type: (dict[str, str]) -> None
+        plugsByLongName = dict((eachLongName, self._nodes.pop(eachLongName)) for eachLongName in renames)
+        for eachLongName, plugs in plugsByLongName.items():
+            newLongName = renames[eachLongName]
+            for eachPlug in plugs.values():
+                eachPlug.nodeLongName = newLongName
+            self._nodes[newLongName] = plugs
+
+        for eachLongName, newLongName in renames.items():
+            self._emit(EVENT_NODERENAMED, eachLongName, newLongName)
+
+    def iterNodes(self):
+        # type: () -> Generator[str]
+        return iter(self._nodes)
+
+    def plug(self, longName, path):
+        # type: (str, tuple[str]) -> FakePlug
+        """:return: the plug at path, None if the node or plug doesn't exist"""
+        return self._nodes.get(longName, dict()).get(tuple(path), None)
+
+    def addPlug(self, longName, path, value=None, plugType=None):
+        # type: (str, tuple[str], any, int) -> FakePlug
+        """Adds the plug, and its node if need be. An existing plug keeps its connections and takes the value"""
+        path = tuple(path)
+        self.addNode(longName)
+        plugs = self._nodes[longName]
+        plug = plugs.get(path, None)
+        if plug is None:
+            plug = plugs[path] = FakePlug(longName, path, value=value, plugType=plugType)
+        else:
+            plug.value = value
+
+        return plug
+
+    def setValue(self, plug, value):
+        # type: (FakePlug, any) -> None
+        plug.value = value
+
+    def connect(self, srcPlug, destPlug):
+        # type: (FakePlug, FakePlug) -> None
+        self.disconnect(destPlug)
+        destPlug.source = srcPlug
+        srcPlug.destinations.append(destPlug)
+
+    def disconnect(self, destPlug):
+        # type: (FakePlug) -> None
+        if destPlug.source is None:
+            return
+
+        destPlug.source.destinations.remove(destPlug)
+        destPlug.source = None
+
+    def addValidatorData(self, data):
+        # type: (any) -> None
+        """Adds the nodes, plugs, values and connections a session list or a Validator.toData() expects"""
+        for eachValidatorData in [data] if isinstance(data, dict) else data:
+            for eachSourceNodeData in eachValidatorData.get(vrconst_serialization.KEY_VALIDATOR_NODES, list()):
+                self._addSourceNodeData(eachSourceNodeData)
+
+    def _addSourceNodeData(self, data):
+        # type: (dict) -> None
+        longName = data[vrconst_serialization.KEY_NODELONGNAME]
+        self.addNode(longName)
+        for eachData in data.get(vrconst_serialization.KEY_VAILIDITYNODES, list()):
+            nodeType = eachData.get(vrconst_serialization.KEY_NODETYPE, None)
+            if nodeType == vrconst_serialization.NT_DEFAULTVALUE:
+                for attrName, value in eachData.get(vrconst_serialization.KEY_DEFAULTVALUEDATA, dict()).items():
+                    self.addPlug(eachData[vrconst_serialization.KEY_NODELONGNAME], (attrName,), value)
+                continue
+
+            connectionData = eachData.get(vrconst_serialization.KEY_CONNDATA, dict())
+            srcData = connectionData["srcData"]
+            destData = connectionData["destData"]
+            self.addNode(eachData[vrconst_serialization.KEY_NODELONGNAME])
+            srcPlug = self.addPlug(
+                longName, self._connectionPath(srcData.get("attrName", None), srcData["plugData"]),
+                srcData.get("attrValue", None),
+            )
+            destPlug = self.addPlug(
+                destData["nodeLongName"], self._connectionPath(destData["plugData"][0][2], destData["plugData"]),
+                destData.get("attrValue", None),
+            )
+            self.connect(srcPlug, destPlug)
+
+    @staticmethod
+    def _connectionPath(attrName, plugData):
+        # type: (str, list) -> tuple[str]
+        # Matches Backend.resolvePlug
+        isElement, isChild, _, _ = plugData[0]
+        if isElement or isChild:
+            return plugPath(plugData)
+
+        return (attrName,)
+
+    @classmethod
+    def fromValidatorData(cls, data):
+        # type: (any) -> FakeScene
+        """:return: a scene the validators of data pass against"""
+        inst = cls()
+        inst.addValidatorData(data)
+
+        return inst
+
+
+class FakeModifier(object):
+    def __init__(self, scene):
+        # type: (FakeScene) -> None
+        self._scene = scene
+        self._connections = list()
+
+    def connect(self, srcPlug, destPlug):
+        # type: (FakePlug, FakePlug) -> None
+        self._connections.append((srcPlug, destPlug))
+
+    def doIt(self):
+        # type: () -> None
+        for srcPlug, destPlug in self._connections:
+            if srcPlug is not None and destPlug is not None:
+                self._scene.connect(srcPlug, destPlug)
+
+        del self._connections[:]
+
+
+class FakeBackend(vrc_backend.Backend):
+    """Plugs are FakePlugs, a missing plug is None"""
+
+    def __init__(self, scene, plugCacheSize=vrconst_constants.PLUG_CACHE_SIZE):
+        # type: (FakeScene, int) -> None
+        super(FakeBackend, self).__init__(plugCacheSize=plugCacheSize)
+        self._scene = scene
+        self._scene.addListener(self._sceneChanged)
+
+    def _sceneChanged(self, event, longName, newLongName):
+        # type: (str, str, str) -> None
+        self.plugCache.invalidateNode(longName)
+
+    @property
+    def scene(self):
+        return self._scene
+
+    def exists(self, nodeLongName):
+        # type: (str) -> bool
+        return self._scene.hasNode(nodeLongName)
+
+    def _checkNode(self, nodeLongName):
+        if not self._scene.hasNode(nodeLongName):
+            raise RuntimeError("\t FAILED! %s does not exist!" % nodeLongName)
+
+    def findPlug(self, nodeLongName, plugName):
+        # type: (str, str) -> FakePlug
+        self._checkNode(nodeLongName)
+        if isinstance(plugName, list):
+            plugName = plugName[0]
+
+        return self._scene.plug(nodeLongName, (plugName,))
+
+    def plugFromPlugData(self, nodeLongName, plugData):
+        # type: (str, list) -> FakePlug
+        self._checkNode(nodeLongName)
+        return self._scene.plug(nodeLongName, plugPath(plugData))
+
+    def plugName(self, plug):
+        # type: (FakePlug) -> str
+        return "None" if plug is None else plug.name()
+
+    def plugType(self, plug):
+        # type: (FakePlug) -> int
+        return None if plug is None else plug.plugType
+
+    def plugValue(self, plug):
+        # type: (FakePlug) -> any
+        return None if plug is None else plug.value
+
+    def setPlugValue(self, plug, value):
+        # type: (FakePlug, any) -> bool
+        if plug is None or plug.source is not None or plug.plugType in _UNSETTABLE_TYPES:
+            return False
+
+        self._scene.setValue(plug, value)
+        return True
+
+    def isDestination(self, plug):
+        # type: (FakePlug) -> bool
+        return plug is not None and plug.source is not None
+
+    def connectedSource(self, plug):
+        # type: (FakePlug) -> FakePlug
+        return None if plug is None else plug.source
+
+    def createModifier(self):
+        # type: () -> FakeModifier
+        return FakeModifier(self._scene)
@@ -0,0 +1,148 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Change journal of a Validator.
+
+The validator records every sourceNode add / removal and namespace retarget here, and its nodes record their own
+value updates (name, longName, displayName, connectionData, defaultValueData). Each entry gets an increasing serial
+so consumers (savers, UI refreshes, incremental validation) can remember the serial they last processed and only
+look at what changed since. Validator.markClean clears the journal, eg: after a save.
+
+Entries hold their node, which keeps it alive until markClean. A validator that doesn't keep its sourceNodes in memory
+(PagedValidator) releases them once their changes are on disk, the entries then hold the sourceNode's key instead.
+"""
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_ADDED = "added"
+JOURNAL_REMOVED = "removed"
+JOURNAL_UPDATED = "updated"
+JOURNAL_NAMESPACE = "nameSpace"
+
+
+class JournalEntry(object):
+    __slots__ = ("serial", "kind", "node", "value", "key")
+
+    def __init__(self, serial, kind, node=None, value=None):
+        # type: (int, str, Node, any) -> None
+        self.serial = serial
+        self.kind = kind
+        self.node = node
+        self.value = value
+        # key of the node's sourceNode once the journal released the node, see ChangeJournal.release
+        self.key = None
+
+    def __repr__(self):
+        return "JournalEntry(%s, %s, %s, %s)" % (
+            self.serial, self.kind, self.node.longName if self.node is not None else self.key, self.value
+        )
+
+
+class ChangeJournal(object):
+    __slots__ = ("_entries", "_serial")
+
+    def __init__(self):
+        self._entries = list()
+        self._serial = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def serial(self):
+        """The serial of the last recorded entry"""
+        return self._serial
+
+    def record(self, kind, node=None, value=None):
+        # type: (str, Node, any) -> int
+        self._serial += 1
+        self._entries.append(JournalEntry(self._serial, kind, node, value))
+
+        return self._serial
+
+    def iterEntries(self, since=0, kind=None):
+        # type: (int, str) -> Generator[JournalEntry]
+        """
+        Args:
+            since: only yield the entries recorded after this serial
+            kind: only yield the entries of this JOURNAL_ kind
+        """
+        for eachEntry in self._entries:
+            if eachEntry.serial <= since:
+                continue
+            if kind is not None and eachEntry.kind != kind:
+                continue
+
+            yield eachEntry
+
+    def changedSourceNodes(self, since=0, resolve=None):
+        # type: (int, callable) -> list[SourceNode]
+        """
+        :return: the sourceNodes added or updated since the serial, in the order they were first touched
+
+        Args:
+            resolve: returns the sourceNode of a key, for the entries of released sourceNodes. They're skipped
+                without it, see Validator.changedSourceNodes
+        """
+        sourceNodes = OrderedDict()
+        resolved = dict()
+        for eachEntry in self.iterEntries(since):
+            if eachEntry.kind not in (JOURNAL_ADDED, JOURNAL_UPDATED):
+                continue
+
+            node = eachEntry.node
+            if node is None:
+                if resolve is None:
+                    continue
+                if eachEntry.key not in resolved:
+                    resolved[eachEntry.key] = resolve(eachEntry.key)
+                node = resolved[eachEntry.key]
+                if node is None:
+                    continue
+
+            while node.parent is not None:
+                node = node.parent
+            sourceNodes[node] = None
+
+        return list(sourceNodes)
+
+    def release(self, keys):
+        # type: (dict[int, str]) -> None
+        """
+        Swaps the node of the added / updated entries under the given sourceNodes for the sourceNode's key, so the
+        journal no longer keeps them alive.
+
+        Args:
+            keys: key of each released sourceNode, by id of the sourceNode
+        """
+        if not keys:
+            return
+
+        for eachEntry in self._entries:
+            node = eachEntry.node
+            if node is None or eachEntry.kind not in (JOURNAL_ADDED, JOURNAL_UPDATED):
+                continue
+
+            while node.parent is not None:
+                node = node.parent
+            key = keys.get(id(node), None)
+            if key is not None:
+                eachEntry.node = None
+                eachEntry.key = key
+
+    def renameKey(self, key, newKey):
+        # type: (str, str) -> None
+        """Follows a released sourceNode being renamed"""
+        for eachEntry in self._entries:
+            if eachEntry.key == key:
+                eachEntry.key = newKey
+
+    def discard(self, since):
+        # type: (int) -> None
+        """Drops the entries recorded after the serial, eg: the adds of a LazyValidator hydrating from its file."""
+        self._entries = [eachEntry for eachEntry in self._entries if eachEntry.serial <= since]
+
+    def clear(self):
+        """Drops the entries, the serial keeps counting so serials held by consumers stay valid."""
+        del self._entries[:]
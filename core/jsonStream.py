@@ -0,0 +1,324 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Incremental reader for validator .json files.
+
+parser.read json.loads a whole session file, so a multi validator save of a few hundred MB peaks at roughly double
+that while loading. JSONStreamReader walks the file in chunks instead and decodes one element at a time with the
+decoder's raw_decode, so iterValidatorData can hand out one validator header at a time, with its sourceNodes as a
+generator that decodes a single sourceNode dict per step.
+
+The bytes are decoded as latin-1 so a position in the buffer is always the byte offset in the file, which is what
+the sourceNode generators seek to. JSON is utf-8 though, so an element holding non ascii bytes is decoded a
+second time from utf-8.
+"""
+import logging
+import re
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import compression as vrc_compression
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+_WHITESPACE = " \t\n\r"
+_NON_ASCII = re.compile(u"[^\x00-\x7f]")
+# A complete string, a bracket, or the opening quote of a string running past the end of the buffer.
+_SKIP_TOKEN = re.compile(u'"[^"\\\\]*(?:\\\\.[^"\\\\]*)*"|[\\[\\]{}"]', re.DOTALL)
+
+
+class JSONStreamReader(object):
+    def __init__(self, fileObj, chunkSize=CHUNK_SIZE):
+        # type: (file, int) -> None
+        """
+        Args:
+            fileObj: file opened in binary mode
+        """
+        self._file = fileObj
+        self._chunkSize = chunkSize
+        self._decoder = json.JSONDecoder()
+        self._buffer = u""
+        self._bufferOffset = fileObj.tell()  # file offset of self._buffer[0]
+        self._pos = 0
+        self._eof = False
+
+    @property
+    def offset(self):
+        """Byte offset in the file of the next character to be read"""
+        return self._bufferOffset + self._pos
+
+    def seek(self, offset):
+        # type: (int) -> None
+        self._file.seek(offset)
+        self._buffer = u""
+        self._bufferOffset = offset
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size=None):
+        # type: (int) -> bool
+        """Reads another chunk into the buffer, dropping what has been consumed. :return: False at the end of file"""
+        if self._eof:
+            return False
+
+        chunk = self._file.read(size or self._chunkSize)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._bufferOffset += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk.decode("latin-1")
+        self._pos = 0
+        return True
+
+    def peek(self):
+        # type: () -> str
+        """:return: the next non whitespace character without consuming it, "" at the end of file"""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        # type: (str) -> None
+        found = self.peek()
+        if found != char:
+            raise ValueError("Expected %r at offset %s, found %r" % (char, self.offset, found))
+        self._pos += 1
+
+    def decodeValue(self):
+        # type: () -> any
+        """Decodes the next JSON value, reading more of the file until the buffer holds all of it."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Grow the read with the buffer so a large element isn't retried once per chunk.
+                if self._fill(max(self._chunkSize, len(self._buffer))):
+                    continue
+                raise
+
+            # A number running into the end of the buffer may carry on in the next chunk.
+            if end == len(self._buffer) and self._fill():
+                continue
+            break
+
+        text = self._buffer[self._pos:end]
+        if _NON_ASCII.search(text):
+            value, _ = self._decoder.raw_decode(text.encode("latin-1").decode("utf-8"))
+        self._pos = end
+
+        return value
+
+    def skipValue(self):
+        """Moves past the next JSON value without decoding it."""
+        char = self.peek()
+        if char not in "[{":
+            self.decodeValue()
+            return
+
+        # Jump from token to token with a regex, whole strings are matched in one go. Walking a large value a
+        # character at a time dominated skipping.
+        depth = 0
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while True:
+                match = _SKIP_TOKEN.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+
+                token = match.group()
+                if token == '"':
+                    # The string carries on in the next chunk, read it again from its start.
+                    pos = match.start()
+                    break
+
+                pos = match.end()
+                if token in "[{":
+                    depth += 1
+                elif token in "]}":
+                    depth -= 1
+                    if not depth:
+                        self._pos = pos
+                        return
+
+            self._pos = pos
+            if not self._fill(max(self._chunkSize, len(self._buffer))):
+                raise ValueError("Unexpected end of file inside a value")
+
+    def iterArray(self):
+        # type: () -> Generator[int]
+        """
+        Walks the elements of the next JSON array. Yields the file offset of each element, the caller has to
+        consume the element (decodeValue / skipValue) before asking for the next one.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            self.peek()
+            yield self.offset
+            char = self.peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("Expected ',' or ']' at offset %s, found %r" % (self.offset - 1, char))
+
+    def iterObject(self):
+        # type: () -> Generator[str]
+        """
+        Walks the members of the next JSON object. Yields each key with the reader positioned on its value, which
+        the caller has to consume before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self.decodeValue()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError("Expected ',' or '}' at offset %s, found %r" % (self.offset - 1, char))
+
+
+def iterArrayValues(filepath, offset):
+    # type: (str, int) -> Generator[any]
+    """Decodes the elements of the array starting at offset one at a time, using its own file handle."""
+    with vrc_compression.openRead(filepath) as f:
+        f.seek(offset)
+        reader = JSONStreamReader(f)
+        for _ in reader.iterArray():
+            yield reader.decodeValue()
+
+
+def _readValidatorHeader(reader, filepath):
+    # type: (JSONStreamReader, str) -> dict
+    header = dict()
+    for key in reader.iterObject():
+        if key == vrconst_serialization.KEY_VALIDATOR_NODES:
+            nodesOffset = reader.offset
+            reader.skipValue()
+            header[key] = iterArrayValues(filepath, nodesOffset)
+        else:
+            header[key] = reader.decodeValue()
+
+    return header
+
+
+def _readValidatorSummary(reader):
+    # type: (JSONStreamReader) -> dict
+    header = dict()
+    for key in reader.iterObject():
+        if key == vrconst_serialization.KEY_VALIDATOR_NODES:
+            header[vrconst_serialization.KEY_VALIDATOR_NODESOFFSET] = reader.offset
+            nodeCount = 0
+            for _ in reader.iterArray():
+                reader.skipValue()
+                nodeCount += 1
+            header[vrconst_serialization.KEY_VALIDATOR_NODECOUNT] = nodeCount
+        else:
+            header[key] = reader.decodeValue()
+
+    return header
+
+
+def iterValidatorHeaders(filepath):
+    # type: (str) -> Generator[dict]
+    """
+    Yields one header per validator without decoding any sourceNode, the sourceNodes are only skipped over to count
+    them. KEY_VALIDATOR_NODESOFFSET is the byte offset of the sourceNodes array, see iterArrayValues.
+    """
+    logger.debug("Reading validator headers from %s" % filepath)
+    with vrc_compression.openRead(filepath) as f:
+        reader = JSONStreamReader(f)
+        if reader.peek() == "{":
+            yield _readValidatorSummary(reader)
+            return
+
+        for _ in reader.iterArray():
+            yield _readValidatorSummary(reader)
+
+
+def _readValidatorIndex(reader):
+    # type: (JSONStreamReader) -> tuple[str, int, list]
+    name = None
+    version = 0
+    nodes = list()
+    for key in reader.iterObject():
+        if key == vrconst_serialization.KEY_VALIDATOR_NAME:
+            name = reader.decodeValue()
+        elif key == vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION:
+            version = reader.decodeValue()
+        elif key == vrconst_serialization.KEY_VALIDATOR_NODES:
+            for offset in reader.iterArray():
+                longName = None
+                for nodeKey in reader.iterObject():
+                    if nodeKey == vrconst_serialization.KEY_NODELONGNAME:
+                        longName = reader.decodeValue()
+                    else:
+                        reader.skipValue()
+                nodes.append((longName, offset, reader.offset - offset))
+        else:
+            reader.skipValue()
+
+    return name, version, nodes
+
+
+def iterValidatorIndex(filepath):
+    # type: (str) -> Generator[tuple[str, int, list]]
+    """
+    Yields (validatorName, schemaVersion, [(sourceNode longName, byte offset, byte length)]) per validator,
+    decoding nothing but the names and version. See offsetIndex.
+    """
+    with vrc_compression.openRead(filepath) as f:
+        reader = JSONStreamReader(f)
+        if reader.peek() == "{":
+            yield _readValidatorIndex(reader)
+            return
+
+        for _ in reader.iterArray():
+            yield _readValidatorIndex(reader)
+
+
+def isSession(filepath):
+    # type: (str) -> bool
+    """:return: True for a session save (a list of validators), False for a single Validator.toData() file"""
+    with vrc_compression.openRead(filepath) as f:
+        return JSONStreamReader(f, chunkSize=256).peek() == "["
+
+
+def iterValidatorData(filepath):
+    # type: (str) -> Generator[dict]
+    """
+    Yields one dict per validator in a session save (list of validators) or a single Validator.toData() file.
+    The dicts hold everything but the sourceNodes as usual, KEY_VALIDATOR_NODES is a generator decoding one
+    sourceNode dict at a time, so it can be passed straight to Validator.fromData.
+    """
+    logger.debug("Streaming data from %s" % filepath)
+    with vrc_compression.openRead(filepath) as f:
+        reader = JSONStreamReader(f)
+        if reader.peek() == "{":
+            yield _readValidatorHeader(reader, filepath)
+            return
+
+        for _ in reader.iterArray():
+            yield _readValidatorHeader(reader, filepath)
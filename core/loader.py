@@ -0,0 +1,99 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Loads many validator files at once on a pool of threads.
+
+Parsing is mostly file I/O (validators often live on a network filer) and zlib / gzip decompression, both of which
+run outside of the GIL, so loading a rig's worth of files in parallel cuts the wall time even in a single process.
+
+A Validator is a QObject, which belongs to the thread it was created in. The workers move each validator to the
+thread passed as `thread` (the GUI thread by default, when there's a QCoreApplication) before handing it back, so
+its signals are delivered there.
+"""
+import logging
+from multiprocessing.pool import ThreadPool
+
+from PySide2 import QtCore
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import delta as vrc_delta
+from validateRig.core import factory as vrc_factory
+from validateRig.core import parser as vrc_parser
+
+logger = logging.getLogger(__name__)
+
+
+def _defaultThread():
+    # type: () -> QtCore.QThread
+    app = QtCore.QCoreApplication.instance()
+    if app is None:
+        return None
+
+    return app.thread()
+
+
+def loadFile(filepath, lazy=False, thread=None):
+    # type: (str, bool, QtCore.QThread) -> list[Validator]
+    """
+    Args:
+        filepath: a session save or a single validator file of any supported format, or a delta file
+        lazy: only read the headers, see LazyValidator. Otherwise the validators are fully hydrated. Ignored for
+            delta files, see delta.
+        thread: move the validators to this thread once they're loaded
+    :return: the file's validators in file order
+    """
+    validators = list()
+    if vrc_delta.isDeltaFile(filepath):
+        # A delta has to be applied to its base as a whole, it can't be read lazily
+        revision = vrc_delta.read(filepath)
+        for eachData in [revision] if isinstance(revision, dict) else revision:
+            name = eachData.get(vrconst_serialization.KEY_VALIDATOR_NAME, "")
+            validators.append(vrc_factory.createValidator(name=name, data=eachData))
+    elif lazy:
+        for eachHeader in vrc_parser.iterReadHeaders(filepath):
+            validators.append(vrc_factory.createLazyValidator(filepath, eachHeader))
+    else:
+        for eachData in vrc_parser.iterRead(filepath):
+            name = eachData.get(vrconst_serialization.KEY_VALIDATOR_NAME, "")
+            validators.append(vrc_factory.createValidator(name=name, data=eachData))
+
+    if thread is not None:
+        for eachValidator in validators:
+            eachValidator.moveToThread(thread)
+
+    return validators
+
+
+def iterLoadFiles(filepaths, workers=vrconst_constants.LOAD_WORKERS, lazy=False, thread=None):
+    # type: (list[str], int, bool, QtCore.QThread) -> Generator[tuple[str, list[Validator]]]
+    """
+    Yields (filepath, validators) as each file finishes loading, in completion order.
+    See loadFile for the arguments, thread defaults to the QCoreApplication's thread.
+    """
+    if thread is None:
+        thread = _defaultThread()
+
+    def load(filepath):
+        return filepath, loadFile(filepath, lazy=lazy, thread=thread)
+
+    pool = ThreadPool(max(1, min(workers, len(filepaths))))
+    try:
+        for result in pool.imap_unordered(load, filepaths):
+            yield result
+    finally:
+        pool.terminate()
+
+
+def loadFiles(filepaths, workers=vrconst_constants.LOAD_WORKERS, lazy=False, thread=None):
+    # type: (list[str], int, bool, QtCore.QThread) -> list[Validator]
+    """:return: the validators of every file, in the order of filepaths. See iterLoadFiles"""
+    filepaths = list(filepaths)
+    if not filepaths:
+        return list()
+
+    byFilepath = dict(iterLoadFiles(filepaths, workers=workers, lazy=lazy, thread=thread))
+    validators = list()
+    for eachFilepath in filepaths:
+        validators.extend(byFilepath[eachFilepath])
+
+    return validators
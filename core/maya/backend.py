@@ -0,0 +1,148 @@
+#  Copyright (c) 2020.  James Dunlop
+import logging
+
+import maya.api.OpenMaya as om2
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import plugTypes as vrconst_plugTypes
+from validateRig.core import backend as vrc_backend
+from validateRig.core.maya import utils as vrcm_utils
+from validateRig.core.maya import plugs as vrcm_plugs
+
+logger = logging.getLogger(__name__)
+
+_mayaBackend = None  # See getMayaBackend
+
+
+def getMayaBackend():
+    # type: () -> MayaBackend
+    """:return: the MayaBackend validation uses, shared so its plugCache and scene callbacks exist only once"""
+    global _mayaBackend
+    if _mayaBackend is None:
+        _mayaBackend = MayaBackend()
+
+    return _mayaBackend
+
+
+class MayaBackend(vrc_backend.Backend):
+    """
+    Plugs are om2.MPlugs, a missing plug is a null om2.MPlug().
+    The plugCache is invalidated from scene callbacks, see installCallbacks.
+    """
+
+    def __init__(self, plugCacheSize=vrconst_constants.PLUG_CACHE_SIZE, installCallbacks=True):
+        # type: (int, bool) -> None
+        super(MayaBackend, self).__init__(plugCacheSize=plugCacheSize)
+        self._callbackIds = list()
+        if installCallbacks:
+            self.installCallbacks()
+
+    def installCallbacks(self):
+        # type: () -> None
+        """Invalidates the cached plugs of nodes deleted, renamed, reparented or re-namespaced"""
+        if self._callbackIds:
+            return
+
+        self._callbackIds = [
+            om2.MNodeMessage.addNameChangedCallback(om2.MObject.kNullObj, self._nameChanged),
+            om2.MDGMessage.addNodeRemovedCallback(self._nodeRemoved, "dependNode"),
+            om2.MDagMessage.addParentAddedCallback(self._parentAdded),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeNew, self._sceneCleared),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeOpen, self._sceneCleared),
+        ]
+
+    def removeCallbacks(self):
+        # type: () -> None
+        if self._callbackIds:
+            om2.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = list()
+
+    def _nameChanged(self, mObj, prevName, clientData=None):
+        # Renaming a node or its namespace changes its longName and those of its descendants
+        if prevName:
+            self.plugCache.invalidateName(prevName)
+
+    def _nodeRemoved(self, mObj, clientData=None):
+        self.plugCache.invalidateName(om2.MFnDependencyNode(mObj).name())
+
+    def _parentAdded(self, child, parent, clientData=None):
+        self.plugCache.invalidateName(child.partialPathName())
+
+    def _sceneCleared(self, clientData=None):
+        self.plugCache.clear()
+
+    def exists(self, nodeLongName):
+        # type: (str) -> bool
+        return vrcm_utils.exists(nodeLongName)
+
+    def findPlug(self, nodeLongName, plugName):
+        # type: (str, str) -> om2.MPlug
+        try:
+            return vrcm_plugs.getMPlugFromLongName(nodeLongName, plugName)
+        except Exception as e:
+            raise RuntimeError(str(e))
+
+    def plugFromPlugData(self, nodeLongName, plugData):
+        # type: (str, list) -> om2.MPlug
+        return vrcm_plugs.fetchMPlugFromConnectionData(nodeLongName, plugData)
+
+    def resolveNodes(self, nodeLongNames):
+        # type: (Iterable[str]) -> dict[str, om2.MObjectHandle]
+        return vrcm_plugs.getMObjectHandles(nodeLongNames)
+
+    def nodePlug(self, node, plugName):
+        # type: (om2.MObjectHandle, str) -> om2.MPlug
+        return vrcm_plugs.getMPlugFromMObject(node.object(), plugName)
+
+    def nodePlugFromPlugData(self, node, plugData):
+        # type: (om2.MObjectHandle, list) -> om2.MPlug
+        return vrcm_plugs.fetchMPlugFromPlugData(node.object(), plugData)
+
+    def isNullPlug(self, plug):
+        # type: (om2.MPlug) -> bool
+        return plug.isNull
+
+    def plugName(self, plug):
+        # type: (om2.MPlug) -> str
+        return plug.name()
+
+    def plugType(self, plug):
+        # type: (om2.MPlug) -> int
+        return vrcm_plugs.getMPlugType(plug)
+
+    def plugValue(self, plug):
+        # type: (om2.MPlug) -> any
+        return vrcm_plugs.getMPlugValue(plug)
+
+    def valueMatches(self, plug, value):
+        # type: (om2.MPlug, any) -> bool
+        if self.plugType(plug) == vrconst_plugTypes.MATRIXF44:
+            # Matrices are saved flattened
+            value = om2.MMatrix((
+                (value[0], value[1], value[2], value[3]),
+                (value[4], value[5], value[6], value[7]),
+                (value[8], value[9], value[10], value[11]),
+                (value[12], value[13], value[14], value[15]),
+            ))
+
+        return value == self.plugValue(plug)
+
+    def setPlugValue(self, plug, value):
+        # type: (om2.MPlug, any) -> bool
+        return vrcm_plugs.setMPlugValue(plug, value)
+
+    def isDestination(self, plug):
+        # type: (om2.MPlug) -> bool
+        return plug.isDestination
+
+    def connectedSource(self, plug):
+        # type: (om2.MPlug) -> om2.MPlug
+        conns = plug.connectedTo(True, False)
+        if not conns:
+            return None
+
+        return conns[0]
+
+    def createModifier(self):
+        # type: () -> om2.MDagModifier
+        return om2.MDagModifier()
@@ -194,22 +194,32 @@ def setMPlugValue(mplug, value):
     return status
 
 
-def getMPlugFromLongName(nodeLongName, plugName):
-    # type: (str, str) -> om2.MPlug
-    import maya.cmds as cmds
+def getMObjectHandles(nodeLongNames):
+    # type: (Iterable[str]) -> dict
+    """
+    Resolves many nodes in one pass, without a cmds.objExists per node.
+
+    :return: {nodeLongName: om2.MObjectHandle} of the nodes that exist
+    """
+    handles = dict()
+    mSel = om2.MSelectionList()
+    for eachLongName in set(nodeLongNames):
+        mSel.clear()
+        try:
+            mSel.add(str(eachLongName))
+        except RuntimeError:
+            continue
+
+        handles[eachLongName] = om2.MObjectHandle(mSel.getDependNode(0))
+
+    return handles
 
+
+def getMPlugFromMObject(mObj, plugName):
+    # type: (om2.MObject, str) -> om2.MPlug
     if isinstance(plugName, list):
         plugName = plugName[0]
 
-    mSel = om2.MSelectionList()
-    if not cmds.objExists(nodeLongName):
-        raise Exception("\t FAILED! %s does not exist!" % nodeLongName)
-    try:
-        mSel.add(str(nodeLongName))
-    except RuntimeError:
-        raise Exception("\t FAILED! %s does not exist!" % nodeLongName)
-
-    mObj = mSel.getDependNode(0)
     mFn = om2.MFnDependencyNode(mObj)
     try: #For missing plugs we need to mark these as failed and not RuntimeError fail!
         mplug = mFn.findPlug(plugName, False)
@@ -220,6 +230,21 @@ def getMPlugFromLongName(nodeLongName, plugName):
     return mplug
 
 
+def getMPlugFromLongName(nodeLongName, plugName):
+    # type: (str, str) -> om2.MPlug
+    import maya.cmds as cmds
+
+    mSel = om2.MSelectionList()
+    if not cmds.objExists(nodeLongName):
+        raise Exception("\t FAILED! %s does not exist!" % nodeLongName)
+    try:
+        mSel.add(str(nodeLongName))
+    except RuntimeError:
+        raise Exception("\t FAILED! %s does not exist!" % nodeLongName)
+
+    return getMPlugFromMObject(mSel.getDependNode(0), plugName)
+
+
 def getMPlugElementFromLongName(nodeLongName, plugName, index, useLogicalIndex=True):
     # type: (str, str, int, bool) -> om2.MPlug
     parentPlug = getMPlugFromLongName(nodeLongName, plugName)
@@ -318,6 +343,18 @@ def fetchIndexedPlugData(mplug, plgData=None):
 
 
 def fetchMPlugFromConnectionData(nodeLongName, plugData):
+    # type: (str, list) -> om2.MPlug
+    return _fetchMPlugFromPlugData(nodeLongName, plugData, getMPlugFromLongName)
+
+
+def fetchMPlugFromPlugData(mObj, plugData):
+    # type: (om2.MObject, list) -> om2.MPlug
+    """fetchMPlugFromConnectionData on a node from getMObjectHandles"""
+    return _fetchMPlugFromPlugData(mObj, plugData, getMPlugFromMObject)
+
+
+def _fetchMPlugFromPlugData(node, plugData, getRootMPlug):
+    # type: (any, list, callable) -> om2.MPlug
     copyPlugData = plugData[:]
     mPlug = None
 
@@ -328,8 +365,8 @@ def fetchMPlugFromConnectionData(nodeLongName, plugData):
         logger.debug("\t%-- s %s %s %s" % (plgIsElement, plgIsChild, plgPlugName, plgIndex))
 
         if mPlug is None:
-            logger.debug("\tFinding plug: %s on %s " % (plgPlugName, nodeLongName))
-            mPlug = getMPlugFromLongName(nodeLongName, plgPlugName)
+            logger.debug("\tFinding plug: %s on %s " % (plgPlugName, node))
+            mPlug = getRootMPlug(node, plgPlugName)
             logger.debug("\tmPlug: %s " % (mPlug))
             if plgIsElement:
                 mPlug = mPlug.elementByLogicalIndex(plgIndex)
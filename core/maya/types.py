@@ -1,9 +1,3 @@
 #  Copyright (c) 2020.  James Dunlop
-MESSAGE = 10
-FLOAT = 20
-INT = 30
-SHORT = 40
-DOUBLE = 50
-MATRIXF44 = 60
-BOOL = 70
-STRING = 80
+# The plug types live with the backends now, see const/plugTypes.py
+from validateRig.const.plugTypes import MESSAGE, FLOAT, INT, SHORT, DOUBLE, MATRIXF44, BOOL, STRING
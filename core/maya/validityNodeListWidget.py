@@ -3,6 +3,7 @@ import logging
 from PySide2 import QtCore
 from validateRig.uiElements.dialogs import validityNodeWidgets as vruied_validityNodeWidgets
 from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
 from validateRig.core.nodes import DefaultValueNode, ConnectionValidityNode, SourceNode
 from validateRig.core.maya import plugs as vrcm_plugs
 from validateRig.core.maya import utils as vrcm_utils
@@ -127,7 +128,7 @@ class MayaValidityNodesSelector(vruied_validityNodeWidgets.BaseSourceNodeValidit
         # type: (QtWidgets.QListWidget) -> list[ConnectionValidityNode]
         nodes = list()
         if self.sourceNode() is not None:
-            connectionNodes = [n for n in self.sourceNode().iterChildren() if isinstance(n, ConnectionValidityNode)]
+            connectionNodes = list(self.sourceNode().iterChildren(vrconst_serialization.NT_CONNECTIONVALIDITY))
 
         for eachConnPair in connectionsListWidget.selectedItems():
             destNodeName, destLongName, connectionData = self._connectionData[eachConnPair.text()]
@@ -0,0 +1,106 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Schema migrations of validator data.
+
+Validator.toData stamps KEY_VALIDATOR_SCHEMAVERSION with SCHEMA_VERSION, files saved before the key existed are
+version 0. A migration upgrades data from one version to the next and is registered for the version it upgrades
+from, either for the validator dict (its header keys, not the sourceNodes) or for each sourceNode dict:
+
+    @registerSourceNodeMigration(1)
+    def _renameSomething(sourceNodeData):
+        sourceNodeData["new"] = sourceNodeData.pop("old")
+        return sourceNodeData
+
+Migrations edit the dict in place and return it. The sourceNodes are migrated one at a time as they are hydrated
+(Validator.fromData, LazyValidator.hydrate, offsetIndex), in the same pass, so an old file is never rewritten or
+held in memory as a whole to be upgraded. Data that is already current skips the registry entirely.
+"""
+import logging
+
+from validateRig.const import serialization as vrconst_serialization
+
+logger = logging.getLogger(__name__)
+
+_VALIDATOR_MIGRATIONS = dict()  # {fromVersion: [func(validatorData) -> validatorData]}
+_SOURCENODE_MIGRATIONS = dict()  # {fromVersion: [func(sourceNodeData) -> sourceNodeData]}
+
+
+def registerValidatorMigration(fromVersion):
+    # type: (int) -> callable
+    """Decorator registering func(validatorData) -> validatorData to upgrade fromVersion to fromVersion + 1"""
+
+    def register(func):
+        _VALIDATOR_MIGRATIONS.setdefault(fromVersion, list()).append(func)
+        return func
+
+    return register
+
+
+def registerSourceNodeMigration(fromVersion):
+    # type: (int) -> callable
+    """Decorator registering func(sourceNodeData) -> sourceNodeData to upgrade fromVersion to fromVersion + 1"""
+
+    def register(func):
+        _SOURCENODE_MIGRATIONS.setdefault(fromVersion, list()).append(func)
+        return func
+
+    return register
+
+
+def schemaVersion(data):
+    # type: (dict) -> int
+    """:return: the schema version of validator data or a header, 0 if it predates versioning"""
+    version = data.get(vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION, 0)
+    if version > vrconst_serialization.SCHEMA_VERSION:
+        raise ValueError(
+            "Validator data is schema version %s, this validateRig reads up to version %s!"
+            % (version, vrconst_serialization.SCHEMA_VERSION)
+        )
+
+    return version
+
+
+def migrateValidatorData(data):
+    # type: (dict) -> tuple[dict, int]
+    """
+    Upgrades the validator's own keys in place, its sourceNodes are left to migrateSourceNodes.
+    :return: the data and the version it was saved as, which is what migrateSourceNodes needs
+    """
+    version = schemaVersion(data)
+    for eachVersion in range(version, vrconst_serialization.SCHEMA_VERSION):
+        for eachMigration in _VALIDATOR_MIGRATIONS.get(eachVersion, ()):
+            data = eachMigration(data)
+
+    if version != vrconst_serialization.SCHEMA_VERSION:
+        data[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+
+    return data, version
+
+
+def migrateSourceNodeData(sourceNodeData, version):
+    # type: (dict, int) -> dict
+    """
+    Args:
+        version: the schema version the sourceNode was saved as, see migrateValidatorData
+    """
+    for eachVersion in range(version, vrconst_serialization.SCHEMA_VERSION):
+        for eachMigration in _SOURCENODE_MIGRATIONS.get(eachVersion, ()):
+            sourceNodeData = eachMigration(sourceNodeData)
+
+    return sourceNodeData
+
+
+def migrateSourceNodes(sourceNodes, version):
+    # type: (Iterable[dict], int) -> Iterable[dict]
+    """:return: sourceNodes upgraded one at a time as they are iterated, sourceNodes itself if already current"""
+    if version == vrconst_serialization.SCHEMA_VERSION:
+        return sourceNodes
+
+    return (migrateSourceNodeData(eachData, version) for eachData in sourceNodes)
+
+
+@registerValidatorMigration(0)
+def _addSchemaVersion(data):
+    # type: (dict) -> dict
+    # Version 1 only introduced KEY_VALIDATOR_SCHEMAVERSION, which migrateValidatorData stamps.
+    return data
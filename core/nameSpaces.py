@@ -0,0 +1,239 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Namespace relative longNames.
+
+A Validator's nodes all live under one character namespace, eg: |rig|myChar:root|myChar:body_ctrl. Instead of
+storing that namespace in every longName, the longName is split on "myChar:" once and kept as a RelativeName, a
+tuple of the parts around the namespace that is joined back with the NameSpaceContext's current namespace when read.
+
+Retargeting every node to a new namespace is then just setting NameSpaceContext.nameSpace, which bumps a version
+counter. Each RelativeName caches its resolved string along with the version it was resolved for, so a name is only
+joined again the first time it is read after a retarget.
+
+The context also holds the validator's displayName mode. Nodes derive their displayName from it on read, the
+namespaced short names are cached until the generation number changes (mode, display namespace or retarget).
+"""
+import logging
+import weakref
+
+from validateRig.const import constants as vrconst_constants
+
+logger = logging.getLogger(__name__)
+
+
+class NameSpaceContext(object):
+    __slots__ = (
+        "_nameSpace",
+        "_prefix",
+        "_version",
+        "_names",
+        "_displayMode",
+        "_displayNameSpace",
+        "_generation",
+        "_shortNames",
+        "_journal",
+        "_validator",
+    )
+
+    def __init__(self, nameSpace=""):
+        # type: (str) -> None
+        self._nameSpace = nameSpace or ""
+        self._prefix = self.__prefix(self._nameSpace)
+        self._version = 0
+        self._names = dict()  # {parts: RelativeName} so nodes sharing a longName share one RelativeName
+
+        self._displayMode = vrconst_constants.DISPLAYNAME_STORED
+        self._displayNameSpace = ""
+        self._generation = 0
+        self._shortNames = dict()  # {name: namespaced short name} for the current generation
+
+        # The validator's ChangeJournal. The context is the one object every node in a validator can reach, so
+        # it is how the nodes find the journal to record their updates in.
+        self._journal = None
+        # Weak reference to the validator, its sourceNodes tell it when their longName changes so it can re-key
+        # them, see Node.longName. Weak as the validator owns the context.
+        self._validator = None
+
+    @staticmethod
+    def __prefix(nameSpace):
+        # type: (str) -> str
+        return "{}:".format(nameSpace) if nameSpace else ""
+
+    @property
+    def nameSpace(self):
+        return self._nameSpace
+
+    @nameSpace.setter
+    def nameSpace(self, nameSpace):
+        # type: (str) -> None
+        nameSpace = nameSpace or ""
+        if nameSpace == self._nameSpace:
+            return
+
+        self._nameSpace = nameSpace
+        self._prefix = self.__prefix(nameSpace)
+        self._version += 1
+        self._bumpGeneration()
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def journal(self):
+        return self._journal
+
+    @journal.setter
+    def journal(self, journal):
+        # type: (ChangeJournal) -> None
+        self._journal = journal
+
+    @property
+    def validator(self):
+        # type: () -> Validator
+        return self._validator() if self._validator is not None else None
+
+    @validator.setter
+    def validator(self, validator):
+        # type: (Validator) -> None
+        self._validator = weakref.ref(validator) if validator is not None else None
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def _bumpGeneration(self):
+        self._generation += 1
+        self._shortNames.clear()
+
+    @property
+    def displayMode(self):
+        return self._displayMode
+
+    def setDisplayMode(self, mode, nameSpace=None):
+        # type: (int, str) -> None
+        """
+        Args:
+            mode: one of the vrconst_constants DISPLAYNAME_ modes
+            nameSpace: namespace of the DISPLAYNAME_NAMESPACESHORTNAME names, defaults to the context's namespace
+        """
+        if nameSpace is None:
+            nameSpace = self._nameSpace
+
+        if mode == self._displayMode and nameSpace == self._displayNameSpace:
+            return
+
+        self._displayMode = mode
+        self._displayNameSpace = nameSpace
+        self._bumpGeneration()
+
+    def displayName(self, name, longName):
+        # type: (str, str) -> str
+        """:return: the displayName for the current mode, None if the node should show its stored displayName"""
+        if self._displayMode == vrconst_constants.DISPLAYNAME_LONGNAME:
+            return longName
+
+        if self._displayMode == vrconst_constants.DISPLAYNAME_NAMESPACESHORTNAME:
+            shortName = self._shortNames.get(name, None)
+            if shortName is None:
+                shortName = "{}:{}".format(self._displayNameSpace, name) if self._displayNameSpace else name
+                self._shortNames[name] = shortName
+
+            return shortName
+
+        return None
+
+    def relativeParts(self, longName, nameSpace=None):
+        # type: (str, str) -> tuple[str]
+        """:return: the longName split around the current namespace, or around nameSpace if given"""
+        prefix = self._prefix if nameSpace is None else self.__prefix(nameSpace)
+        if not prefix:
+            return (longName,)
+
+        return tuple(longName.split(prefix))
+
+    def relativeName(self, longName, nameSpace=None):
+        # type: (str, str) -> RelativeName
+        """
+        Args:
+            nameSpace: the namespace longName is under, defaults to the current one
+        """
+        if isinstance(longName, RelativeName):
+            if longName.context is self:
+                return longName
+            longName = longName.resolve()
+
+        parts = self.relativeParts(longName, nameSpace)
+        relativeName = self._names.get(parts, None)
+        if relativeName is None:
+            relativeName = RelativeName(parts, self)
+            self._names[parts] = relativeName
+
+        return relativeName
+
+    def resolve(self, parts):
+        # type: (tuple[str]) -> str
+        return self._prefix.join(parts)
+
+    def savedUnder(self, nameSpace):
+        # type: (str) -> SavedNameSpace
+        """
+        :return: what to relativize nodes saved under nameSpace against, eg: a page saved before a retarget.
+            Unlike setting nameSpace and back, this doesn't invalidate every resolved name of the validator.
+        """
+        return SavedNameSpace(self, nameSpace)
+
+
+class SavedNameSpace(object):
+    """Relativizes longNames saved under a namespace into a NameSpaceContext, see NameSpaceContext.savedUnder"""
+
+    __slots__ = ("_context", "_nameSpace")
+
+    def __init__(self, context, nameSpace):
+        # type: (NameSpaceContext, str) -> None
+        self._context = context
+        self._nameSpace = nameSpace or ""
+
+    def relativeName(self, longName):
+        # type: (str) -> RelativeName
+        return self._context.relativeName(longName, self._nameSpace)
+
+
+class RelativeName(object):
+    __slots__ = ("_parts", "_context", "_resolved", "_version")
+
+    def __init__(self, parts, context):
+        # type: (tuple[str], NameSpaceContext) -> None
+        self._parts = parts
+        self._context = context
+        self._resolved = None
+        self._version = -1
+
+    @property
+    def parts(self):
+        return self._parts
+
+    @property
+    def context(self):
+        return self._context
+
+    def resolve(self):
+        # type: () -> str
+        """:return: the longName for the context's current namespace"""
+        if self._version != self._context.version:
+            self._resolved = self._context.resolve(self._parts)
+            self._version = self._context.version
+
+        return self._resolved
+
+    def __repr__(self):
+        return "RelativeName(%s)" % self.resolve()
+
+
+def resolveName(longName):
+    # type: (str | RelativeName) -> str
+    """:return: longName as a string, resolving it first if it is namespace relative"""
+    if longName.__class__ is RelativeName:
+        return longName.resolve()
+
+    return longName
@@ -0,0 +1,591 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Columnar (struct of arrays) backing store for the validityNodes of very large SourceNodes.
+
+Instead of one python object per DefaultValueNode / ConnectionValidityNode, a ValidityNodeTable keeps parallel
+arrays of nodeType, status code and string ids plus a value buffer holding the defaultValueData / connectionData.
+ColumnarSourceNode hands out lightweight row views which subclass the regular node classes, so code written against
+core.nodes keeps working, while bulk operations (status reset, failure counting, serialization) run as array passes.
+"""
+import logging
+from array import array
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.const import constants as vrconst_constants
+from validateRig.core.nodes import SourceNode, ConnectionValidityNode, DefaultValueNode
+from validateRig.core.nodes import relativeDestLongName, resolveDestLongName
+from validateRig.core.strings import StringPool
+from validateRig.core.nameSpaces import RelativeName, resolveName
+
+logger = logging.getLogger(__name__)
+
+DELETED_ROW = -1
+
+# Status strings are shared by every table, the status column stores the index into this list.
+_STATUSES = [vrconst_constants.NODE_VALIDATION_NA, vrconst_constants.NODE_VALIDATION_PASSED]
+_STATUSES.extend(vrconst_constants.NODE_VALIDATION_FAILURES)
+_STATUS_CODES = dict((status, code) for code, status in enumerate(_STATUSES))
+
+
+def statusCode(status):
+    # type: (str) -> int
+    code = _STATUS_CODES.get(status, None)
+    if code is None:
+        code = len(_STATUSES)
+        _STATUSES.append(status)
+        _STATUS_CODES[status] = code
+
+    return code
+
+
+class ValidityNodeTable(object):
+    __slots__ = (
+        "_owner",
+        "_nodeTypes",
+        "_statusCodes",
+        "_nameIds",
+        "_longNameIds",
+        "_displayNameIds",
+        "_values",
+        "_stringPool",
+        "_deletedCount",
+        "_destLongNames",
+    )
+
+    def __init__(self, owner=None, stringPool=None):
+        # type: (SourceNode, StringPool) -> None
+        """
+        Args:
+            stringPool: pool the name columns index into, pass the validator's pool to share one across tables
+        """
+        self._owner = owner
+        self._nodeTypes = array("b")
+        self._statusCodes = array("b")
+        self._nameIds = array("i")
+        self._longNameIds = array("i")
+        self._displayNameIds = array("i")
+        self._values = list()  # value buffer, one defaultValueData / connectionData per row
+
+        self._stringPool = stringPool if stringPool is not None else StringPool()
+
+        self._deletedCount = 0
+        self._destLongNames = None  # {row: RelativeName} of the connection rows destData nodeLongName
+
+    @property
+    def owner(self):
+        return self._owner
+
+    def __len__(self):
+        return len(self._nodeTypes) - self._deletedCount
+
+    @property
+    def stringPool(self):
+        return self._stringPool
+
+    # Interning
+    def stringId(self, value):
+        # type: (str) -> int
+        return self._stringPool.stringId(value)
+
+    def string(self, stringId):
+        # type: (int) -> str
+        return self._stringPool.string(stringId)
+
+    # Rows
+    def appendRow(self, nodeType, name, longName, displayName, value, status=vrconst_constants.NODE_VALIDATION_NA):
+        # type: (int, str, str, str, dict, str) -> int
+        """:return: the row index of the new validityNode"""
+        row = len(self._nodeTypes)
+        self._nodeTypes.append(nodeType)
+        self._statusCodes.append(statusCode(status))
+        self._nameIds.append(self.stringId(name))
+        self._longNameIds.append(self.stringId(longName))
+        self._displayNameIds.append(self.stringId(displayName))
+        self._values.append(value)
+
+        return row
+
+    def appendNode(self, node):
+        # type: (Node) -> int
+        if node.nodeType == vrconst_serialization.NT_DEFAULTVALUE:
+            value = node.defaultValueData
+        else:
+            value = node.connectionData
+
+        return self.appendRow(node.nodeType, node.name, node.longName, node.displayName, value, node.status)
+
+    def appendData(self, data):
+        # type: (dict) -> int
+        """Appends a row straight from a serialized validityNode, no node object is created."""
+        nodeType = data[vrconst_serialization.KEY_NODETYPE]
+        if nodeType == vrconst_serialization.NT_DEFAULTVALUE:
+            value = self._stringPool.internDefaultValueData(data.get(vrconst_serialization.KEY_DEFAULTVALUEDATA, dict()))
+        else:
+            value = self._stringPool.internConnectionData(data.get(vrconst_serialization.KEY_CONNDATA, dict()))
+
+        return self.appendRow(
+            nodeType,
+            data.get(vrconst_serialization.KEY_NODENAME, ""),
+            data.get(vrconst_serialization.KEY_NODELONGNAME, ""),
+            data.get(vrconst_serialization.KEY_NODEDISPLAYNAME, ""),
+            value,
+        )
+
+    def deleteRow(self, row):
+        # type: (int) -> bool
+        if self._nodeTypes[row] == DELETED_ROW:
+            return False
+
+        self._nodeTypes[row] = DELETED_ROW
+        self._statusCodes[row] = statusCode(vrconst_constants.NODE_VALIDATION_NA)
+        self._values[row] = None
+        if self._destLongNames:
+            self._destLongNames.pop(row, None)
+        self._deletedCount += 1
+
+        return True
+
+    def isDeleted(self, row):
+        # type: (int) -> bool
+        return self._nodeTypes[row] == DELETED_ROW
+
+    def iterRows(self, nodeType=None):
+        # type: (int) -> Generator[int]
+        nodeTypes = self._nodeTypes
+        for row in range(len(nodeTypes)):
+            rowType = nodeTypes[row]
+            if rowType == DELETED_ROW:
+                continue
+            if nodeType is not None and rowType != nodeType:
+                continue
+
+            yield row
+
+    def compact(self):
+        """
+        Drops deleted rows. Row views handed out before compacting point at the wrong rows afterwards and
+        must not be used anymore.
+        """
+        if not self._deletedCount:
+            return
+
+        rows = list(self.iterRows())
+        if self._destLongNames:
+            newRows = dict((oldRow, newRow) for newRow, oldRow in enumerate(rows))
+            self._destLongNames = dict(
+                (newRows[oldRow], destLongName) for oldRow, destLongName in self._destLongNames.items()
+            )
+        self._nodeTypes = array("b", [self._nodeTypes[r] for r in rows])
+        self._statusCodes = array("b", [self._statusCodes[r] for r in rows])
+        self._nameIds = array("i", [self._nameIds[r] for r in rows])
+        self._longNameIds = array("i", [self._longNameIds[r] for r in rows])
+        self._displayNameIds = array("i", [self._displayNameIds[r] for r in rows])
+        self._values = [self._values[r] for r in rows]
+        self._deletedCount = 0
+
+    # Columns
+    def nodeType(self, row):
+        return self._nodeTypes[row]
+
+    def name(self, row):
+        return self._stringPool.string(self._nameIds[row])
+
+    def setName(self, row, name):
+        self._nameIds[row] = self.stringId(name)
+
+    def longName(self, row):
+        return resolveName(self._stringPool.string(self._longNameIds[row]))
+
+    def relativeLongName(self, row):
+        # type: (int) -> str | RelativeName
+        """:return: the longName as stored, a RelativeName once the owner has been added to a validator"""
+        return self._stringPool.string(self._longNameIds[row])
+
+    def setLongName(self, row, longName):
+        self._longNameIds[row] = self.stringId(longName)
+
+    def displayName(self, row):
+        return self._stringPool.string(self._displayNameIds[row])
+
+    def setDisplayName(self, row, displayName):
+        self._displayNameIds[row] = self.stringId(displayName)
+
+    def status(self, row):
+        return _STATUSES[self._statusCodes[row]]
+
+    def setStatus(self, row, status):
+        self._statusCodes[row] = statusCode(status)
+
+    def value(self, row):
+        value = self._values[row]
+        if self._destLongNames:
+            destLongName = self._destLongNames.get(row, None)
+            if destLongName is not None:
+                resolveDestLongName(value, destLongName)
+
+        return value
+
+    def setValue(self, row, value):
+        self._values[row] = value
+        if self._destLongNames:
+            self._destLongNames.pop(row, None)
+
+    def relativizeLongNames(self, context):
+        # type: (NameSpaceContext) -> None
+        """Column pass storing the longNames and destData nodeLongNames relative to the context's namespace."""
+        string = self._stringPool.string
+        stringId = self._stringPool.stringId
+        longNameIds = self._longNameIds
+        relativeIds = dict()
+        for row in self.iterRows():
+            longNameId = longNameIds[row]
+            relativeId = relativeIds.get(longNameId, None)
+            if relativeId is None:
+                relativeId = relativeIds[longNameId] = stringId(context.relativeName(string(longNameId)))
+            longNameIds[row] = relativeId
+
+        self._destLongNames = None
+        for row in self.iterRows(vrconst_serialization.NT_CONNECTIONVALIDITY):
+            self._relativizeDestLongName(row, context)
+
+    def relativizeRow(self, row, context):
+        # type: (int, NameSpaceContext) -> None
+        self._longNameIds[row] = self.stringId(context.relativeName(self.string(self._longNameIds[row])))
+        if self._nodeTypes[row] == vrconst_serialization.NT_CONNECTIONVALIDITY:
+            self._relativizeDestLongName(row, context)
+
+    def _relativizeDestLongName(self, row, context):
+        # type: (int, NameSpaceContext) -> None
+        destLongName = relativeDestLongName(self._values[row], context)
+        if destLongName is None:
+            return
+
+        if self._destLongNames is None:
+            self._destLongNames = dict()
+        self._destLongNames[row] = destLongName
+
+    # Bulk operations
+    def resetStatus(self, status=vrconst_constants.NODE_VALIDATION_NA):
+        # type: (str) -> None
+        self._statusCodes = array("b", [statusCode(status)]) * len(self._statusCodes)
+        if self._deletedCount:
+            naCode = statusCode(vrconst_constants.NODE_VALIDATION_NA)
+            for row in range(len(self._nodeTypes)):
+                if self._nodeTypes[row] == DELETED_ROW:
+                    self._statusCodes[row] = naCode
+
+    def failedCount(self):
+        # type: () -> int
+        # Deleted rows are reset to NA so they never count as failures.
+        failed = 0
+        for eachStatus in vrconst_constants.NODE_VALIDATION_FAILURES:
+            failed += self._statusCodes.count(statusCode(eachStatus))
+
+        return failed
+
+    def toData(self):
+        # type: () -> list[dict]
+        string = self._stringPool.string
+        nodeTypes = self._nodeTypes
+        nameIds = self._nameIds
+        longNameIds = self._longNameIds
+        displayNameIds = self._displayNameIds
+
+        data = list()
+        for row in range(len(nodeTypes)):
+            nodeType = nodeTypes[row]
+            if nodeType == DELETED_ROW:
+                continue
+
+            if nodeType == vrconst_serialization.NT_DEFAULTVALUE:
+                valueKey = vrconst_serialization.KEY_DEFAULTVALUEDATA
+            else:
+                valueKey = vrconst_serialization.KEY_CONNDATA
+
+            data.append(
+                {
+                    vrconst_serialization.KEY_NODENAME: string(nameIds[row]),
+                    vrconst_serialization.KEY_NODELONGNAME: resolveName(string(longNameIds[row])),
+                    vrconst_serialization.KEY_NODEDISPLAYNAME: string(displayNameIds[row]),
+                    vrconst_serialization.KEY_NODETYPE: nodeType,
+                    valueKey: self.value(row),
+                }
+            )
+
+        return data
+
+
+class _RowViewMixin(object):
+    """Redirects the Node properties of a row view to its ValidityNodeTable row."""
+
+    __slots__ = ()
+
+    def _bind(self, table, row):
+        # type: (ValidityNodeTable, int) -> None
+        self._table = table
+        self._row = row
+        self._children = ()
+        self._childrenByType = None
+        self._nameSpace = None
+
+    @property
+    def row(self):
+        return self._row
+
+    @property
+    def table(self):
+        return self._table
+
+    @property
+    def name(self):
+        return self._table.name(self._row)
+
+    @name.setter
+    def name(self, name):
+        self._table.setName(self._row, name)
+        self._markDirty()
+
+    @property
+    def longName(self):
+        return self._table.longName(self._row)
+
+    @longName.setter
+    def longName(self, longName):
+        # Stays relative to the validator's namespace, like Node.longName
+        oldLongName = self._table.relativeLongName(self._row)
+        if oldLongName.__class__ is RelativeName:
+            longName = oldLongName.context.relativeName(longName)
+
+        self._table.setLongName(self._row, longName)
+        self._markDirty()
+
+    @property
+    def displayName(self):
+        longName = self._table.relativeLongName(self._row)
+        if longName.__class__ is RelativeName:
+            displayName = self._derivedDisplayName(longName.context)
+            if displayName is not None:
+                return displayName
+
+        return self._table.displayName(self._row)
+
+    @displayName.setter
+    def displayName(self, displayName):
+        self._table.setDisplayName(self._row, displayName)
+        self._markDirty()
+
+    @property
+    def nameSpace(self):
+        if self._nameSpace is not None:
+            return self._nameSpace
+
+        return self.longName.split("|")[-1].split(":")[0]
+
+    @nameSpace.setter
+    def nameSpace(self, nameSpace):
+        self._nameSpace = nameSpace
+
+    @property
+    def nodeType(self):
+        return self._table.nodeType(self._row)
+
+    @property
+    def status(self):
+        return self._table.status(self._row)
+
+    @status.setter
+    def status(self, status):
+        self._table.setStatus(self._row, status)
+
+    @property
+    def dirty(self):
+        # Rows don't carry a flag of their own, a changed row flags its ColumnarSourceNode.
+        return self._table.owner.dirty
+
+    def _journal(self):
+        longName = self._table.relativeLongName(self._row)
+        if longName.__class__ is RelativeName:
+            return longName.context.journal
+
+        return None
+
+    def _setDirty(self):
+        self._table.owner._setDirty()
+
+    def markClean(self):
+        pass
+
+    def _invalidateData(self):
+        self._table.owner._invalidateData()
+
+    def toData(self):
+        # Views are transient, so nothing is cached on them.
+        return self._buildData()
+
+    @property
+    def parent(self):
+        return self._table.owner
+
+    @parent.setter
+    def parent(self, parent):
+        if parent is not self._table.owner:
+            raise RuntimeError("Table rows can not be reparented, add the node to the new parent instead.")
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, _RowViewMixin) and other._table is self._table and other._row == self._row
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((id(self._table), self._row))
+
+
+class DefaultValueNodeRow(_RowViewMixin, DefaultValueNode):
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        # type: (ValidityNodeTable, int) -> None
+        self._bind(table, row)
+
+    @property
+    def defaultValueData(self):
+        return self._table.value(self._row)
+
+    @defaultValueData.setter
+    def defaultValueData(self, data):
+        self._table.setValue(self._row, data)
+        self._markDirty()
+
+
+class ConnectionValidityNodeRow(_RowViewMixin, ConnectionValidityNode):
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        # type: (ValidityNodeTable, int) -> None
+        self._bind(table, row)
+
+    @property
+    def connectionData(self):
+        return self._table.value(self._row)
+
+    @connectionData.setter
+    def connectionData(self, data):
+        self._table.setValue(self._row, data)
+        self._markDirty()
+
+
+class ColumnarSourceNode(SourceNode):
+    """
+    SourceNode whose validityNodes live in a ValidityNodeTable. Nodes passed to addChild(ren) are copied into
+    the table, iterChildren yields row views that read and write straight through to the table.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, name, longName, validityNodes=None, parent=None, stringPool=None, **kwargs):
+        # type: (str, str, list, Node, StringPool) -> None
+        self._table = ValidityNodeTable(owner=self, stringPool=stringPool)
+        super(ColumnarSourceNode, self).__init__(name=name, longName=longName, parent=parent)
+        self.addChildren(validityNodes or list())
+
+    @property
+    def table(self):
+        return self._table
+
+    def _rowView(self, row):
+        # type: (int) -> Node
+        if self._table.nodeType(row) == vrconst_serialization.NT_DEFAULTVALUE:
+            return DefaultValueNodeRow(self._table, row)
+
+        return ConnectionValidityNodeRow(self._table, row)
+
+    def _isOwnRow(self, node):
+        # type: (Node) -> bool
+        return isinstance(node, _RowViewMixin) and node.table is self._table
+
+    def addChild(self, node):
+        # type: (Node) -> None
+        if self._isOwnRow(node):
+            return
+
+        row = self._table.appendNode(node)
+        if isinstance(self._longName, RelativeName):
+            self._table.relativizeRow(row, self._longName.context)
+        self._markDirty()
+
+    def addChildren(self, nodes, unique=False):
+        # type: (list[Node], bool) -> None
+        # Every node is copied into a new row, so there is no membership check to skip for unique.
+        for node in nodes:
+            self.addChild(node)
+
+    def removeChild(self, node):
+        # type: (Node) -> None
+        if self._isOwnRow(node) and self._table.deleteRow(node.row):
+            self._markDirty()
+
+    def removeChildren(self, nodes):
+        # type: (list[Node]) -> None
+        for node in nodes:
+            self.removeChild(node)
+
+    @property
+    def children(self):
+        return list(self.iterChildren())
+
+    def iterChildren(self, nodeType=None):
+        # type: (int) -> Generator[Node]
+        for row in self._table.iterRows(nodeType):
+            yield self._rowView(row)
+
+    def iterDescendants(self, nodeType=None):
+        # type: (int) -> Generator[Node]
+        # Table rows are leaves, so the descendants are the children.
+        return self.iterChildren(nodeType)
+
+    def relativizeLongNames(self, context):
+        # type: (NameSpaceContext) -> None
+        self._relativizeLongName(context)
+        self._table.relativizeLongNames(context)
+
+    def resetStatus(self, status=vrconst_constants.NODE_VALIDATION_NA):
+        # type: (str) -> None
+        self._table.resetStatus(status)
+
+    def failedCount(self):
+        # type: () -> int
+        return self._table.failedCount()
+
+    def _buildData(self):
+        data = super(SourceNode, self)._buildData()
+        data[vrconst_serialization.KEY_VAILIDITYNODES] = self._table.toData()
+
+        return data
+
+    @classmethod
+    def fromData(cls, data, stringPool=None):
+        # type: (dict, StringPool) -> ColumnarSourceNode
+        """Fills the table straight from the serialized validityNodes without creating any node objects."""
+        sourceNodeName = data.get(vrconst_serialization.KEY_NODENAME, None)
+        sourceNodeLongName = data.get(vrconst_serialization.KEY_NODELONGNAME, None)
+        displayName = data.get(vrconst_serialization.KEY_NODEDISPLAYNAME, "")
+        if sourceNodeName is None:
+            raise KeyError("NoneType is not a valid sourceNodeName!")
+
+        if stringPool is None:
+            stringPool = StringPool()
+
+        inst = cls(
+            name=stringPool.intern(sourceNodeName),
+            longName=stringPool.intern(sourceNodeLongName),
+            stringPool=stringPool,
+        )
+        for validityNodeData in data.get(vrconst_serialization.KEY_VAILIDITYNODES, list()):
+            inst.table.appendData(validityNodeData)
+
+        inst.displayName = stringPool.intern(displayName)
+        inst.markClean()
+        return inst
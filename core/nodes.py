@@ -1,14 +1,37 @@
 #  Copyright (c) 2019.  James Dunlop
 import logging
-from PySide2 import QtCore
+from collections import OrderedDict
 
 from validateRig.const import serialization as vrconst_serialization
 from validateRig.const import constants as vrconst_constants
+from validateRig.core.strings import StringPool
+from validateRig.core.nameSpaces import RelativeName, resolveName
+from validateRig.core import journal as vrc_journal
 
 logger = logging.getLogger(__name__)
 
 
-class Node(QtCore.QObject):
+class Node(object):
+    """
+    Pure python base of the validation node model. Nodes are plain __slots__ objects so they carry no per
+    instance __dict__ and have no Qt dependency, any Qt signalling lives with the Validator / UI.
+    """
+    __slots__ = (
+        "_name",
+        "_longName",
+        "_nodeType",
+        "_validationStatus",
+        "_parent",
+        "_children",
+        "_childrenByType",
+        "_nameSpace",
+        "_displayName",
+        "_dirty",
+        "_data",
+        "_dataGeneration",
+        "__weakref__",  # PagedValidator keeps a weak registry of the sourceNodes it hydrated
+    )
+
     def __init__(
         self, name, longName, nodeType=vrconst_serialization.NT_VALIDATIONNODE, parent=None,
     ):
@@ -18,9 +41,14 @@ class Node(QtCore.QObject):
         self._nodeType = nodeType
         self._validationStatus = vrconst_constants.NODE_VALIDATION_NA
         self._parent = parent
-        self._children = list()
-        self._nameSpace = self._longName.split("|")[-1].split(":")[0]
+        # Children are kept as ordered sets {Node: None}, created with the first child so leaf nodes stay small.
+        self._children = None
+        self._childrenByType = None  # {nodeType: OrderedDict}
+        self._nameSpace = None  # Resolved from the longName on first access.
         self._displayName = self._name
+        self._dirty = True  # Changed since the last save / load, see Validator.markClean
+        self._data = None  # Memoized toData(), see _invalidateData
+        self._dataGeneration = None
 
     @property
     def name(self):
@@ -30,24 +58,60 @@ class Node(QtCore.QObject):
     def name(self, name):
         # type: (str) -> None
         self._name = name
+        self._markDirty()
 
     @property
     def displayName(self):
+        # Nodes in a validator derive their displayName from its current mode, see Validator.toggleLongNodeNames
+        longName = self._longName
+        if longName.__class__ is RelativeName:
+            displayName = self._derivedDisplayName(longName.context)
+            if displayName is not None:
+                return displayName
+
         return self._displayName
 
     @displayName.setter
     def displayName(self, name):
         # type: (str) -> None
         self._displayName = name
+        self._markDirty()
 
     @property
     def longName(self):
-        return self._longName
+        return resolveName(self._longName)
 
     @longName.setter
     def longName(self, longName):
-        # type: (str) -> None
+        # type: (str | RelativeName) -> None
+        oldLongName = self._longName
+        if oldLongName.__class__ is RelativeName:
+            # Stays relative to the validator's namespace, a sourceNode is re-keyed in its validator first.
+            context = oldLongName.context
+            longName = context.relativeName(longName)
+            validator = context.validator
+            if self._parent is None and validator is not None:
+                validator.sourceNodeRenamed(self, oldLongName.parts, longName.parts)
+
         self._longName = longName
+        self._markDirty()
+
+    @property
+    def nameSpace(self):
+        if self._nameSpace is not None:
+            return self._nameSpace
+
+        nameSpace = self.longName.split("|")[-1].split(":")[0]
+        # A namespace relative longName can be retargeted at any time, so only absolute ones are cached.
+        if not isinstance(self._longName, RelativeName):
+            self._nameSpace = nameSpace
+
+        return nameSpace
+
+    @nameSpace.setter
+    def nameSpace(self, nameSpace):
+        # type: (str) -> None
+        self._nameSpace = nameSpace
 
     @property
     def parent(self):
@@ -62,6 +126,52 @@ class Node(QtCore.QObject):
     def nodeType(self):
         return self._nodeType
 
+    @property
+    def dirty(self):
+        """True if this node or one of its descendants changed since the validator was loaded / last marked clean"""
+        return self._dirty
+
+    def _journal(self):
+        # type: () -> ChangeJournal
+        longName = self._longName
+        if longName.__class__ is RelativeName:
+            return longName.context.journal
+
+        return None
+
+    def _setDirty(self):
+        self._dirty = True
+        # Ancestors of a dirty node are always dirty, so stop at the first one that already is.
+        node = self._parent
+        while node is not None and not node._dirty:
+            node._dirty = True
+            node = node._parent
+
+    def _markDirty(self):
+        """Flags this node and its ancestors dirty and records the update in the validator's journal"""
+        journal = self._journal()
+        if journal is not None:
+            journal.record(vrc_journal.JOURNAL_UPDATED, self)
+
+        self._setDirty()
+        self._invalidateData()
+
+    def _invalidateData(self):
+        # A parent's cached data holds its children's, so a node is only ever cached if its children are and
+        # the walk can stop at the first ancestor that has nothing cached.
+        node = self
+        while node is not None and node._data is not None:
+            node._data = None
+            node = node._parent
+
+    def markClean(self):
+        """Clears the dirty flag of this node and its dirty descendants"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node._dirty = False
+            stack.extend(eachNode for eachNode in node.iterChildren() if eachNode.dirty)
+
     @property
     def status(self):
         return self._validationStatus
@@ -71,54 +181,159 @@ class Node(QtCore.QObject):
         # type: (str) -> None
         self._validationStatus = status
 
+    def _appendChild(self, node):
+        # type: (Node) -> None
+        if self._children is None:
+            self._children = OrderedDict()
+            self._childrenByType = dict()
+
+        self._children[node] = None
+        bucket = self._childrenByType.get(node.nodeType, None)
+        if bucket is None:
+            bucket = self._childrenByType[node.nodeType] = OrderedDict()
+        bucket[node] = None
+        node.parent = self
+        if node.dirty:
+            self._setDirty()
+        # Children added to a node already living in a validator follow its namespace too.
+        if isinstance(self._longName, RelativeName):
+            node.relativizeLongNames(self._longName.context)
+
     def addChild(self, node):
         # type: (Node) -> None
-        if node not in self._children:
-            self._children.append(node)
-            node.parent = self
+        if self._children is None or node not in self._children:
+            self._appendChild(node)
+            self._markDirty()
+
+    def addChildren(self, nodes, unique=False):
+        # type: (list[Node], bool) -> None
+        """
+        Args:
+            unique: the caller guarantees nodes holds no duplicates and none of them are children yet, eg: nodes
+            freshly created from data, so the membership check is skipped.
+        """
+        if unique:
+            for node in nodes:
+                self._appendChild(node)
+            self._markDirty()
+            return
 
-    def addChildren(self, nodes):
-        # type: (list[Node]) -> None
         for node in nodes:
             self.addChild(node)
 
     def removeChild(self, node):
         # type: (Node) -> None
-        for eachNode in self._children:
-            if eachNode == node:
-                node.parent = None
-                self._children.remove(node)
-
-    def iterChildren(self):
-        # type: () -> Generator[Node]
-        for eachNode in self._children:
-            yield eachNode
+        if not self._children or node not in self._children:
+            return
+
+        del self._children[node]
+        del self._childrenByType[node.nodeType][node]
+        node.parent = None
+        self._markDirty()
+
+    def removeChildren(self, nodes):
+        # type: (list[Node]) -> None
+        for node in nodes:
+            self.removeChild(node)
+
+    @property
+    def children(self):
+        return list(self._children or ())
 
-    def iterDescendants(self):
-        for eachNode in self._children:
+    def iterChildren(self, nodeType=None):
+        # type: (int) -> Generator[Node]
+        """
+        Args:
+            nodeType: only yield the children of this vrconst_serialization NT_ type
+        """
+        if self._children is None:
+            return
+
+        if nodeType is None:
+            children = self._children
+        else:
+            children = self._childrenByType.get(nodeType, ())
+
+        for eachNode in children:
             yield eachNode
-            for eachChild in eachNode._children:
-                yield eachChild
+
+    def iterDescendants(self, nodeType=None):
+        # type: (int) -> Generator[Node]
+        """
+        Walks the whole hierarchy under this node with a stack, so there is no depth limit. Each node's children
+        are yielded before descending into them. When nodeType is given the matching children are read straight
+        from the per type buckets and the other children are only visited if they have children of their own.
+        """
+        if not self._children:
+            return
+
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            for eachNode in node.iterChildren(nodeType):
+                yield eachNode
+
+            # Reversed so the first child ends up on top of the stack and is walked first.
+            stack.extend(eachNode for eachNode in reversed(node._children) if eachNode._children)
+
+    def _derivedDisplayName(self, context):
+        # type: (NameSpaceContext) -> str
+        """:return: the displayName for the context's display mode, None to use the stored displayName"""
+        return None
+
+    def _relativizeLongName(self, context):
+        # type: (NameSpaceContext) -> None
+        self._longName = context.relativeName(self._longName)
+
+    def relativizeLongNames(self, context):
+        # type: (NameSpaceContext) -> None
+        """Stores the longNames of this node and its descendants relative to the context's namespace."""
+        self._relativizeLongName(context)
+        for eachNode in self.iterDescendants():
+            eachNode._relativizeLongName(context)
+
+    def _dataKey(self):
+        # Resolved longNames and derived displayNames change with the validator's namespace / display mode.
+        longName = self._longName
+        if longName.__class__ is RelativeName:
+            return longName.context.generation
+
+        return None
 
     def toData(self):
-        self.data = dict()
-        self.data[vrconst_serialization.KEY_NODENAME] = self.name
-        self.data[vrconst_serialization.KEY_NODELONGNAME] = self.longName
-        self.data[vrconst_serialization.KEY_NODEDISPLAYNAME] = self.displayName
-        self.data[vrconst_serialization.KEY_NODETYPE] = self.nodeType
+        # type: () -> dict
+        """:return: the serialized node. This is cached until the node changes, so treat it as read only."""
+        dataKey = self._dataKey()
+        if self._data is None or self._dataGeneration != dataKey:
+            self._data = self._buildData()
+            self._dataGeneration = dataKey
+
+        return self._data
+
+    def _buildData(self):
+        data = dict()
+        data[vrconst_serialization.KEY_NODENAME] = self.name
+        data[vrconst_serialization.KEY_NODELONGNAME] = self.longName
+        data[vrconst_serialization.KEY_NODEDISPLAYNAME] = self.displayName
+        data[vrconst_serialization.KEY_NODETYPE] = self.nodeType
 
-        return self.data
+        return data
 
     @classmethod
-    def fromData(cls, data):
-        # type: (dict) -> Node
+    def fromData(cls, data, stringPool=None):
+        # type: (dict, StringPool) -> Node
         name = data.get(vrconst_serialization.KEY_NODENAME, "")
         longName = data.get(vrconst_serialization.KEY_NODELONGNAME, "")
         displayName = data.get(vrconst_serialization.KEY_NODEDISPLAYNAME, "")
         nodeType = data.get(vrconst_serialization.KEY_NODETYPE, "")
+        if stringPool is not None:
+            name = stringPool.intern(name)
+            longName = stringPool.intern(longName)
+            displayName = stringPool.intern(displayName)
 
         inst = cls(name=name, longName=longName, nodeType=nodeType)
         inst.displayName = displayName
+        inst.markClean()
 
         return inst
 
@@ -130,6 +345,8 @@ class Node(QtCore.QObject):
 
 
 class SourceNode(Node):
+    __slots__ = ()
+
     def __init__(self, name, longName, validityNodes=None, parent=None, **kwargs):
         # type: (str, str, list, Node) -> None
         """
@@ -143,7 +360,8 @@ class SourceNode(Node):
             nodeType=vrconst_serialization.NT_SOURCENODE,
             parent=parent,
         )
-        self._children = validityNodes or list()
+        for eachNode in validityNodes or list():
+            self._appendChild(eachNode)
 
     @staticmethod
     def isNodeTypeEqualToDefaultValue(nodeType):
@@ -151,28 +369,43 @@ class SourceNode(Node):
         return nodeType == vrconst_serialization.NT_DEFAULTVALUE
 
     @staticmethod
-    def createValidityNodeFromData(data, parent=None):
-        # type: (dict) -> Node
+    def createValidityNodeFromData(data, parent=None, stringPool=None):
+        # type: (dict, Node, StringPool) -> Node
         nodeType = data[vrconst_serialization.KEY_NODETYPE]
         if SourceNode.isNodeTypeEqualToDefaultValue(nodeType):
-            return DefaultValueNode.fromData(data, parent)
+            return DefaultValueNode.fromData(data, parent, stringPool=stringPool)
 
-        return ConnectionValidityNode.fromData(data, parent)
+        return ConnectionValidityNode.fromData(data, parent, stringPool=stringPool)
 
-    def toData(self):
-        super(SourceNode, self).toData()
-        self.data[vrconst_serialization.KEY_VAILIDITYNODES] = list()
+    def _derivedDisplayName(self, context):
+        # type: (NameSpaceContext) -> str
+        return context.displayName(self.name, self.longName)
+
+    def resetStatus(self, status=vrconst_constants.NODE_VALIDATION_NA):
+        # type: (str) -> None
+        """Sets the status of every validityNode of this sourceNode"""
         for eachNode in self.iterChildren():
-            self.data[vrconst_serialization.KEY_VAILIDITYNODES].append(eachNode.toData())
+            eachNode.status = status
 
-        return self.data
+    def failedCount(self):
+        # type: () -> int
+        """:return: number of validityNodes that did not pass validation"""
+        return len([n for n in self.iterChildren() if n.status in vrconst_constants.NODE_VALIDATION_FAILURES])
+
+    def _buildData(self):
+        data = super(SourceNode, self)._buildData()
+        data[vrconst_serialization.KEY_VAILIDITYNODES] = [eachNode.toData() for eachNode in self.iterChildren()]
+
+        return data
 
     @classmethod
-    def fromData(cls, data):
-        # type: (dict) -> SourceNode
+    def fromData(cls, data, stringPool=None):
+        # type: (dict, StringPool) -> SourceNode
         """
         Args:
             data: previously serialized SourceNode.toData() ususally loaded from .json
+            stringPool: the validator's StringPool to intern names through. If None one is created for this
+            sourceNode so its validityNodes at least share the repeated longNames.
         """
         sourceNodeName = data.get(vrconst_serialization.KEY_NODENAME, None)
         sourceNodeLongName = data.get(vrconst_serialization.KEY_NODELONGNAME, None)
@@ -180,15 +413,19 @@ class SourceNode(Node):
         if sourceNodeName is None:
             raise KeyError("NoneType is not a valid sourceNodeName!")
 
-        inst = cls(name=sourceNodeName, longName=sourceNodeLongName)
+        if stringPool is None:
+            stringPool = StringPool()
+
+        inst = cls(name=stringPool.intern(sourceNodeName), longName=stringPool.intern(sourceNodeLongName))
 
         serializedValidityNodes = data.get(vrconst_serialization.KEY_VAILIDITYNODES, list())
         validityNodes = [
-            cls.createValidityNodeFromData(validityNodeData, inst)
+            cls.createValidityNodeFromData(validityNodeData, inst, stringPool=stringPool)
             for validityNodeData in serializedValidityNodes
         ]
-        inst.addChildren(validityNodes)
-        inst.displayName = displayName
+        inst.addChildren(validityNodes, unique=True)
+        inst.displayName = stringPool.intern(displayName)
+        inst.markClean()
         return inst
 
     def __repr__(self):
@@ -199,6 +436,8 @@ class SourceNode(Node):
 
 
 class ConnectionValidityNode(Node):
+    __slots__ = ("_connectionData", "_destLongName")
+
     def __init__(self, name, longName, parent=None):
         # type: (str, str, Node) -> None
         super(ConnectionValidityNode, self).__init__(
@@ -209,35 +448,82 @@ class ConnectionValidityNode(Node):
         )
 
         self._connectionData = dict()
+        self._destLongName = None  # RelativeName of destData["nodeLongName"] once relativized
 
     @property
     def connectionData(self):
+        if self._destLongName is not None:
+            resolveDestLongName(self._connectionData, self._destLongName)
+
         return self._connectionData
 
     @connectionData.setter
     def connectionData(self, data):
         self._connectionData = data
+        self._destLongName = None
+        self._markDirty()
 
-    def toData(self):
-        super(ConnectionValidityNode, self).toData()
-        self.data[vrconst_serialization.KEY_CONNDATA] = self._connectionData
-        return self.data
+    def _derivedDisplayName(self, context):
+        # type: (NameSpaceContext) -> str
+        longName = self.longName
+        if ":" not in longName:
+            return None
+
+        return context.displayName(self.name, longName)
+
+    def _relativizeLongName(self, context):
+        # type: (NameSpaceContext) -> None
+        super(ConnectionValidityNode, self)._relativizeLongName(context)
+        self._destLongName = relativeDestLongName(self._connectionData, context)
+
+    def _buildData(self):
+        data = super(ConnectionValidityNode, self)._buildData()
+        data[vrconst_serialization.KEY_CONNDATA] = self.connectionData
+        return data
 
     @classmethod
-    def fromData(cls, data, parent):
+    def fromData(cls, data, parent, stringPool=None):
+        # type: (dict, Node, StringPool) -> ConnectionValidityNode
         name = data.get(vrconst_serialization.KEY_NODENAME, "")
         longName = data.get(vrconst_serialization.KEY_NODELONGNAME, "")
         displayName = data.get(vrconst_serialization.KEY_NODEDISPLAYNAME, "")
         connectionData = data.get(vrconst_serialization.KEY_CONNDATA, dict())
+        if stringPool is not None:
+            name = stringPool.intern(name)
+            longName = stringPool.intern(longName)
+            displayName = stringPool.intern(displayName)
+            connectionData = stringPool.internConnectionData(connectionData)
 
         inst = cls(name=name, longName=longName)
         inst.displayName = displayName
         inst.connectionData = connectionData
+        inst.markClean()
 
         return inst
 
 
+def relativeDestLongName(connectionData, context):
+    # type: (dict, NameSpaceContext) -> RelativeName
+    """:return: the RelativeName of the connectionData destData nodeLongName, None if there isn't one"""
+    destLongName = (connectionData.get("destData", None) or dict()).get("nodeLongName", None)
+    if destLongName is None:
+        return None
+
+    return context.relativeName(destLongName)
+
+
+def resolveDestLongName(connectionData, destLongName):
+    # type: (dict, RelativeName) -> None
+    """Writes the current resolution of destLongName back into the connectionData destData"""
+    destData = connectionData["destData"]
+    resolved = destLongName.resolve()
+    if destData.get("nodeLongName", None) is not resolved:
+        destData["nodeLongName"] = resolved
+
+
 class DefaultValueNode(Node):
+    __slots__ = ("_defaultValueData",)
+
     def __init__(self, name, longName, parent=None):
         # type: (str, str, any, Node) -> None
         super(DefaultValueNode, self).__init__(
@@ -255,23 +541,30 @@ class DefaultValueNode(Node):
     @defaultValueData.setter
     def defaultValueData(self, data):
         self._defaultValueData = data
+        self._markDirty()
 
-    def toData(self):
-        super(DefaultValueNode, self).toData()
-        self.data[vrconst_serialization.KEY_DEFAULTVALUEDATA] = self._defaultValueData
+    def _buildData(self):
+        data = super(DefaultValueNode, self)._buildData()
+        data[vrconst_serialization.KEY_DEFAULTVALUEDATA] = self._defaultValueData
 
-        return self.data
+        return data
 
     @classmethod
-    def fromData(cls, data, parent):
-        # type: (dict, Node) -> DefaultValueNode
+    def fromData(cls, data, parent, stringPool=None):
+        # type: (dict, Node, StringPool) -> DefaultValueNode
         name = data.get(vrconst_serialization.KEY_NODENAME, "")
         longName = data.get(vrconst_serialization.KEY_NODELONGNAME, "")
         displayName = data.get(vrconst_serialization.KEY_NODEDISPLAYNAME, "")
         defaultValueData = data.get(vrconst_serialization.KEY_DEFAULTVALUEDATA, dict())
+        if stringPool is not None:
+            name = stringPool.intern(name)
+            longName = stringPool.intern(longName)
+            displayName = stringPool.intern(displayName)
+            defaultValueData = stringPool.internDefaultValueData(defaultValueData)
 
         inst = cls(name=name, longName=longName, parent=parent)
         inst.displayName = displayName
         inst.defaultValueData = defaultValueData
+        inst.markClean()
 
         return inst
@@ -0,0 +1,183 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Sidecar offset index for random access into large validator files.
+
+writeIndex saves <file>.idx next to a validator file, mapping each validator name and sourceNode longName to the
+byte offset and length of the sourceNode's data in the file. readSourceNodeData then fetches a single sourceNode
+through an mmap of the file, decoding only that sourceNode, so a pipeline tool asking what a validator expects for
+body_ctrl doesn't parse a 300MB session. The index of a .vrig also keeps offsets into its string table, so only the
+strings the sourceNode uses are decoded, see binaryCodec.loadsAt.
+
+The index records the size and mtime of the file it was built from and is ignored once they don't match.
+
+Compressed files (.gz, .zlib) can't be read at random. Their offsets are into the decompressed stream and a read
+decompresses everything up to the end of the sourceNode, so the further into the file the slower. Save the files
+you query uncompressed.
+"""
+import os
+import mmap
+import logging
+
+import simplejson as json
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import atomicFile as vrc_atomicFile
+from validateRig.core import binaryCodec as vrc_binaryCodec
+from validateRig.core import compression as vrc_compression
+from validateRig.core import jsonStream as vrc_jsonStream
+from validateRig.core import migrations as vrc_migrations
+from validateRig.core import parser as vrc_parser
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+KEY_VERSION = "version"
+KEY_SIZE = "size"
+KEY_MTIME = "mtime"
+KEY_VALIDATORS = "validators"
+KEY_STRINGOFFSETS = "stringOffsets"
+
+
+def indexPath(filepath):
+    # type: (str) -> str
+    return filepath + vrconst_constants.INDEX_EXT
+
+
+def _fileStamp(filepath):
+    # type: (str) -> tuple[int, float]
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime
+
+
+def buildIndex(filepath):
+    # type: (str) -> dict
+    """Scans filepath for the offsets, nothing but the validator names and sourceNode longNames is decoded."""
+    stringOffsets = None
+    if vrc_parser.isBinary(filepath):
+        entries, stringOffsets = vrc_binaryCodec.readValidatorIndex(filepath)
+    else:
+        entries = vrc_jsonStream.iterValidatorIndex(filepath)
+
+    size, mtime = _fileStamp(filepath)
+    validators = list()
+    for name, version, nodes in entries:
+        validators.append(
+            {
+                vrconst_serialization.KEY_VALIDATOR_NAME: name,
+                vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION: version,
+                vrconst_serialization.KEY_VALIDATOR_NODES: [list(eachNode) for eachNode in nodes],
+            }
+        )
+
+    index = {KEY_VERSION: INDEX_VERSION, KEY_SIZE: size, KEY_MTIME: mtime, KEY_VALIDATORS: validators}
+    if stringOffsets is not None:
+        index[KEY_STRINGOFFSETS] = stringOffsets
+
+    return index
+
+
+def writeIndex(filepath, index=None):
+    # type: (str, dict) -> str
+    """
+    Saves the index of filepath next to it, call it after saving filepath.
+
+    Args:
+        index: a buildIndex(filepath), built if not supplied
+    :return: the index's path
+    """
+    if index is None:
+        index = buildIndex(filepath)
+
+    path = indexPath(filepath)
+    logger.debug("Saving offset index %s" % path)
+    with vrc_atomicFile.atomicWrite(path) as f:
+        f.write(json.dumps(index).encode("utf-8"))
+
+    return path
+
+
+def readIndex(filepath):
+    # type: (str) -> dict
+    """:return: the index of filepath, None if there isn't one or it's stale"""
+    path = indexPath(filepath)
+    if not os.path.isfile(path):
+        return None
+
+    with open(path, "rb") as f:
+        index = json.loads(f.read().decode("utf-8"))
+
+    if index.get(KEY_VERSION) != INDEX_VERSION:
+        logger.debug("Ignoring %s, unsupported version %s" % (path, index.get(KEY_VERSION)))
+        return None
+
+    size, mtime = _fileStamp(filepath)
+    if index.get(KEY_SIZE) != size or index.get(KEY_MTIME) != mtime:
+        logger.debug("Ignoring stale offset index %s" % path)
+        return None
+
+    return index
+
+
+def findOffset(index, longName, validatorName=None):
+    # type: (dict, str, str) -> tuple[int, int, int]
+    """:return: (offset, length, schemaVersion) of the sourceNode, None if the index doesn't have it"""
+    for eachValidator in index[KEY_VALIDATORS]:
+        if validatorName is not None and eachValidator[vrconst_serialization.KEY_VALIDATOR_NAME] != validatorName:
+            continue
+
+        for eachLongName, offset, length in eachValidator[vrconst_serialization.KEY_VALIDATOR_NODES]:
+            if eachLongName == longName:
+                return offset, length, eachValidator.get(vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION, 0)
+
+    return None
+
+
+def _readSlice(filepath, offset, length, stringOffsets=None):
+    # type: (str, int, int, list[int]) -> any
+    if vrc_compression.compressionExtension(filepath):
+        # No random access, decompress up to the end of the slice.
+        with vrc_compression.openRead(filepath) as f:
+            if vrc_parser.isBinary(filepath):
+                return vrc_binaryCodec.loadsAt(f.read(offset + length), offset, length, stringOffsets)
+
+            f.seek(offset)
+            return json.loads(f.read(length).decode("utf-8"))
+
+    with open(filepath, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if vrc_parser.isBinary(filepath):
+                return vrc_binaryCodec.loadsAt(mapped, offset, length, stringOffsets)
+
+            return json.loads(mapped[offset : offset + length].decode("utf-8"))
+        finally:
+            mapped.close()
+
+
+def readSourceNodeData(filepath, longName, validatorName=None):
+    # type: (str, str, str) -> dict
+    """
+    Args:
+        filepath: a validator file, plain or compressed. Compressed files are decompressed up to the sourceNode
+        longName: the sourceNode's longName as saved, ie: under the validator's saved nameSpace
+        validatorName: only look in this validator of a session save, defaults to the first one having longName
+    :return: the sourceNode's SourceNode.toData() migrated to the current schema, None if it isn't in the file
+    """
+    index = readIndex(filepath)
+    if index is None:
+        # No usable index, scan the file instead and try to leave an index for the next time.
+        logger.debug("No offset index for %s, scanning it" % filepath)
+        index = buildIndex(filepath)
+        try:
+            writeIndex(filepath, index)
+        except (IOError, OSError) as e:
+            logger.warning("Couldn't save the offset index of %s: %s" % (filepath, e))
+
+    found = findOffset(index, longName, validatorName)
+    if found is None:
+        return None
+
+    offset, length, version = found
+    nodeData = _readSlice(filepath, offset, length, index.get(KEY_STRINGOFFSETS))
+    return vrc_migrations.migrateSourceNodeData(nodeData, version)
@@ -0,0 +1,227 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+The on disk pages of a PagedValidator, one page per sourceNode in a sqlite database.
+
+A page holds the sourceNode's data, the namespace its longNames were serialized under and the validation statuses
+of the sourceNode and its validityNodes, which aren't part of its data. Pages keep the order they were added in,
+replacing a page keeps its position.
+"""
+import os
+import sqlite3
+import logging
+import tempfile
+
+import simplejson as json
+
+from validateRig.const import constants as vrconst_constants
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    seq INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    nameSpace TEXT NOT NULL,
+    data TEXT NOT NULL,
+    status TEXT
+);
+"""
+
+
+def _dumps(data):
+    # type: (any) -> str
+    return json.dumps(data, separators=(",", ":"))
+
+
+def pageKey(parts):
+    # type: (tuple[str]) -> str
+    """The page key of a validator's sourceNode key, see Validator._sourceNodeKey"""
+    return _dumps(list(parts))
+
+
+class Page(object):
+    __slots__ = ("seq", "key", "nameSpace", "data", "statuses")
+
+    def __init__(self, seq, key, nameSpace, data, statuses):
+        # type: (int, str, str, dict, list) -> None
+        self.seq = seq
+        self.key = key
+        self.nameSpace = nameSpace
+        self.data = data
+        self.statuses = statuses  # [sourceNode status, [validityNode status, ...]] or None if never validated
+
+    @classmethod
+    def fromRow(cls, row):
+        # type: (tuple) -> Page
+        status = row[4]
+        return cls(row[0], row[1], row[2], json.loads(row[3]), json.loads(status) if status else None)
+
+
+class PageStore(object):
+    def __init__(self, path=None):
+        # type: (str) -> None
+        """
+        Args:
+            path: the database file. None creates one in the temp dir which is removed by close
+        """
+        self._ownsPath = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(suffix=vrconst_constants.PAGES_EXT)
+            os.close(handle)
+
+        self._path = path
+        # PagedValidators are QObjects that can be moved to another thread, see loader.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.executescript(_SCHEMA)
+        self._pendingWrites = 0
+
+    @property
+    def path(self):
+        # type: () -> str
+        return self._path
+
+    def close(self):
+        # type: () -> None
+        if self._connection is None:
+            return
+
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
+        if self._ownsPath:
+            try:
+                os.remove(self._path)
+            except OSError:
+                logger.warning("Couldn't remove the page file %s" % self._path)
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def __contains__(self, key):
+        return self._connection.execute("SELECT 1 FROM pages WHERE key = ?", (key,)).fetchone() is not None
+
+    @property
+    def lastSeq(self):
+        # type: () -> int
+        return self._connection.execute("SELECT COALESCE(MAX(seq), 0) FROM pages").fetchone()[0]
+
+    def get(self, key):
+        # type: (str) -> Page
+        row = self._connection.execute(
+            "SELECT seq, key, nameSpace, data, status FROM pages WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        return Page.fromRow(row)
+
+    def iterKeys(self, keys):
+        # type: (list[str]) -> Generator[tuple[int, str]]
+        """Yields (seq, key) of the keys that have a page, in page order"""
+        keys = list(keys)
+        rows = list()
+        for start in range(0, len(keys), vrconst_constants.PAGE_BATCH_SIZE):
+            batch = keys[start:start + vrconst_constants.PAGE_BATCH_SIZE]
+            rows.extend(
+                self._connection.execute(
+                    "SELECT seq, key FROM pages WHERE key IN (%s)" % ",".join("?" * len(batch)), batch
+                )
+            )
+
+        return iter(sorted(rows))
+
+    def iterPages(self, untilSeq=None, skipKeys=None):
+        # type: (int, dict) -> Generator[tuple[int, str, Page]]
+        """
+        Yields (seq, key, page) in page order, reading PAGE_BATCH_SIZE pages at a time.
+
+        Args:
+            untilSeq: stop at the pages added after this seq, eg: a lastSeq taken before iterating
+            skipKeys: page is None for these keys, their data isn't decoded
+        """
+        if untilSeq is None:
+            untilSeq = self.lastSeq
+
+        seq = 0
+        while True:
+            rows = self._connection.execute(
+                "SELECT seq, key, nameSpace, data, status FROM pages "
+                "WHERE seq > ? AND seq <= ? ORDER BY seq LIMIT ?",
+                (seq, untilSeq, vrconst_constants.PAGE_BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                return
+
+            for eachRow in rows:
+                key = eachRow[1]
+                if skipKeys is not None and key in skipKeys:
+                    yield eachRow[0], key, None
+                else:
+                    yield eachRow[0], key, Page.fromRow(eachRow)
+            seq = rows[-1][0]
+
+    def _written(self):
+        # The pages are scratch data, so writes are committed in batches rather than one transaction each.
+        # Reads on the connection see the uncommitted writes.
+        self._pendingWrites += 1
+        if self._pendingWrites >= vrconst_constants.PAGE_BATCH_SIZE:
+            self.commit()
+
+    def commit(self):
+        # type: () -> None
+        self._connection.commit()
+        self._pendingWrites = 0
+
+    def add(self, key, nameSpace, data, statuses=None):
+        # type: (str, str, dict, list) -> None
+        """Adds the page after every other page. :raises IndexError: if the key has a page"""
+        self.addMany(((key, nameSpace, data, statuses),))
+
+    def addMany(self, pages):
+        # type: (Iterable[tuple[str, str, dict, list]]) -> None
+        """Adds (key, nameSpace, data, statuses) pages. :raises IndexError: on a key with a page"""
+        rows = (
+            (key, nameSpace, _dumps(data), _dumps(statuses) if statuses is not None else None)
+            for key, nameSpace, data, statuses in pages
+        )
+        try:
+            self._connection.executemany("INSERT INTO pages (key, nameSpace, data, status) VALUES (?, ?, ?, ?)", rows)
+        except sqlite3.IntegrityError as e:
+            raise IndexError("Duplicate sourceNode page: %s" % e)
+        self._written()
+
+    def update(self, key, nameSpace, data, statuses=None):
+        # type: (str, str, dict, list) -> bool
+        """Rewrites the page in place. :return: False if the key has no page"""
+        args = (nameSpace, _dumps(data), _dumps(statuses) if statuses is not None else None, key)
+        cursor = self._connection.execute("UPDATE pages SET nameSpace = ?, data = ?, status = ? WHERE key = ?", args)
+        self._written()
+
+        return bool(cursor.rowcount)
+
+    def updateStatuses(self, key, statuses):
+        # type: (str, list) -> bool
+        """Rewrites the statuses of the page only. :return: False if the key has no page"""
+        cursor = self._connection.execute("UPDATE pages SET status = ? WHERE key = ?", (_dumps(statuses), key))
+        self._written()
+
+        return bool(cursor.rowcount)
+
+    def rename(self, key, newKey):
+        # type: (str, str) -> bool
+        """Moves the page to newKey, keeping its position. :raises IndexError: if newKey has a page"""
+        try:
+            cursor = self._connection.execute("UPDATE pages SET key = ? WHERE key = ?", (newKey, key))
+        except sqlite3.IntegrityError as e:
+            raise IndexError("Duplicate sourceNode page: %s" % e)
+        self._written()
+
+        return bool(cursor.rowcount)
+
+    def remove(self, key):
+        # type: (str) -> bool
+        cursor = self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+        self._written()
+
+        return bool(cursor.rowcount)
@@ -1,33 +1,207 @@
 #  Copyright (c) 2019.  James Dunlop
+import os
 import logging
 import simplejson as json
 
+from validateRig.const import constants as vrconst_constants
+from validateRig.core import atomicFile as vrc_atomicFile
+from validateRig.core import compression as vrc_compression
+from validateRig.core import jsonStream as vrc_jsonStream
+from validateRig.core import binaryCodec as vrc_binaryCodec
+from validateRig.core import cache as vrc_cache
+
 logger = logging.getLogger(__name__)
 
+WRITE_CHUNK_SIZE = 1024 * 1024
+
+_beforeWriteCallbacks = list()  # See addBeforeWriteCallback
+
+
+SUPPORTED_EXTS = (
+    vrconst_constants.JSON_EXT,
+    vrconst_constants.BINARY_EXT,
+    vrconst_constants.JSON_EXT + vrconst_constants.GZIP_EXT,
+    vrconst_constants.BINARY_EXT + vrconst_constants.ZLIB_EXT,
+)
+
+
+def codecExtension(filepath):
+    # type: (str) -> str
+    """:return: the lowered extension picking the codec, after any compression extension, eg: .json for a.json.gz"""
+    return os.path.splitext(vrc_compression.stripCompressionExtension(filepath))[1].lower()
+
+
+def isBinary(filepath):
+    # type: (str) -> bool
+    """The codec is picked from the extension, .vrig files use the binaryCodec, anything else is json."""
+    return codecExtension(filepath) == vrconst_constants.BINARY_EXT
+
+
+def isSupported(filepath):
+    # type: (str) -> bool
+    """True for the validator files the parser reads, plain or compressed, see SUPPORTED_EXTS"""
+    return filepath.lower().endswith(SUPPORTED_EXTS)
+
+
+def fileStamp(filepath):
+    # type: (str) -> tuple[int, float, int]
+    """:return: (size, mtime, inode) of filepath, which changes whenever the file is written over"""
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime, stat.st_ino
+
+
+def addBeforeWriteCallback(callback):
+    # type: (callable) -> None
+    """
+    callback(filepath) is called before write replaces filepath, eg: to read what's still needed from the file
+    before it's gone, see validator.hydrateLazyValidators
+    """
+    if callback not in _beforeWriteCallbacks:
+        _beforeWriteCallbacks.append(callback)
+
+
+def _useCache(useCache):
+    # type: (bool) -> bool
+    return vrc_cache.enabled() if useCache is None else useCache
 
-def read(filepath):
+
+def read(filepath, useCache=None):
     """
+    Unchanged files are served from the local cache of parsed files, see cache.
 
     :param filepath: `str`
+    :param useCache: `bool` None follows cache.enabled()
     :return: `dict`
     """
+    useCache = _useCache(useCache)
+    if useCache:
+        data = vrc_cache.get(filepath)
+        if data is not None:
+            return data
+
+    if isBinary(filepath):
+        if not useCache:
+            return vrc_binaryCodec.read(filepath)
+
+        return vrc_binaryCodec.loads(_readBinaryAndCache(filepath))
+
     logger.debug("Reading data from %s" % filepath)
-    with open(filepath, "r") as f:
+    with vrc_compression.openRead(filepath) as f:
         data = json.load(f)
 
-        return data
+    if useCache:
+        vrc_cache.put(filepath, data)
+
+    return data
+
+
+def iterRead(filepath, useCache=None):
+    """
+    Streams the validators of a session save or a single validator file without loading the whole file.
+    Unchanged files are streamed from the local cache of parsed files, a file read to the end is cached. See cache.
+
+    :param filepath: `str`
+    :param useCache: `bool` None follows cache.enabled()
+    :return: `Generator[dict]` one dict per validator, its sourceNodes are a generator too. See jsonStream.
+    """
+    useCache = _useCache(useCache)
+    if useCache:
+        validators = vrc_cache.iterGet(filepath)
+        if validators is not None:
+            return validators
+
+    if isBinary(filepath):
+        if useCache:
+            return _iterReadBinaryAndCache(filepath)
+
+        return vrc_binaryCodec.iterValidatorData(filepath)
+
+    validators = vrc_jsonStream.iterValidatorData(filepath)
+    if useCache:
+        return vrc_cache.iterPut(filepath, validators, session=vrc_jsonStream.isSession(filepath))
+
+    return validators
+
+
+def _readBinaryAndCache(filepath):
+    # type: (str) -> bytes
+    # The file's bytes are what the cache holds, no need to encode them again.
+    stamp = vrc_cache.entryStamp(filepath)
+    encoded = vrc_compression.readBytes(filepath)
+    vrc_cache.putBytes(filepath, encoded, stamp=stamp)
+
+    return encoded
+
+
+def _iterReadBinaryAndCache(filepath):
+    # type: (str) -> Generator[dict]
+    # The binaryCodec reads the file in one go anyway.
+    for eachData in vrc_binaryCodec.iterLoads(_readBinaryAndCache(filepath)):
+        yield eachData
+
+
+def iterReadHeaders(filepath):
+    """
+    Reads the validator headers of a session save or a single validator file without decoding any sourceNode.
+
+    :param filepath: `str`
+    :return: `Generator[dict]` one dict per validator holding its name, nameSpace, KEY_VALIDATOR_NODECOUNT and
+        KEY_VALIDATOR_NODESOFFSET, the offset to hand to iterReadNodes.
+    """
+    if isBinary(filepath):
+        return vrc_binaryCodec.iterValidatorHeaders(filepath)
+
+    return vrc_jsonStream.iterValidatorHeaders(filepath)
+
+
+def iterReadNodes(filepath, offset):
+    """
+    :param filepath: `str`
+    :param offset: `int` KEY_VALIDATOR_NODESOFFSET of a header from iterReadHeaders
+    :return: `Generator[dict]` the validator's sourceNode dicts, decoded one at a time
+    """
+    if isBinary(filepath):
+        return vrc_binaryCodec.iterListValues(filepath, offset)
+
+    return vrc_jsonStream.iterArrayValues(filepath, offset)
+
+
+def _writeJSON(outfile, data, sortKeys):
+    # type: (file, any, bool) -> None
+    """Writes the encoder's chunks as they're produced, batched into WRITE_CHUNK_SIZE writes."""
+    encoder = json.JSONEncoder(sort_keys=sortKeys, iterable_as_array=True)
+    chunks = list()
+    size = 0
+    for chunk in encoder.iterencode(data):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= WRITE_CHUNK_SIZE:
+            outfile.write("".join(chunks).encode("utf-8"))
+            del chunks[:]
+            size = 0
 
+    outfile.write("".join(chunks).encode("utf-8"))
 
-def write(filepath, data):
+
+def write(filepath, data, sortKeys=True):
     """
+    Streams the data to a temporary file next to filepath, which replaces filepath once it's complete.
 
     :param filepath: `str`
-    :param data: `dict`
+    :param data: `dict` or `list`, any nested iterable (eg: a generator of sourceNode dicts) is written as an array
+    :param sortKeys: `bool` sort the json keys, handy for diffs but pure overhead on large saves
     :return: `bool`
     """
+    for eachCallback in _beforeWriteCallbacks:
+        eachCallback(filepath)
+
+    if isBinary(filepath):
+        return vrc_binaryCodec.write(filepath, data)
+
     logger.debug("Saving data to %s" % filepath)
-    with open(filepath, "w") as outfile:
-        outfile.write(json.dumps(data, sort_keys=True))
+    with vrc_atomicFile.atomicWrite(filepath) as rawFile:
+        with vrc_compression.wrapWrite(rawFile, filepath) as outfile:
+            _writeJSON(outfile, data, sortKeys)
 
     logger.debug("Successfully saved data to %s" % filepath)
     return True
@@ -0,0 +1,129 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Keeps the plugs a backend resolved between validation runs, so validating again doesn't walk every plugData from
+the node down again.
+
+Entries are keyed on (nodeLongName, plug path), see backend.plugPath. The least recently used ones are evicted past
+maxSize. The backend invalidates a node's entries when the node is deleted, renamed, reparented or re-namespaced,
+see MayaBackend and FakeBackend.
+"""
+import logging
+from collections import OrderedDict
+
+from validateRig.const import constants as vrconst_constants
+
+logger = logging.getLogger(__name__)
+
+
+def _pathNames(nodeLongName):
+    # type: (str) -> list[str]
+    """Each node along the longName's dag path, eg: |grp|ns:ctrl -> ["grp", "ns:ctrl"]"""
+    return [eachName.lstrip(":") for eachName in nodeLongName.split("|") if eachName]
+
+
+class PlugCache(object):
+    def __init__(self, maxSize=vrconst_constants.PLUG_CACHE_SIZE):
+        # type: (int) -> None
+        self._maxSize = max(1, maxSize)
+        self._plugs = OrderedDict()  # {(nodeLongName, path): plug} least recently used first
+        self._pathsByNode = dict()  # {nodeLongName: set(path)}
+        self._nodesByName = dict()  # {name: set(nodeLongName)} for every name along the nodes' dag paths
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxSize(self):
+        return self._maxSize
+
+    def __len__(self):
+        return len(self._plugs)
+
+    def __contains__(self, key):
+        return key in self._plugs
+
+    def get(self, nodeLongName, path):
+        # type: (str, tuple) -> any
+        """:return: the cached plug, None on a miss"""
+        key = (nodeLongName, path)
+        plug = self._plugs.pop(key, None)
+        if plug is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._plugs[key] = plug
+
+        return plug
+
+    def put(self, nodeLongName, path, plug):
+        # type: (str, tuple, any) -> None
+        key = (nodeLongName, path)
+        self._plugs.pop(key, None)
+        self._plugs[key] = plug
+        paths = self._pathsByNode.get(nodeLongName, None)
+        if paths is None:
+            paths = self._pathsByNode[nodeLongName] = set()
+            for eachName in _pathNames(nodeLongName):
+                self._nodesByName.setdefault(eachName, set()).add(nodeLongName)
+        paths.add(path)
+
+        while len(self._plugs) > self._maxSize:
+            (evictedLongName, evictedPath), _ = self._plugs.popitem(last=False)
+            self._forget(evictedLongName, evictedPath)
+
+    def _forget(self, nodeLongName, path):
+        # type: (str, tuple) -> None
+        paths = self._pathsByNode[nodeLongName]
+        paths.discard(path)
+        if paths:
+            return
+
+        del self._pathsByNode[nodeLongName]
+        for eachName in _pathNames(nodeLongName):
+            longNames = self._nodesByName.get(eachName, None)
+            if longNames is None:
+                continue
+
+            longNames.discard(nodeLongName)
+            if not longNames:
+                del self._nodesByName[eachName]
+
+    def invalidateNode(self, nodeLongName):
+        # type: (str) -> int
+        """Drops the node's plugs. :return: the number of plugs dropped"""
+        paths = list(self._pathsByNode.get(nodeLongName, ()))
+        for eachPath in paths:
+            del self._plugs[(nodeLongName, eachPath)]
+            self._forget(nodeLongName, eachPath)
+
+        return len(paths)
+
+    def invalidateName(self, name):
+        # type: (str) -> int
+        """
+        Drops the plugs of every node with name along its dag path, ie: the node and its descendants.
+        For DCC callbacks that only give a node's short name, eg: Maya's name changed callback.
+
+        :return: the number of plugs dropped
+        """
+        count = 0
+        for eachLongName in list(self._nodesByName.get(name.split("|")[-1].lstrip(":"), ())):
+            count += self.invalidateNode(eachLongName)
+
+        return count
+
+    def clear(self):
+        # type: () -> None
+        self._plugs.clear()
+        self._pathsByNode.clear()
+        self._nodesByName.clear()
+
+    def resetStats(self):
+        # type: () -> None
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        # type: () -> dict
+        """:return: {"hits": int, "misses": int, "size": int, "maxSize": int}"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._plugs), "maxSize": self._maxSize}
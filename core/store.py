@@ -0,0 +1,288 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+A sqlite database of validators, to query across every validator of a show without opening each file.
+
+Each sourceNode is a row holding its data as json, next to the columns queries filter on. Its validityNodes are
+indexed one row per attribute they check, the defaultValueData keys of a DefaultValueNode or the source attrName of
+a ConnectionValidityNode. Queries only decode and hydrate the sourceNodes of the rows they match.
+
+    store = ValidatorStore("/shows/abc/validators.db")
+    store.importFile("/shows/abc/assets/hero/validator.json")
+    sourceNodes = store.querySourceNodes(attrName="rotateOrder", longName="*_ctrl")
+
+Filters taking a string match it exactly, or as a glob pattern (case sensitive) if it has any of *?[
+"""
+import os
+import sqlite3
+import logging
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import migrations as vrc_migrations
+from validateRig.core import parser as vrc_parser
+from validateRig.core.nodes import SourceNode
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    nameSpace TEXT NOT NULL,
+    filepath TEXT NOT NULL,
+    UNIQUE (filepath, name)
+);
+CREATE TABLE IF NOT EXISTS sourceNodes (
+    id INTEGER PRIMARY KEY,
+    validatorId INTEGER NOT NULL REFERENCES validators(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    longName TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS validityNodes (
+    sourceNodeId INTEGER NOT NULL REFERENCES sourceNodes(id) ON DELETE CASCADE,
+    nodeType INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    attrName TEXT
+);
+CREATE INDEX IF NOT EXISTS validatorsName ON validators (name);
+CREATE INDEX IF NOT EXISTS validatorsNameSpace ON validators (nameSpace);
+CREATE INDEX IF NOT EXISTS sourceNodesValidator ON sourceNodes (validatorId, position);
+CREATE INDEX IF NOT EXISTS sourceNodesLongName ON sourceNodes (longName);
+CREATE INDEX IF NOT EXISTS validityNodesSourceNode ON validityNodes (sourceNodeId);
+CREATE INDEX IF NOT EXISTS validityNodesAttrName ON validityNodes (attrName);
+CREATE INDEX IF NOT EXISTS validityNodesNodeType ON validityNodes (nodeType);
+"""
+
+_GLOB_CHARS = ("*", "?", "[")
+
+
+def _iterAttrNames(validityData):
+    # type: (dict) -> Generator[str]
+    """The attributes a validityNode checks, see the module docstring"""
+    if validityData.get(vrconst_serialization.KEY_NODETYPE, None) == vrconst_serialization.NT_DEFAULTVALUE:
+        for eachAttrName in validityData.get(vrconst_serialization.KEY_DEFAULTVALUEDATA, None) or dict():
+            yield eachAttrName
+        return
+
+    srcData = (validityData.get(vrconst_serialization.KEY_CONNDATA, None) or dict()).get("srcData", None) or dict()
+    yield srcData.get("attrName", None)
+
+
+def _condition(column, value):
+    # type: (str, any) -> str
+    if not isinstance(value, int) and any(c in value for c in _GLOB_CHARS):
+        return "%s GLOB ?" % column
+
+    return "%s = ?" % column
+
+
+class ValidatorStore(object):
+    def __init__(self, path):
+        # type: (str) -> None
+        """
+        Args:
+            path: the database file, created if it doesn't exist. ":memory:" for a throwaway store
+        """
+        self._path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > STORE_VERSION:
+            raise ValueError("%s was created by a newer validateRig, store version %s" % (path, version))
+
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute("PRAGMA user_version = %d" % STORE_VERSION)
+
+    @property
+    def path(self):
+        # type: () -> str
+        return self._path
+
+    def close(self):
+        # type: () -> None
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # Import
+    def importData(self, data, filepath=""):
+        # type: (any, str) -> list[int]
+        """
+        Stores the validators, replacing any of the same name previously imported from filepath.
+
+        Args:
+            data: a session list or a single Validator.toData(), older schemas are migrated
+            filepath: where the data came from, stored with each validator
+        :return: the ids of the stored validators
+        """
+        validatorIds = list()
+        with self._connection:
+            for eachData in [data] if isinstance(data, dict) else data:
+                validatorIds.append(self._insertValidator(eachData, filepath))
+
+        return validatorIds
+
+    def importValidator(self, validator, filepath=""):
+        # type: (Validator, str) -> int
+        return self.importData(validator.toData(), filepath=filepath)[0]
+
+    def importFile(self, filepath):
+        # type: (str) -> list[int]
+        """Imports every validator of a validator file of any supported format, read through the cache"""
+        filepath = os.path.abspath(filepath)
+        return self.importData(vrc_parser.read(filepath), filepath=filepath)
+
+    def _insertValidator(self, data, filepath):
+        # type: (dict, str) -> int
+        data, version = vrc_migrations.migrateValidatorData(data)
+        name = data.get(vrconst_serialization.KEY_VALIDATOR_NAME, "")
+        nameSpace = data.get(vrconst_serialization.KEY_VALIDATORNAMESPACE, "")
+        cursor = self._connection.cursor()
+        cursor.execute("DELETE FROM validators WHERE filepath = ? AND name = ?", (filepath, name))
+        cursor.execute(
+            "INSERT INTO validators (name, nameSpace, filepath) VALUES (?, ?, ?)", (name, nameSpace, filepath)
+        )
+        validatorId = cursor.lastrowid
+
+        sourceNodes = data.get(vrconst_serialization.KEY_VALIDATOR_NODES, list())
+        validityRows = list()
+        for position, eachData in enumerate(vrc_migrations.migrateSourceNodes(sourceNodes, version)):
+            cursor.execute(
+                "INSERT INTO sourceNodes (validatorId, position, name, longName, data) VALUES (?, ?, ?, ?, ?)",
+                (
+                    validatorId,
+                    position,
+                    eachData.get(vrconst_serialization.KEY_NODENAME, ""),
+                    eachData.get(vrconst_serialization.KEY_NODELONGNAME, ""),
+                    json.dumps(eachData, separators=(",", ":")),
+                ),
+            )
+            sourceNodeId = cursor.lastrowid
+            for eachValidityData in eachData.get(vrconst_serialization.KEY_VAILIDITYNODES, list()):
+                nodeType = eachValidityData.get(vrconst_serialization.KEY_NODETYPE, None)
+                validityName = eachValidityData.get(vrconst_serialization.KEY_NODENAME, "")
+                for eachAttrName in _iterAttrNames(eachValidityData):
+                    validityRows.append((sourceNodeId, nodeType, validityName, eachAttrName))
+
+        cursor.executemany(
+            "INSERT INTO validityNodes (sourceNodeId, nodeType, name, attrName) VALUES (?, ?, ?, ?)", validityRows
+        )
+
+        return validatorId
+
+    # Export
+    def iterValidators(self, name=None, nameSpace=None, filepath=None):
+        # type: (str, str, str) -> Generator[tuple[int, str, str, str]]
+        """Yields (id, name, nameSpace, filepath) of the matching validators"""
+        where, args = self._where((("name", name), ("nameSpace", nameSpace), ("filepath", filepath)))
+        for eachRow in self._connection.execute(
+            "SELECT id, name, nameSpace, filepath FROM validators%s ORDER BY filepath, name" % where, args
+        ):
+            yield eachRow
+
+    def exportData(self, validatorId):
+        # type: (int) -> dict
+        """:return: Validator.toData() of a stored validator"""
+        row = self._connection.execute(
+            "SELECT name, nameSpace FROM validators WHERE id = ?", (validatorId,)
+        ).fetchone()
+        if row is None:
+            raise KeyError("There's no validator %s in %s" % (validatorId, self._path))
+
+        data = dict()
+        data[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+        data[vrconst_serialization.KEY_VALIDATOR_NAME] = row[0]
+        data[vrconst_serialization.KEY_VALIDATORNAMESPACE] = row[1]
+        data[vrconst_serialization.KEY_VALIDATOR_NODES] = [
+            json.loads(eachRow[0])
+            for eachRow in self._connection.execute(
+                "SELECT data FROM sourceNodes WHERE validatorId = ? ORDER BY position", (validatorId,)
+            )
+        ]
+
+        return data
+
+    def exportFile(self, validatorIds, filepath, sortKeys=True):
+        # type: (list[int], str, bool) -> bool
+        """Saves the stored validators as a session save of any supported format"""
+        return vrc_parser.write(filepath, [self.exportData(eachId) for eachId in validatorIds], sortKeys=sortKeys)
+
+    def removeValidator(self, validatorId):
+        # type: (int) -> None
+        with self._connection:
+            self._connection.execute("DELETE FROM validators WHERE id = ?", (validatorId,))
+
+    # Queries
+    @staticmethod
+    def _where(filters):
+        # type: (tuple[tuple[str, any]]) -> tuple[str, list]
+        conditions = list()
+        args = list()
+        for column, value in filters:
+            if value is None:
+                continue
+            conditions.append(_condition(column, value))
+            args.append(value)
+
+        if not conditions:
+            return "", args
+
+        return " WHERE " + " AND ".join(conditions), args
+
+    def _query(self, columns, validatorName, nameSpace, longName, name, attrName, nodeType):
+        filters = (
+            ("v.name", validatorName),
+            ("v.nameSpace", nameSpace),
+            ("s.longName", longName),
+            ("s.name", name),
+        )
+        where, args = self._where(filters)
+        validityWhere, validityArgs = self._where((("vn.attrName", attrName), ("vn.nodeType", nodeType)))
+        if validityWhere:
+            where += (" AND " if where else " WHERE ") + (
+                "s.id IN (SELECT vn.sourceNodeId FROM validityNodes vn%s)" % validityWhere
+            )
+            args.extend(validityArgs)
+
+        return self._connection.execute(
+            "SELECT %s FROM sourceNodes s JOIN validators v ON v.id = s.validatorId%s "
+            "ORDER BY v.filepath, v.name, s.position" % (columns, where),
+            args,
+        )
+
+    def query(self, validatorName=None, nameSpace=None, longName=None, name=None, attrName=None, nodeType=None):
+        # type: (str, str, str, str, str, int) -> list[tuple[int, str, str, str]]
+        """
+        Finds the sourceNodes matching every filter given, nothing is decoded.
+
+        Args:
+            validatorName: the validator's name
+            nameSpace: the validator's nameSpace
+            longName: the sourceNode's longName
+            name: the sourceNode's short name
+            attrName: an attribute one of the sourceNode's validityNodes checks
+            nodeType: the nodeType of one of the sourceNode's validityNodes, eg: NT_DEFAULTVALUE
+        :return: (validator id, validator name, validator filepath, sourceNode longName) per match
+        """
+        columns = "v.id, v.name, v.filepath, s.longName"
+        return self._query(columns, validatorName, nameSpace, longName, name, attrName, nodeType).fetchall()
+
+    def querySourceNodes(
+        self, validatorName=None, nameSpace=None, longName=None, name=None, attrName=None, nodeType=None
+    ):
+        # type: (str, str, str, str, str, int) -> list[SourceNode]
+        """:return: the matching sourceNodes, hydrated with all of their validityNodes. See query"""
+        return [
+            SourceNode.fromData(json.loads(eachRow[0]))
+            for eachRow in self._query("s.data", validatorName, nameSpace, longName, name, attrName, nodeType)
+        ]
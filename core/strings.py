@@ -0,0 +1,76 @@
+#  Copyright (c) 2020.  James Dunlop
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StringPool(object):
+    """
+    Per Validator string interning table. Names, longNames, nameSpaces and attribute names repeat a lot across the
+    nodes of a validator (every DefaultValueNode carries its sourceNode's full DAG path), interning them makes
+    identical strings share one object and lets equality checks short circuit on identity.
+
+    Each pooled string also gets a stable integer id, which is what the columnar ValidityNodeTable stores.
+    """
+
+    __slots__ = ("_strings", "_ids")
+
+    def __init__(self):
+        self._strings = list()
+        self._ids = dict()
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __contains__(self, value):
+        return value in self._ids
+
+    def stringId(self, value):
+        # type: (str) -> int
+        stringId = self._ids.get(value, None)
+        if stringId is None:
+            stringId = len(self._strings)
+            self._strings.append(value)
+            self._ids[value] = stringId
+
+        return stringId
+
+    def string(self, stringId):
+        # type: (int) -> str
+        return self._strings[stringId]
+
+    def intern(self, value):
+        # type: (str) -> str
+        """:return: the pooled object equal to value. None is passed through untouched."""
+        if value is None:
+            return value
+
+        return self._strings[self.stringId(value)]
+
+    def internDefaultValueData(self, data):
+        # type: (dict) -> dict
+        """:return: a copy of defaultValueData {attrName: value} with the attribute name interned."""
+        return dict((self.intern(attrName), value) for attrName, value in data.items())
+
+    def internConnectionData(self, data):
+        # type: (dict) -> dict
+        """Interns the node and plug names of a ConnectionValidityNode's connectionData in place."""
+        for eachKey in ("srcData", "destData"):
+            plugSideData = data.get(eachKey, None)
+            if not isinstance(plugSideData, dict):
+                continue
+
+            for eachNameKey in ("nodeName", "nodeLongName", "attrName"):
+                if eachNameKey in plugSideData:
+                    plugSideData[eachNameKey] = self.intern(plugSideData[eachNameKey])
+
+            # [[isElement, isChild, plugName, plgIdx], [isElement, isChild, plugName, plgIdx]]
+            plugData = plugSideData.get("plugData", None)
+            if not isinstance(plugData, list):
+                continue
+
+            for eachPlug in plugData:
+                if isinstance(eachPlug, list) and len(eachPlug) > 2:
+                    eachPlug[2] = self.intern(eachPlug[2])
+
+        return data
@@ -0,0 +1,256 @@
+#  Copyright (C) Animal Logic Pty Ltd. All rights reserved.
+"""
+Validates and repairs a validator's sourceNodes against a DCC scene through a Backend, see core/backend.py.
+Pass a backend or leave it to backend.getBackend, eg: Maya's when running inside Maya.
+"""
+import logging
+
+from validateRig.const import serialization as c_serialization
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import plugTypes as vrconst_plugTypes
+from validateRig.core import backend as vrc_backend
+
+logger = logging.getLogger(__name__)
+
+
+def _resolveBackend(backend):
+    # type: (vrc_backend.Backend) -> vrc_backend.Backend
+    if backend is None:
+        backend = vrc_backend.getBackend()
+
+    if backend is None:
+        raise RuntimeError("No DCC backend to validate against, pass one or see backend.setBackend")
+
+    return backend
+
+
+def _iterLongNames(validator):
+    # type: (Validator) -> Generator[str]
+    """Every node longName validating / repairing the validator looks at"""
+    for eachSourceNode in validator.iterSourceNodes():
+        yield eachSourceNode.longName
+        for eachValidationNode in eachSourceNode.iterDescendants():
+            yield eachValidationNode.longName
+            if eachValidationNode.nodeType != c_serialization.NT_CONNECTIONVALIDITY:
+                continue
+
+            connectionData = eachValidationNode.connectionData
+            yield connectionData["srcData"]["nodeLongName"]
+            yield connectionData["destData"]["nodeLongName"]
+
+
+def _resolveNodes(validator, backend):
+    # type: (Validator, vrc_backend.Backend) -> dict
+    """
+    Resolves every node of the validator in one pass up front, rather than looking each node up again for every
+    check and plug. :return: {nodeLongName: node}, see Backend.resolveNodes. A missing node isn't in it.
+    """
+    return backend.resolveNodes(_iterLongNames(validator))
+
+
+##############################################
+# VALIDATE
+def validateValidatorSourceNodes(validator, backend=None):
+    # type: (Validator, vrc_backend.Backend) -> None
+    backend = _resolveBackend(backend)
+    nodes = _resolveNodes(validator, backend)
+
+    validator.status = vrconst_constants.NODE_VALIDATION_PASSED
+    for eachSourceNode in validator.iterSourceNodes():
+        logger.debug("Validating sourceNode: %s" % eachSourceNode.longName)
+        eachSourceNode.status = vrconst_constants.NODE_VALIDATION_PASSED
+        srcNodeName = eachSourceNode.longName
+        if srcNodeName not in nodes:
+            logger.error("Missing node %s" % eachSourceNode.longName)
+            eachSourceNode.status = vrconst_constants.NODE_VALIDATION_MISSINGSRC
+            validator.status = vrconst_constants.NODE_VALIDATION_MISSINGSRC
+            # Set all children to failed
+            eachSourceNode.resetStatus(vrconst_constants.NODE_VALIDATION_MISSINGSRC)
+            continue
+
+        defaultStatus = __validateDefaultNodes(eachSourceNode, backend, nodes)
+        connectionStatus = __validateConnectionNodes(eachSourceNode, backend, nodes)
+
+        passed = all((defaultStatus, connectionStatus))
+        if not passed:
+            eachSourceNode.status = vrconst_constants.NODE_VALIDATION_FAILED
+            validator.status = vrconst_constants.NODE_VALIDATION_FAILED
+
+    logger.debug("Plug cache: %s" % backend.plugCache.stats())
+
+
+def __validateDefaultNodes(sourceNode, backend, nodes):
+    # type: (SourceNode, vrc_backend.Backend, dict) -> bool
+
+    passed = True
+    for eachValidationNode in sourceNode.iterDescendants(c_serialization.NT_DEFAULTVALUE):
+        defaultNodeLongName = eachValidationNode.longName
+        if defaultNodeLongName not in nodes:
+            eachValidationNode.status = vrconst_constants.NODE_VALIDATION_MISSINGSRC
+            continue
+
+        data = eachValidationNode.defaultValueData
+        dvAttrName = list(data.keys())[0]
+        dvValue = list(data.values())[0]
+        logger.debug("defaultNodeLongName: %s dvName: %s dvValue: %s" % (defaultNodeLongName, dvAttrName, dvValue))
+
+        dvPlug = backend.resolvePlug(defaultNodeLongName, nodes[defaultNodeLongName], dvAttrName)
+        result = backend.valueMatches(dvPlug, dvValue)
+        if not setValidationStatus(eachValidationNode, result):
+            passed = False
+
+    return passed
+
+
+def __validateConnectionNodes(sourceNode, backend, nodes):
+    # type: (SourceNode, vrc_backend.Backend, dict) -> bool
+
+    passed = True
+    for eachValidationNode in sourceNode.iterDescendants(c_serialization.NT_CONNECTIONVALIDITY):
+        destNode = nodes.get(eachValidationNode.connectionData["destData"]["nodeLongName"], None)
+        if eachValidationNode.longName not in nodes or destNode is None:
+            eachValidationNode.status = vrconst_constants.NODE_VALIDATION_MISSINGDEST
+            continue
+        # {'destData': {'attrValue'   : 0.0,
+        #               'nodeLongName': u':testRigNamespace:jd_hermiteArrayCrv1',
+        #               'nodeName'    : u'testRigNamespace:jd_hermiteArrayCrv1',
+        #               'plugData'    : [[False, True, u'inTangentWeight', 0],
+        #                                [True, False, u'cvs', 0]]},
+        #  'srcData' : {'attrName'    : u'translateX',
+        #               'attrValue'   : 0.0,
+        #               'nodeLongName': u'|myChar|rig|testRigNamespace:mycharName_hrc|testRigNamespace:rig'
+        #                               u'|testRigNamespace:control_layer|testRigNamespace:master_ctrl_srtBuffer'
+        #                               u'|testRigNamespace:body_ctrl',
+        #               'plugData'    : [[False, True, u'translateX', 0],
+        #                                [False, False, u'translate', None]]}}
+        connectionData = eachValidationNode.connectionData
+
+        srcData = connectionData.get("srcData", None)
+        srcAttrName = srcData.get("attrName", None)
+        srcAttrValue = srcData.get("attrValue", None)
+        srcPlugData = srcData.get("plugData", None)
+        logger.debug("srcAttrName: %s srcAttrValue: %s srcPlugData: %s" % (srcAttrName, srcAttrValue, srcPlugData))
+        srcPlug = backend.resolvePlug(sourceNode.longName, nodes[sourceNode.longName], srcAttrName, srcPlugData)
+
+        destData = connectionData.get("destData", None)
+        destNodeName = destData.get("nodeLongName", None)
+        destAttrValue = destData.get("attrValue", None)
+        destPlugData = destData.get("plugData", None)
+        logger.debug("destNodeName: %s destAttrValue: %s destPlugData: %s" % (destNodeName, destAttrValue, destPlugData))
+        destPlug = backend.resolvePlug(destNodeName, destNode, destPlugData[0][2], destPlugData)
+
+        connectedSource = backend.connectedSource(destPlug)
+        result = connectedSource is not None and connectedSource == srcPlug
+        if not setValidationStatus(eachValidationNode, result):
+            logger.debug("NOT CONNECTED %s %s " % (backend.plugName(srcPlug), backend.plugName(destPlug)))
+            passed = False
+
+        # DEFAULT VALUES OF THE SRC ATTR NOW AS WE CULL DEFAULT VALUE NODES IF THEY'RE ALREADY CONNECTION ATTRS
+        resultSrcValue = True
+        if backend.plugType(srcPlug) not in vrconst_plugTypes.GETATTR_IGNORESTYPES:
+            resultSrcValue = backend.valueMatches(srcPlug, srcAttrValue)
+
+        resultDestValue = True
+        if backend.plugType(destPlug) not in vrconst_plugTypes.GETATTR_IGNORESTYPES:
+            resultDestValue = backend.valueMatches(destPlug, destAttrValue)
+
+        result = all((result, resultSrcValue, resultDestValue))
+        if not setValidationStatus(eachValidationNode, result):
+            logger.debug("NOT AT DEFAULT VALUE %s %s " % (backend.plugName(srcPlug), backend.plugName(destPlug)))
+            passed = False
+
+    return passed
+
+
+##############################################
+# REPAIR
+def repairValidatorSourceNodes(validator, backend=None):
+    # type: (Validator, vrc_backend.Backend) -> None
+    backend = _resolveBackend(backend)
+    nodes = _resolveNodes(validator, backend)
+
+    for eachSourceNode in validator.iterSourceNodes():
+        srcNodeName = eachSourceNode.longName
+        if srcNodeName not in nodes:
+            continue
+
+        defaultStatus = __repairDefaultNodes(eachSourceNode, backend, nodes)
+        connectionStatus = __repairConnectionNodes(eachSourceNode, backend, nodes)
+
+        passed = all((defaultStatus, connectionStatus))
+        if passed:
+            validator.status = vrconst_constants.NODE_VALIDATION_FAILED
+        else:
+            validator.status = vrconst_constants.NODE_VALIDATION_PASSED
+
+
+def __repairDefaultNodes(sourceNode, backend, nodes):
+    # type: (SourceNode, vrc_backend.Backend, dict) -> bool
+
+    for eachValidationNode in sourceNode.iterDescendants(c_serialization.NT_DEFAULTVALUE):
+        if eachValidationNode.status == vrconst_constants.NODE_VALIDATION_PASSED:
+            continue
+
+        node = nodes.get(eachValidationNode.longName, None)
+        if node is None:
+            continue
+
+        srcPlug = backend.resolvePlug(eachValidationNode.longName, node, eachValidationNode.name)
+        data = eachValidationNode.defaultValueData
+        defaultValue = list(data.values())[0]
+        backend.setPlugValue(srcPlug, defaultValue)
+
+        setValidationStatus(eachValidationNode, True)
+
+    return True
+
+
+def __repairConnectionNodes(sourceNode, backend, nodes):
+    # type: (SourceNode, vrc_backend.Backend, dict) -> bool
+
+    modifier = backend.createModifier()
+
+    for eachValidationNode in sourceNode.iterDescendants(c_serialization.NT_CONNECTIONVALIDITY):
+        if eachValidationNode.status == vrconst_constants.NODE_VALIDATION_PASSED:
+            continue
+
+        data = eachValidationNode.connectionData
+        srcData = data.get("srcData", None)
+        srcAttrName = srcData.get("attrName", None)
+        srcNodeName = srcData.get("nodeLongName", None)
+        srcAttrValue = srcData.get("attrValue", None)
+        srcPlugData = srcData.get("plugData", None)
+        destData = data.get("destData", None)
+        destNodeName = destData.get("nodeLongName", None)
+        if srcNodeName not in nodes or destNodeName not in nodes:
+            continue
+
+        srcPlug = backend.resolvePlug(srcNodeName, nodes[srcNodeName], srcAttrName, srcPlugData)
+        logger.debug("srcPlugData: %s srcPlug: %s" % (srcPlugData, srcPlug))
+
+        destPlugData = destData.get("plugData", None)
+        destPlug = backend.resolvePlug(destNodeName, nodes[destNodeName], destPlugData[0][2], destPlugData)
+        logger.debug("destPlugData: %s destPlug: %s" % (destPlugData, destPlug))
+
+        if not backend.isDestination(destPlug):
+            modifier.connect(srcPlug, destPlug)
+
+        # This may also be connected to. So we skip setting the default value for this plug.
+        if not backend.isDestination(srcPlug):
+            backend.setPlugValue(srcPlug, srcAttrValue)
+
+        setValidationStatus(eachValidationNode, True)
+        modifier.doIt()
+
+    return True
+
+
+def setValidationStatus(validationNode, result):
+    # type: (ValidationNode, bool) -> bool
+
+    if result:
+        validationNode.status = vrconst_constants.NODE_VALIDATION_PASSED
+        return result
+
+    validationNode.status = vrconst_constants.NODE_VALIDATION_FAILED
+    return result
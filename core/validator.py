@@ -1,5 +1,8 @@
 #  Copyright (C) Animal Logic Pty Ltd. All rights reserved.
+import os
 import logging
+import weakref
+from collections import OrderedDict
 from PySide2 import QtCore
 from PySide2.QtCore import Signal
 
@@ -7,9 +10,17 @@ from validateRig.const import serialization as vrconst_serialization
 from validateRig.const import constants as vrconst_constants
 from validateRig.core import parser as c_parser
 from validateRig.core.nodes import SourceNode
+from validateRig.core.nodeTable import ColumnarSourceNode
+from validateRig.core.strings import StringPool
+from validateRig.core.nameSpaces import NameSpaceContext
+from validateRig.core import journal as vrc_journal
+from validateRig.core import migrations as vrc_migrations
+from validateRig.core import pageStore as vrc_pageStore
 
 logger = logging.getLogger(__name__)
 
+_unhydratedValidators = weakref.WeakSet()  # LazyValidators still reading from their file, see hydrateLazyValidators
+
 
 class Validator(QtCore.QObject):
     validate = Signal(QtCore.QObject)
@@ -19,13 +30,70 @@ class Validator(QtCore.QObject):
     def __init__(self, name, nameSpace="", nodes=None):
         # type: (str, str, list) -> None
         QtCore.QObject.__init__(self, None)
+        self._stringPool = StringPool()  # Shared by every node hydrated into this validator.
         self._name = name  # name of the validator.
         self._nameSpace = nameSpace # This can be mutated by UI
         self._nameSpaceOnCreate = nameSpace # this doesn't change after creation
-        self._nodes = (
-            nodes or list()
-        )  # list of SourceNodes with ConnectionValidityNodes
+        # Node longNames are stored relative to this, see updateNameSpaceInLongName
+        self._nameSpaceContext = NameSpaceContext(nameSpace)
+        self._journal = vrc_journal.ChangeJournal()
+        self._nameSpaceContext.journal = self._journal
+        self._nameSpaceContext.validator = self
+        # SourceNodes with ConnectionValidityNodes keyed by their namespace relative longName parts. Insertion
+        # ordered so iterSourceNodes / toData keep the order the nodes were added in.
+        self._nodes = OrderedDict()
         self._status = vrconst_constants.NODE_VALIDATION_FAILED
+        if nodes is not None:
+            self.addSourceNodes(nodes, force=True)
+
+    @property
+    def stringPool(self):
+        return self._stringPool
+
+    @property
+    def nameSpaceContext(self):
+        return self._nameSpaceContext
+
+    @property
+    def journal(self):
+        return self._journal
+
+    @property
+    def dirty(self):
+        """True if anything changed since the validator was loaded / last marked clean"""
+        return bool(len(self._journal))
+
+    def iterDirtySourceNodes(self):
+        # type: () -> Generator[SourceNode]
+        for eachNode in self.iterSourceNodes():
+            if eachNode.dirty:
+                yield eachNode
+
+    def changedSourceNodes(self, since=0):
+        # type: (int) -> list[SourceNode]
+        """:return: the sourceNodes added or updated since the journal serial, see ChangeJournal.changedSourceNodes"""
+        return self._journal.changedSourceNodes(since)
+
+    @property
+    def hydrated(self):
+        """False while the sourceNodes are still on disk, see LazyValidator"""
+        return True
+
+    def hydrate(self):
+        # type: () -> bool
+        return False
+
+    @property
+    def nodeCount(self):
+        # type: () -> int
+        return len(self._nodes)
+
+    def markClean(self):
+        """Clears the journal and the dirty flags, eg: once the validator has been saved."""
+        for eachNode in self.iterDirtySourceNodes():
+            eachNode.markClean()
+
+        self._journal.clear()
 
     @property
     def nameSpaceOnCreate(self):
@@ -69,11 +137,40 @@ class Validator(QtCore.QObject):
     def passed(self):
         return self.status == vrconst_constants.NODE_VALIDATION_PASSED
 
+    def _sourceNodeKey(self, longName):
+        # type: (str) -> tuple[str]
+        # Relative parts don't change when the namespace is retargeted, so the index never needs rebuilding.
+        return self._nameSpaceContext.relativeParts(longName)
+
+    def sourceNodeRenamed(self, sourceNode, key, newKey):
+        # type: (SourceNode, tuple[str], tuple[str]) -> None
+        """
+        Re-keys a sourceNode of this validator about to get a new longName, keeping its position. Called by the
+        sourceNode's longName setter.
+
+        Args:
+            key: the sourceNode's current key, see _sourceNodeKey
+            newKey: its key once renamed
+
+        :raises IndexError: if another sourceNode has the new longName, the sourceNode keeps its longName
+        """
+        if newKey == key or self._nodes.get(key, None) is not sourceNode:
+            return
+
+        if newKey in self._nodes:
+            raise IndexError(
+                "Can't rename %s, %s already exists in validator!"
+                % (sourceNode.longName, self._nameSpaceContext.resolve(newKey))
+            )
+
+        # Rebuilt to keep the order, renames are rare next to lookups.
+        self._nodes = OrderedDict(
+            (newKey if eachKey == key else eachKey, eachNode) for eachKey, eachNode in self._nodes.items()
+        )
+
     def findSourceNodeByLongName(self, longName):
         # type: (str) -> SourceNode
-        for eachNode in self.iterSourceNodes():
-            if eachNode.longName == longName:
-                return eachNode
+        return self._nodes.get(self._sourceNodeKey(longName), None)
 
     def sourceNodeExists(self, sourceNode):
         # type: (SourceNode) -> bool
@@ -83,38 +180,37 @@ class Validator(QtCore.QObject):
 
     def sourceNodeLongNameExists(self, sourceNodeLongName):
         # type: (str) -> bool
-        sourceNodeNames = [n.longName for n in self.iterSourceNodes()]
-        exists = sourceNodeLongName in sourceNodeNames
-
-        return exists
+        return self._sourceNodeKey(sourceNodeLongName) in self._nodes
 
     def replaceExistingSourceNode(self, sourceNode):
         # type: (SourceNode) -> bool
-        """Replace an existing index in the list with the sourceNode"""
-        for x, node in enumerate(self._nodes):
-            if node.longName == sourceNode.longName:
-                self._nodes[x] = sourceNode
-                return True
-
-        return False
+        """Replace an existing sourceNode of the same longName, keeping its position in the validator"""
+        key = self._sourceNodeKey(sourceNode.longName)
+        if key not in self._nodes:
+            return False
+
+        sourceNode.relativizeLongNames(self._nameSpaceContext)
+        self._journal.record(vrc_journal.JOURNAL_REMOVED, self._nodes[key])
+        self._journal.record(vrc_journal.JOURNAL_ADDED, sourceNode)
+        self._nodes[key] = sourceNode
+        return True
 
     def addSourceNode(self, sourceNode, force=False):
         # type: (SourceNode, bool) -> bool
         logger.debug("Adding sourceNode: %s" % sourceNode.longName)
         if not self.sourceNodeExists(sourceNode):
-            self._nodes.append(sourceNode)
+            sourceNode.relativizeLongNames(self._nameSpaceContext)
+            self._nodes[self._sourceNodeKey(sourceNode.longName)] = sourceNode
+            self._journal.record(vrc_journal.JOURNAL_ADDED, sourceNode)
             return True
 
-        if self.sourceNodeExists(sourceNode) is not None and force:
+        if force:
             return self.replaceExistingSourceNode(sourceNode)
 
-        if self.sourceNodeExists(sourceNode) and not force:
-            raise IndexError(
-                "%s already exists in validator. Use force=True if you want to overwrite existing!"
-                % sourceNode
-            )
-
-        return False
+        raise IndexError(
+            "%s already exists in validator. Use force=True if you want to overwrite existing!"
+            % sourceNode
+        )
 
     def addSourceNodes(self, sourceNodes, force=False):
         # type: (list[SourceNode], bool) -> None
@@ -123,28 +219,42 @@ class Validator(QtCore.QObject):
 
         return True
 
-    def addSourceNodeFromData(self, data):
-        # type: (dict) -> SourceNode
-        sourceNode = SourceNode.fromData(data)
+    def addSourceNodeFromData(self, data, columnar=False, nameSpace=None):
+        # type: (dict, bool, str) -> SourceNode
+        """
+        Args:
+            data: previously serialized SourceNode.toData()
+            columnar: if True the validityNodes are stored in a ColumnarSourceNode table instead of as objects
+            nameSpace: the namespace the data's longNames were saved under, defaults to the validator's
+        """
+        if columnar:
+            sourceNode = ColumnarSourceNode.fromData(data, stringPool=self._stringPool)
+        else:
+            sourceNode = SourceNode.fromData(data, stringPool=self._stringPool)
+        if nameSpace is not None:
+            sourceNode.relativizeLongNames(self._nameSpaceContext.savedUnder(nameSpace))
         self.addSourceNode(sourceNode)
 
         return sourceNode
 
     def removeSourceNode(self, sourceNode):
         # type: (SourceNode) -> bool
-        for eachSourceNode in self.iterSourceNodes():
-            if eachSourceNode == sourceNode:
-                self._nodes.remove(eachSourceNode)
-                logger.debug("Removed: %s" % eachSourceNode.longName)
-                logger.debug("_nodes: %s" % [n.name for n in self._nodes])
-                logger.debug("iterSourceNodes: %s" % [n.name for n in self.iterSourceNodes()])
-                return True
+        if sourceNode is None:
+            return False
 
-        return False
+        key = self._sourceNodeKey(sourceNode.longName)
+        if self._nodes.get(key, None) is not sourceNode:
+            return False
+
+        del self._nodes[key]
+        self._journal.record(vrc_journal.JOURNAL_REMOVED, sourceNode)
+        logger.debug("Removed: %s" % sourceNode.longName)
+        return True
 
     def iterSourceNodes(self):
         # type: (SourceNode) -> Generator[SourceNode]
-        for eachNode in self._nodes:
+        # Snapshot the values so callers can add / remove sourceNodes while iterating.
+        for eachNode in list(self._nodes.values()):
             yield eachNode
 
     def validateValidatorSourceNodes(self):  # pragma: no cover
@@ -163,44 +273,33 @@ class Validator(QtCore.QObject):
         self.displayNameChanged.emit(True)
 
     def _setAllNodeDisplayNamesAsLongName(self):
-        for eachSrcNode in self.iterSourceNodes():
-            eachSrcNode.displayName = eachSrcNode.longName
-            for eachChild in eachSrcNode.iterDescendants():
-                if eachChild.nodeType == vrconst_serialization.NT_CONNECTIONVALIDITY:
-                    if ":" in eachChild.longName:
-                        eachChild.displayName = eachChild.longName
-
-        self.displayNameChanged.emit(True)
+        # The displayNames are derived from the mode when read, nothing is touched per node here.
+        self._nameSpaceContext.setDisplayMode(vrconst_constants.DISPLAYNAME_LONGNAME)
 
     def _setAllNodeDisplayNamesToNamespaceShortName(self):
-        for eachSrcNode in self.iterSourceNodes():
-            eachSrcNode.displayName = self.__createNameSpacedShortName(eachSrcNode)
-            for eachChild in eachSrcNode.iterDescendants():
-                if eachChild.nodeType == vrconst_serialization.NT_CONNECTIONVALIDITY:
-                    if ":" in eachChild.longName:
-                        eachChild.displayName = self.__createNameSpacedShortName(eachChild)
-
-    def __createNameSpacedShortName(self, node):
-        # type: (Node) -> str
-        shortName = "{}:{}".format(self.nameSpace, node.name) if self.nameSpace else node.name
-        return shortName
+        self._nameSpaceContext.setDisplayMode(vrconst_constants.DISPLAYNAME_NAMESPACESHORTNAME, self.nameSpace)
 
     def updateNameSpaceInLongName(self, nameSpace):
         # type: (str) -> None
-        for eachSrcNode in self.iterSourceNodes():
-            newLongName = self.replaceNameSpace(eachSrcNode.longName, nameSpace)
-            eachSrcNode.longName = newLongName
-
-            for eachChild in eachSrcNode.iterDescendants():
-                newChildLongName = self.replaceNameSpace(eachChild.longName, nameSpace)
-                eachChild.longName = newChildLongName
-                if eachChild.nodeType == vrconst_serialization.NT_CONNECTIONVALIDITY:
-                    # update namespace in connectionData
-                    data = eachChild.connectionData
-                    destData = data.get("destData", None)
-                    destNodeName = self.replaceNameSpace(destData.get("nodeLongName", None), nameSpace)
-                    destData["nodeLongName"] = destNodeName
-                    eachChild.connectionData = data
+        """
+        Retargets the longNames of every node from nameSpace to the current self.nameSpace.
+        The longNames are stored relative to the validator's NameSpaceContext so this only bumps its version,
+        the nodes resolve their new longName when next read.
+
+        Args:
+            nameSpace: the namespace being replaced
+        """
+        if nameSpace != self._nameSpaceContext.nameSpace:
+            logger.warning(
+                "Replacing nameSpace %s but the longNames currently resolve to %s"
+                % (nameSpace, self._nameSpaceContext.nameSpace)
+            )
+
+        if self.nameSpace != self._nameSpaceContext.nameSpace:
+            self._journal.record(
+                vrc_journal.JOURNAL_NAMESPACE, value=(self._nameSpaceContext.nameSpace, self.nameSpace)
+            )
+        self._nameSpaceContext.nameSpace = self.nameSpace
 
     def replaceNameSpace(self, nodeLongName, nameSpace):
         # type: (str, str) -> str
@@ -217,6 +316,7 @@ class Validator(QtCore.QObject):
 
     def toData(self):
         data = dict()
+        data[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
         data[vrconst_serialization.KEY_VALIDATOR_NAME] = self.name
         data[vrconst_serialization.KEY_VALIDATORNAMESPACE] = self.nameSpace
         data[vrconst_serialization.KEY_VALIDATOR_NODES] = list()
@@ -231,16 +331,547 @@ class Validator(QtCore.QObject):
         return True
 
     @classmethod
-    def fromData(cls, name, data):
+    def from_fileJSON(cls, filePath, columnar=False):
+        # type: (str, bool) -> Validator
+        """Reads a file written by to_fileJSON, through the local cache of parsed files when it's on, see cache"""
+        data = c_parser.read(filePath)
+        name = data.get(vrconst_serialization.KEY_VALIDATOR_NAME, "")
+
+        return cls.fromData(name, data, columnar=columnar)
+
+    @classmethod
+    def fromData(cls, name, data, columnar=False):
+        # type: (str, dict, bool) -> Validator
+        """
+        Args:
+            data: Validator.toData() or a header from parser.iterRead, whose sourceNodes are consumed as a stream.
+                Data of an older schema is migrated in place as it's hydrated, see migrations.
+            columnar: store the validityNodes in columnar tables, use this for very large validators
+        """
+        data, version = vrc_migrations.migrateValidatorData(data)
         nameSpace = data.get(vrconst_serialization.KEY_VALIDATORNAMESPACE, "")
         if name is None:
             name = data.get(vrconst_serialization.KEY_NODENAME, None)
 
         inst = cls(name, nameSpace)
-        for sourceNodeData in data.get(vrconst_serialization.KEY_VALIDATOR_NODES, list()):
-            inst.addSourceNodeFromData(sourceNodeData)
+        sourceNodes = data.get(vrconst_serialization.KEY_VALIDATOR_NODES, list())
+        for sourceNodeData in vrc_migrations.migrateSourceNodes(sourceNodes, version):
+            inst.addSourceNodeFromData(sourceNodeData, columnar=columnar)
+        inst.markClean()
 
         return inst
 
     def __repr__(self):
         return "%s" % self.name
+
+
+class LazyValidator(Validator):
+    """
+    A Validator loaded from a header of parser.iterReadHeaders. Only its name, nameSpace and node count are known
+    until something asks for its sourceNodes, then every sourceNode is hydrated from the file in one pass.
+    The UI hydrates when the validator's tab is opened or it is validated. Saving a validator that was never
+    hydrated streams its sourceNode dicts straight from the file.
+    """
+
+    def __init__(
+        self,
+        name,
+        nameSpace="",
+        filepath=None,
+        nodesOffset=None,
+        nodeCount=0,
+        columnar=False,
+        schemaVersion=None,
+        fileStamp=None,
+    ):
+        # type: (str, str, str, int, int, bool, int, tuple) -> None
+        """
+        Args:
+            filepath: the file the header was read from
+            nodesOffset: KEY_VALIDATOR_NODESOFFSET of the header
+            nodeCount: KEY_VALIDATOR_NODECOUNT of the header
+            columnar: hydrate the validityNodes into columnar tables, see Validator.fromData
+            schemaVersion: the schema version the sourceNodes were saved as, defaults to the current one
+            fileStamp: parser.fileStamp(filepath) when the header was read, the offset is only good for that file
+        """
+        super(LazyValidator, self).__init__(name, nameSpace)
+        self._filepath = filepath
+        self._nodesOffset = nodesOffset
+        self._nodeCount = nodeCount
+        self._columnar = columnar
+        self._hydrated = nodesOffset is None
+        self._fileStamp = fileStamp
+        if schemaVersion is None:
+            schemaVersion = vrconst_serialization.SCHEMA_VERSION
+        self._schemaVersion = schemaVersion
+        if not self._hydrated:
+            _unhydratedValidators.add(self)
+
+    @property
+    def hydrated(self):
+        return self._hydrated
+
+    @property
+    def nodeCount(self):
+        # type: () -> int
+        if not self._hydrated:
+            return self._nodeCount
+
+        return len(self._nodes)
+
+    def hydrate(self):
+        # type: () -> bool
+        """Reads the sourceNodes from the file. :return: False if they were already hydrated"""
+        if self._hydrated:
+            return False
+
+        # Check the file first, nothing's lost if it changed and we raise.
+        sourceNodes = self._iterReadSourceNodeData()
+        # Flag first, addSourceNodeFromData goes through the overrides below.
+        self._hydrated = True
+        _unhydratedValidators.discard(self)
+        logger.debug("Hydrating %s sourceNodes of %s from %s" % (self._nodeCount, self.name, self._filepath))
+        serial = self._journal.serial
+        # The longNames on disk are under the namespace the header was read with, relativize them against that.
+        for sourceNodeData in sourceNodes:
+            self.addSourceNodeFromData(sourceNodeData, columnar=self._columnar, nameSpace=self._nameSpaceOnCreate)
+
+        # Loading isn't a change, but anything journaled before hydrating (a namespace retarget) still stands.
+        self._journal.discard(serial)
+        for eachNode in self._nodes.values():
+            eachNode.markClean()
+
+        return True
+
+    def _iterReadSourceNodeData(self):
+        # type: () -> Generator[dict]
+        """
+        The sourceNode dicts streamed from the file, migrated to the current schema as they're read.
+        :raises IOError: if the file was written over since the header was read, its offset is meaningless now
+        """
+        if self._fileStamp is not None and c_parser.fileStamp(self._filepath) != self._fileStamp:
+            raise IOError(
+                "%s changed since the validator %s was loaded from it, reload the file" % (self._filepath, self.name)
+            )
+
+        sourceNodes = c_parser.iterReadNodes(self._filepath, self._nodesOffset)
+        return vrc_migrations.migrateSourceNodes(sourceNodes, self._schemaVersion)
+
+    def findSourceNodeByLongName(self, longName):
+        # type: (str) -> SourceNode
+        self.hydrate()
+        return super(LazyValidator, self).findSourceNodeByLongName(longName)
+
+    def sourceNodeLongNameExists(self, sourceNodeLongName):
+        # type: (str) -> bool
+        self.hydrate()
+        return super(LazyValidator, self).sourceNodeLongNameExists(sourceNodeLongName)
+
+    def replaceExistingSourceNode(self, sourceNode):
+        # type: (SourceNode) -> bool
+        self.hydrate()
+        return super(LazyValidator, self).replaceExistingSourceNode(sourceNode)
+
+    def removeSourceNode(self, sourceNode):
+        # type: (SourceNode) -> bool
+        self.hydrate()
+        return super(LazyValidator, self).removeSourceNode(sourceNode)
+
+    def iterSourceNodes(self):
+        # type: () -> Generator[SourceNode]
+        self.hydrate()
+        return super(LazyValidator, self).iterSourceNodes()
+
+    def iterDirtySourceNodes(self):
+        # type: () -> Generator[SourceNode]
+        # Nothing is dirty before hydrating, don't hydrate just to find that out.
+        if not self._hydrated:
+            return iter(())
+
+        return super(LazyValidator, self).iterDirtySourceNodes()
+
+    def validateValidatorSourceNodes(self):  # pragma: no cover
+        self.hydrate()
+        super(LazyValidator, self).validateValidatorSourceNodes()
+
+    def repairValidatorSourceNodes(self):  # pragma: no cover
+        self.hydrate()
+        super(LazyValidator, self).repairValidatorSourceNodes()
+
+    def toData(self):
+        # The nodes on disk only match the header as long as the validator hasn't been retargeted.
+        if self._hydrated or self._nameSpaceContext.nameSpace != self._nameSpaceOnCreate:
+            self.hydrate()
+            return super(LazyValidator, self).toData()
+
+        data = dict()
+        data[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+        data[vrconst_serialization.KEY_VALIDATOR_NAME] = self.name
+        data[vrconst_serialization.KEY_VALIDATORNAMESPACE] = self.nameSpace
+        data[vrconst_serialization.KEY_VALIDATOR_NODES] = list(self._iterReadSourceNodeData())
+
+        return data
+
+    @classmethod
+    def fromHeader(cls, filepath, header, name=None, columnar=False):
+        # type: (str, dict, str, bool) -> LazyValidator
+        """
+        Args:
+            filepath: the file the header was read from
+            header: one of parser.iterReadHeaders(filepath)
+        """
+        header, version = vrc_migrations.migrateValidatorData(header)
+        if name is None:
+            name = header.get(vrconst_serialization.KEY_VALIDATOR_NAME, None)
+
+        return cls(
+            name,
+            header.get(vrconst_serialization.KEY_VALIDATORNAMESPACE, ""),
+            filepath=filepath,
+            nodesOffset=header.get(vrconst_serialization.KEY_VALIDATOR_NODESOFFSET, None),
+            nodeCount=header.get(vrconst_serialization.KEY_VALIDATOR_NODECOUNT, 0),
+            columnar=columnar,
+            schemaVersion=version,
+            fileStamp=c_parser.fileStamp(filepath),
+        )
+
+
+def hydrateLazyValidators(filepath):
+    # type: (str) -> int
+    """
+    Hydrates every LazyValidator still reading from filepath, parser.write calls this before writing over the file.
+    :return: the number hydrated
+    """
+    path = os.path.normcase(os.path.abspath(filepath))
+    count = 0
+    for eachValidator in list(_unhydratedValidators):
+        if eachValidator._filepath and os.path.normcase(os.path.abspath(eachValidator._filepath)) == path:
+            eachValidator.hydrate()
+            count += 1
+
+    return count
+
+
+c_parser.addBeforeWriteCallback(hydrateLazyValidators)
+
+
+class PagedValidator(Validator):
+    """
+    A Validator whose sourceNodes live in an on disk PageStore, for validators too large to keep in memory.
+    Only the cacheSize most recently used sourceNodes are kept hydrated, a sourceNode evicted with changes
+    (edits or validation statuses) is written back to its page first.
+
+    Any sourceNode still referenced elsewhere (the UI, a caller) stays the same object until it's released, so
+    edits made through it aren't lost. Once an evicted sourceNode's changes are on its page the journal releases
+    it, so edits are bounded by cacheSize too. Its sourceNode.dirty is cleared by the write back, the validator
+    keeps reporting its page dirty until markClean.
+    """
+
+    def __init__(
+        self, name, nameSpace="", nodes=None, pagesPath=None, cacheSize=vrconst_constants.PAGED_CACHE_SIZE,
+        columnar=False,
+    ):
+        # type: (str, str, list, str, int, bool) -> None
+        """
+        Args:
+            pagesPath: the page database, defaults to a file in the temp dir which is removed by close. The pages
+                of an existing database are picked up.
+            cacheSize: number of sourceNodes kept hydrated
+            columnar: hydrate the validityNodes into columnar tables, see Validator.fromData
+        """
+        super(PagedValidator, self).__init__(name, nameSpace)
+        self._pages = vrc_pageStore.PageStore(pagesPath)
+        self._cacheSize = max(1, cacheSize)
+        self._columnar = columnar
+        # key: [sourceNode, statuses last written to its page], least recently used first
+        self._hydratedNodes = OrderedDict()
+        # key: sourceNode of every sourceNode alive, hydrated or not
+        self._registry = weakref.WeakValueDictionary()
+        # sourceNodes evicted since the journal last released them
+        self._evictedNodes = list()
+        # keys of the pages holding changes since markClean
+        self._dirtyKeys = set()
+        if nodes is not None:
+            self.addSourceNodes(nodes, force=True)
+
+    @property
+    def pageStore(self):
+        return self._pages
+
+    @property
+    def nodeCount(self):
+        # type: () -> int
+        return len(self._pages)
+
+    def close(self):
+        # type: () -> None
+        """Writes the changed sourceNodes back and closes the page store, the validator can't be used after this"""
+        self.flush()
+        self._hydratedNodes.clear()
+        self._pages.close()
+
+    def _pageKey(self, longName):
+        # type: (str) -> str
+        return vrc_pageStore.pageKey(self._sourceNodeKey(longName))
+
+    @staticmethod
+    def _statuses(sourceNode):
+        # type: (SourceNode) -> list
+        return [sourceNode.status, [eachNode.status for eachNode in sourceNode.iterChildren()]]
+
+    def _writeBack(self, key, sourceNode, statuses):
+        # type: (str, SourceNode, list) -> list
+        """Writes the sourceNode to its page if it changed since statuses were written. :return: its statuses"""
+        currentStatuses = self._statuses(sourceNode)
+        if sourceNode.dirty:
+            self._pages.update(key, self._nameSpaceContext.nameSpace, sourceNode.toData(), currentStatuses)
+            sourceNode.markClean()
+            self._dirtyKeys.add(key)
+        elif currentStatuses != statuses:
+            self._pages.updateStatuses(key, currentStatuses)
+
+        return currentStatuses
+
+    def _cache(self, key, sourceNode, statuses=None):
+        # type: (str, SourceNode, list) -> None
+        """Makes the sourceNode the most recently used, evicting the least recently used ones past cacheSize"""
+        entry = self._hydratedNodes.pop(key, None)
+        if entry is None or entry[0] is not sourceNode:
+            entry = [sourceNode, statuses]
+        self._hydratedNodes[key] = entry
+        self._registry[key] = sourceNode
+
+        while len(self._hydratedNodes) > self._cacheSize:
+            evictedKey, (evictedNode, evictedStatuses) = self._hydratedNodes.popitem(last=False)
+            self._writeBack(evictedKey, evictedNode, evictedStatuses)
+            self._evictedNodes.append(evictedNode)
+
+        # Releasing scans the journal, so it's done once per cacheSize evictions.
+        if len(self._evictedNodes) >= self._cacheSize:
+            self._releaseEvicted()
+
+    def _releaseEvicted(self):
+        # type: () -> None
+        """Has the journal release the evicted sourceNodes, their changes are on their pages"""
+        keys = dict()
+        for eachNode in self._evictedNodes:
+            key = self._pageKey(eachNode.longName)
+            # Removed / hydrated again since, the journal keeps holding those.
+            if self._registry.get(key, None) is not eachNode or key in self._hydratedNodes:
+                continue
+
+            if eachNode.dirty:
+                # Edited through a reference held elsewhere since it was evicted.
+                self._writeBack(key, eachNode, None)
+            keys[id(eachNode)] = key
+
+        self._journal.release(keys)
+        del self._evictedNodes[:]
+
+    def _hydratePage(self, page):
+        # type: (vrc_pageStore.Page) -> SourceNode
+        # No stringPool, a shared one would end up holding the strings of every page ever hydrated.
+        if self._columnar:
+            sourceNode = ColumnarSourceNode.fromData(page.data)
+        else:
+            sourceNode = SourceNode.fromData(page.data)
+
+        # The page's longNames are under the namespace it was written with, relativize them against that.
+        sourceNode.relativizeLongNames(self._nameSpaceContext.savedUnder(page.nameSpace))
+
+        if page.statuses is not None:
+            sourceNode.status = page.statuses[0]
+            for eachNode, eachStatus in zip(sourceNode.iterChildren(), page.statuses[1]):
+                eachNode.status = eachStatus
+        sourceNode.markClean()
+
+        return sourceNode
+
+    def _sourceNode(self, key, page=None):
+        # type: (str, vrc_pageStore.Page) -> SourceNode
+        """:return: the live sourceNode of the key, hydrating it from its page if there isn't one"""
+        sourceNode = self._registry.get(key, None)
+        if sourceNode is not None:
+            self._cache(key, sourceNode)
+            return sourceNode
+
+        if page is None:
+            page = self._pages.get(key)
+            if page is None:
+                return None
+
+        sourceNode = self._hydratePage(page)
+        self._cache(key, sourceNode, page.statuses)
+
+        return sourceNode
+
+    def sourceNodeRenamed(self, sourceNode, key, newKey):
+        # type: (SourceNode, tuple[str], tuple[str]) -> None
+        pageKey = vrc_pageStore.pageKey(key)
+        newPageKey = vrc_pageStore.pageKey(newKey)
+        if newPageKey == pageKey or self._registry.get(pageKey, None) is not sourceNode:
+            return
+
+        try:
+            self._pages.rename(pageKey, newPageKey)
+        except IndexError:
+            raise IndexError(
+                "Can't rename %s, %s already exists in validator!"
+                % (sourceNode.longName, self._nameSpaceContext.resolve(newKey))
+            )
+
+        # The page's data is rewritten from the sourceNode, dirty from the rename, when it's evicted / flushed.
+        del self._registry[pageKey]
+        self._registry[newPageKey] = sourceNode
+        entry = self._hydratedNodes.pop(pageKey, None)
+        if entry is not None:
+            self._hydratedNodes[newPageKey] = entry
+        if pageKey in self._dirtyKeys:
+            self._dirtyKeys.remove(pageKey)
+            self._dirtyKeys.add(newPageKey)
+        self._journal.renameKey(pageKey, newPageKey)
+
+    def findSourceNodeByLongName(self, longName):
+        # type: (str) -> SourceNode
+        return self._sourceNode(self._pageKey(longName))
+
+    def sourceNodeLongNameExists(self, sourceNodeLongName):
+        # type: (str) -> bool
+        return self._pageKey(sourceNodeLongName) in self._pages
+
+    def replaceExistingSourceNode(self, sourceNode):
+        # type: (SourceNode) -> bool
+        """Replace an existing sourceNode of the same longName, keeping its position in the validator"""
+        key = self._pageKey(sourceNode.longName)
+        existingNode = self._sourceNode(key)
+        if existingNode is None:
+            return False
+
+        sourceNode.relativizeLongNames(self._nameSpaceContext)
+        self._journal.record(vrc_journal.JOURNAL_REMOVED, existingNode)
+        self._journal.record(vrc_journal.JOURNAL_ADDED, sourceNode)
+        statuses = self._statuses(sourceNode)
+        self._pages.update(key, self._nameSpaceContext.nameSpace, sourceNode.toData(), statuses)
+        self._cache(key, sourceNode, statuses)
+        return True
+
+    def addSourceNode(self, sourceNode, force=False):
+        # type: (SourceNode, bool) -> bool
+        logger.debug("Adding sourceNode: %s" % sourceNode.longName)
+        if not self.sourceNodeExists(sourceNode):
+            sourceNode.relativizeLongNames(self._nameSpaceContext)
+            key = self._pageKey(sourceNode.longName)
+            statuses = self._statuses(sourceNode)
+            self._pages.add(key, self._nameSpaceContext.nameSpace, sourceNode.toData(), statuses)
+            self._cache(key, sourceNode, statuses)
+            self._journal.record(vrc_journal.JOURNAL_ADDED, sourceNode)
+            return True
+
+        if force:
+            return self.replaceExistingSourceNode(sourceNode)
+
+        raise IndexError(
+            "%s already exists in validator. Use force=True if you want to overwrite existing!"
+            % sourceNode
+        )
+
+    def removeSourceNode(self, sourceNode):
+        # type: (SourceNode) -> bool
+        if sourceNode is None:
+            return False
+
+        # A sourceNode of this validator is alive as long as the caller holds it, so it's in the registry.
+        key = self._pageKey(sourceNode.longName)
+        if self._registry.get(key, None) is not sourceNode:
+            return False
+
+        self._pages.remove(key)
+        self._hydratedNodes.pop(key, None)
+        self._dirtyKeys.discard(key)
+        del self._registry[key]
+        self._journal.record(vrc_journal.JOURNAL_REMOVED, sourceNode)
+        logger.debug("Removed: %s" % sourceNode.longName)
+        return True
+
+    def iterSourceNodes(self):
+        # type: () -> Generator[SourceNode]
+        # Like Validator.iterSourceNodes, sourceNodes added while iterating aren't yielded.
+        for _, key, page in self._pages.iterPages(untilSeq=self._pages.lastSeq, skipKeys=self._registry):
+            sourceNode = self._sourceNode(key, page)
+            if sourceNode is not None:
+                yield sourceNode
+
+    def iterDirtySourceNodes(self):
+        # type: () -> Generator[SourceNode]
+        # Changes are either on a live sourceNode or were written back to its page.
+        dirtyNodes = dict((key, node) for key, node in self._registry.items() if node.dirty)
+        for _, key in self._pages.iterKeys(self._dirtyKeys.union(dirtyNodes)):
+            sourceNode = dirtyNodes.get(key, None)
+            if sourceNode is None:
+                sourceNode = self._sourceNode(key)
+            if sourceNode is not None:
+                yield sourceNode
+
+    def changedSourceNodes(self, since=0):
+        # type: (int) -> list[SourceNode]
+        return self._journal.changedSourceNodes(since, resolve=self._sourceNode)
+
+    def flush(self):
+        # type: () -> None
+        """Writes every changed sourceNode back to its page"""
+        for key, entry in self._hydratedNodes.items():
+            entry[1] = self._writeBack(key, entry[0], entry[1])
+
+        for key, sourceNode in list(self._registry.items()):
+            if sourceNode.dirty and key not in self._hydratedNodes:
+                self._writeBack(key, sourceNode, None)
+
+        self._releaseEvicted()
+
+    def markClean(self):
+        # Flushing writes the changed sourceNodes to their pages and clears their dirty flags.
+        self.flush()
+        self._dirtyKeys.clear()
+        self._journal.clear()
+
+    def toData(self):
+        # Pages are serialized as they are unless they were written under another namespace.
+        nameSpace = self._nameSpaceContext.nameSpace
+        nodes = list()
+        for _, key, page in self._pages.iterPages(skipKeys=self._registry):
+            if page is not None and page.nameSpace == nameSpace:
+                nodes.append(page.data)
+                continue
+
+            sourceNode = self._sourceNode(key, page)
+            if sourceNode is not None:
+                nodes.append(sourceNode.toData())
+
+        data = dict()
+        data[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+        data[vrconst_serialization.KEY_VALIDATOR_NAME] = self.name
+        data[vrconst_serialization.KEY_VALIDATORNAMESPACE] = self.nameSpace
+        data[vrconst_serialization.KEY_VALIDATOR_NODES] = nodes
+
+        return data
+
+    @classmethod
+    def fromData(cls, name, data, columnar=False, pagesPath=None, cacheSize=vrconst_constants.PAGED_CACHE_SIZE):
+        # type: (str, dict, bool, str, int) -> PagedValidator
+        """
+        Writes the sourceNode dicts straight to pages, nothing is hydrated until it's asked for.
+        See Validator.fromData and __init__ for the arguments.
+        """
+        data, version = vrc_migrations.migrateValidatorData(data)
+        nameSpace = data.get(vrconst_serialization.KEY_VALIDATORNAMESPACE, "")
+        if name is None:
+            name = data.get(vrconst_serialization.KEY_VALIDATOR_NAME, None)
+
+        inst = cls(name, nameSpace, pagesPath=pagesPath, cacheSize=cacheSize, columnar=columnar)
+        sourceNodes = data.get(vrconst_serialization.KEY_VALIDATOR_NODES, list())
+        inst._pages.addMany(
+            (inst._pageKey(eachData[vrconst_serialization.KEY_NODELONGNAME]), nameSpace, eachData, None)
+            for eachData in vrc_migrations.migrateSourceNodes(sourceNodes, version)
+        )
+
+        return inst
@@ -0,0 +1,123 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Micro benchmark for the node model. Reports construction time and memory per validity node.
+
+Usage:
+    python -m validateRig.tests.bench_nodes [nodeCount]
+"""
+import sys
+import gc
+import time
+import logging
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import nodes as vrc_nodes
+from validateRig.core import nodeTable as vrc_nodeTable
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+SRC_LONGNAME = "|myChar|rig|testRigNamespace:mycharName_hrc|testRigNamespace:rig|testRigNamespace:body_ctrl"
+ATTRIBUTES = ("translate", "rotate", "scale", "visibility", "rotateOrder")
+COLUMNAR_ROWS_PER_SOURCENODE = 1000
+
+
+def buildSourceNodes(nodeCount):
+    # type: (int) -> list[vrc_nodes.SourceNode]
+    sourceNodes = list()
+    perSourceNode = len(ATTRIBUTES)
+    for x in range(nodeCount // perSourceNode):
+        longName = "{}{}".format(SRC_LONGNAME, x)
+        validityNodes = list()
+        for eachAttr in ATTRIBUTES:
+            node = vrc_nodes.DefaultValueNode(name=eachAttr, longName=longName)
+            node.defaultValueData = {eachAttr: [0.0, 0.0, 0.0]}
+            validityNodes.append(node)
+
+        sourceNodes.append(vrc_nodes.SourceNode(name="body_ctrl", longName=longName, validityNodes=validityNodes))
+
+    return sourceNodes
+
+
+def buildColumnarSourceNodes(nodeCount, perSourceNode=COLUMNAR_ROWS_PER_SOURCENODE):
+    # type: (int, int) -> list[vrc_nodeTable.ColumnarSourceNode]
+    """Columnar tables carry a fixed overhead each, they pay off on sourceNodes with many validityNodes."""
+    sourceNodes = list()
+    for x in range(nodeCount // perSourceNode):
+        longName = "{}{}".format(SRC_LONGNAME, x)
+        sourceNode = vrc_nodeTable.ColumnarSourceNode(name="body_ctrl", longName=longName)
+        table = sourceNode.table
+        for y in range(perSourceNode):
+            eachAttr = ATTRIBUTES[y % len(ATTRIBUTES)]
+            table.appendRow(vrconst_serialization.NT_DEFAULTVALUE, eachAttr, longName, eachAttr, {eachAttr: [0.0, 0.0, 0.0]})
+
+        sourceNodes.append(sourceNode)
+
+    return sourceNodes
+
+
+def measure(func, *args):
+    # type: (callable, *args) -> tuple
+    """:return: (result, seconds, bytes allocated and still held by result)"""
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    start = time.time()
+    result = func(*args)
+    elapsed = time.time() - start
+
+    memory = 0
+    if tracemalloc is not None:
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, elapsed, memory
+
+
+def buildBareNodes(nodeCount):
+    # type: (int) -> list[vrc_nodes.DefaultValueNode]
+    return [vrc_nodes.DefaultValueNode(name="translate", longName=SRC_LONGNAME) for _ in range(nodeCount)]
+
+
+def run(nodeCount=200000):
+    # type: (int) -> dict
+    _, bareElapsed, bareMemory = measure(buildBareNodes, nodeCount)
+    sourceNodes, elapsed, memory = measure(buildSourceNodes, nodeCount)
+
+    start = time.time()
+    for eachSourceNode in sourceNodes:
+        eachSourceNode.toData()
+    toDataElapsed = time.time() - start
+
+    # Second pass over unchanged nodes hits the memoized data
+    start = time.time()
+    for eachSourceNode in sourceNodes:
+        eachSourceNode.toData()
+    cachedToDataElapsed = time.time() - start
+
+    _, columnarElapsed, columnarMemory = measure(buildColumnarSourceNodes, nodeCount)
+
+    results = {
+        "nodes": nodeCount,
+        "bareConstructUsecPerNode": bareElapsed / nodeCount * 1e6,
+        "bareBytesPerNode": float(bareMemory) / nodeCount,
+        "constructUsecPerNode": elapsed / nodeCount * 1e6,
+        "bytesPerNode": float(memory) / nodeCount,
+        "toDataUsecPerNode": toDataElapsed / nodeCount * 1e6,
+        "cachedToDataUsecPerNode": cachedToDataElapsed / nodeCount * 1e6,
+        "columnarConstructUsecPerNode": columnarElapsed / nodeCount * 1e6,
+        "columnarBytesPerNode": float(columnarMemory) / nodeCount,
+    }
+
+    return results
+
+
+if __name__ == "__main__":  # pragma: no cover
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for key, value in sorted(run(count).items()):
+        print("%-22s %s" % (key, value))
@@ -0,0 +1,79 @@
+#  Copyright (c) 2020.  James Dunlop
+"""
+Benchmark for the validator file formats. Writes a synthetic rig with every supported extension and reports
+write / read time and size on disk against plain json.
+
+Usage:
+    python -m validateRig.tests.bench_parser [nodeCount]
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+
+from validateRig.core import parser as vrc_parser
+from validateRig.core import validator as vrc_validator
+from validateRig.tests import bench_nodes as vrt_benchNodes
+
+logger = logging.getLogger(__name__)
+
+
+def buildValidatorData(nodeCount):
+    # type: (int) -> dict
+    validator = vrc_validator.Validator("benchRig", "testRigNamespace")
+    validator.addSourceNodes(vrt_benchNodes.buildSourceNodes(nodeCount))
+
+    return validator.toData()
+
+
+def timeFormat(data, filepath):
+    # type: (dict, str) -> dict
+    start = time.time()
+    vrc_parser.write(filepath, data, sortKeys=False)
+    writeElapsed = time.time() - start
+
+    start = time.time()
+    vrc_parser.read(filepath)
+    readElapsed = time.time() - start
+
+    start = time.time()
+    list(vrc_parser.iterReadHeaders(filepath))
+    headersElapsed = time.time() - start
+
+    return {
+        "writeSec": writeElapsed,
+        "readSec": readElapsed,
+        "headersSec": headersElapsed,
+        "bytes": os.path.getsize(filepath),
+    }
+
+
+def run(nodeCount=100000):
+    # type: (int) -> dict
+    """:return: {extension: {writeSec, readSec, headersSec, bytes, sizeRatio}}, sizeRatio is against plain json"""
+    data = buildValidatorData(nodeCount)
+    tempDir = tempfile.mkdtemp()
+    results = dict()
+    try:
+        for eachExt in vrc_parser.SUPPORTED_EXTS:
+            results[eachExt] = timeFormat(data, os.path.join(tempDir, "benchRig{}".format(eachExt)))
+    finally:
+        shutil.rmtree(tempDir)
+
+    jsonBytes = float(results[vrc_parser.SUPPORTED_EXTS[0]]["bytes"])
+    for eachResult in results.values():
+        eachResult["sizeRatio"] = eachResult["bytes"] / jsonBytes
+
+    return results
+
+
+if __name__ == "__main__":  # pragma: no cover
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("%-12s %10s %10s %10s %12s %10s" % ("ext", "writeSec", "readSec", "headersSec", "bytes", "sizeRatio"))
+    for ext, result in sorted(run(count).items()):
+        print(
+            "%-12s %10.3f %10.3f %10.3f %12d %10.3f"
+            % (ext, result["writeSec"], result["readSec"], result["headersSec"], result["bytes"], result["sizeRatio"])
+        )
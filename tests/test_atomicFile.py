@@ -0,0 +1,62 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import stat
+import shutil
+import tempfile
+import unittest
+import logging
+
+from validateRig.core import atomicFile as vrc_atomicFile
+
+logger = logging.getLogger(__name__)
+
+
+def _mode(filepath):
+    # type: (str) -> int
+    return stat.S_IMODE(os.stat(filepath).st_mode)
+
+
+@unittest.skipIf(os.name == "nt", "Windows files don't have posix permissions")
+class Test_AtomicFile(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.tempDir, "rig.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_saveKeepsTheMode(self):
+        with vrc_atomicFile.atomicWrite(self.filepath) as f:
+            f.write(b"first")
+        os.chmod(self.filepath, 0o664)
+
+        with vrc_atomicFile.atomicWrite(self.filepath) as f:
+            f.write(b"second")
+
+        self.assertEqual(0o664, _mode(self.filepath))
+        with open(self.filepath, "rb") as f:
+            self.assertEqual(b"second", f.read())
+
+    def test_newFileFollowsTheUmask(self):
+        umask = os.umask(0o022)
+        try:
+            with vrc_atomicFile.atomicWrite(self.filepath) as f:
+                f.write(b"first")
+        finally:
+            os.umask(umask)
+
+        self.assertEqual(0o644, _mode(self.filepath))
+
+    def test_failedWriteKeepsTheTarget(self):
+        with vrc_atomicFile.atomicWrite(self.filepath) as f:
+            f.write(b"first")
+
+        with self.assertRaises(RuntimeError):
+            with vrc_atomicFile.atomicWrite(self.filepath) as f:
+                f.write(b"partial")
+                raise RuntimeError("interrupted")
+
+        with open(self.filepath, "rb") as f:
+            self.assertEqual(b"first", f.read())
+        self.assertEqual(["rig.json"], os.listdir(self.tempDir))
@@ -0,0 +1,68 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import binaryCodec as vrc_binaryCodec
+from validateRig.core import parser as vrc_parser
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_BinaryCodec(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_roundTrip(self):
+        encoded = vrc_binaryCodec.dumps(self.validatorData)
+        self.assertEqual(self.validatorData, vrc_binaryCodec.loads(encoded))
+        self.assertLess(len(encoded), len(json.dumps(self.validatorData)))
+
+    def test_typedValues(self):
+        data = {
+            "float3": [1.0, 2.5, -3.0],
+            "matrix": [float(i) for i in range(16)],
+            "mixed": [1, 2.0, u"three", None],
+            "bools": [True, False],
+            "int": 42,
+            "bigInt": 2 ** 70,
+            "float": 0.1,
+            "empty": [],
+        }
+        decoded = vrc_binaryCodec.loads(vrc_binaryCodec.dumps(data))
+        self.assertEqual(data, decoded)
+        self.assertIs(decoded["bools"][0], True)
+        self.assertIsInstance(decoded["int"], int)
+
+    def test_parserPicksCodecByExtension(self):
+        filepath = os.path.join(self.tempDir, "session.vrig")
+        session = [self.validatorData, self.validatorData]
+        vrc_parser.write(filepath, session)
+        with open(filepath, "rb") as f:
+            self.assertEqual(vrc_binaryCodec.MAGIC, f.read(len(vrc_binaryCodec.MAGIC)))
+
+        self.assertEqual(session, vrc_parser.read(filepath))
+
+        headers = list(vrc_parser.iterRead(filepath))
+        self.assertEqual(2, len(headers))
+        validator = vrc_validator.Validator.fromData(None, headers[1])
+        expected = vrc_validator.Validator.fromData(None, self.validatorData)
+        self.assertEqual(expected.toData(), validator.toData())
+        self.assertEqual(
+            self.validatorData[vrconst_serialization.KEY_VALIDATOR_NODES],
+            list(headers[0][vrconst_serialization.KEY_VALIDATOR_NODES]),
+        )
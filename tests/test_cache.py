@@ -0,0 +1,145 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import cache as vrc_cache
+from validateRig.core import parser as vrc_parser
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_Cache(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        vrc_cache.setCacheDir(os.path.join(self.tempDir, "cache"))
+        vrc_cache.setEnabled(True)
+        self.filepath = os.path.join(self.tempDir, "testValidator.json")
+        shutil.copy(TESTVALIDATOR_PATH, self.filepath)
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+
+    def tearDown(self):
+        vrc_cache.setCacheDir(None)
+        vrc_cache.setEnabled(None)
+        shutil.rmtree(self.tempDir)
+
+    def test_readPopulatesAndHits(self):
+        self.assertIsNone(vrc_cache.get(self.filepath))
+        self.assertEqual(self.validatorData, vrc_parser.read(self.filepath, useCache=True))
+        self.assertEqual(self.validatorData, vrc_cache.get(self.filepath))
+        self.assertEqual(1, len(list(vrc_cache.iterEntries())))
+
+    def test_offByDefault(self):
+        vrc_cache.setEnabled(None)
+        os.environ.pop(vrc_cache.ENV_ENABLED, None)
+        self.assertFalse(vrc_cache.enabled())
+        vrc_parser.read(self.filepath)
+        self.assertEqual([], list(vrc_cache.iterEntries()))
+
+    def test_iterReadStreams(self):
+        for eachExt in (".json", ".vrig.zlib"):
+            filepath = os.path.join(self.tempDir, "session{}".format(eachExt))
+            vrc_parser.write(filepath, [self.validatorData])
+
+            for _ in range(2):  # Streamed from the file and cached, then streamed from the entry
+                validators = vrc_parser.iterRead(filepath)
+                validatorData = next(validators)
+                nodes = validatorData[vrconst_serialization.KEY_VALIDATOR_NODES]
+                self.assertFalse(isinstance(nodes, list), eachExt)
+                validatorData[vrconst_serialization.KEY_VALIDATOR_NODES] = list(nodes)
+                self.assertEqual(self.validatorData, validatorData, eachExt)
+                self.assertEqual([], list(validators))
+
+                # A session save stays a session save in the entry
+                self.assertEqual([self.validatorData], vrc_cache.get(filepath), eachExt)
+
+    def test_partialIterReadIsntCached(self):
+        validators = vrc_parser.iterRead(self.filepath)
+        next(validators)
+        validators.close()
+        self.assertEqual([], list(vrc_cache.iterEntries()))
+
+    @unittest.skipIf(not hasattr(os, "getuid") or os.getuid() != 0, "needs root to hand the entry to another user")
+    def test_foreignEntriesIgnored(self):
+        vrc_parser.read(self.filepath, useCache=True)
+        entryPath = list(vrc_cache.iterEntries())[0][0]
+        os.chown(entryPath, os.getuid() + 1, -1)
+
+        self.assertIsNone(vrc_cache.get(self.filepath))
+        self.assertIsNone(vrc_cache.iterGet(self.filepath))
+
+    def test_changedFileMisses(self):
+        vrc_parser.read(self.filepath, useCache=True)
+        data = dict(self.validatorData)
+        data[vrconst_serialization.KEY_VALIDATOR_NAME] = "changedRig"
+        vrc_parser.write(self.filepath, data)
+        stat = os.stat(self.filepath)
+        os.utime(self.filepath, (stat.st_atime, stat.st_mtime + 10))
+
+        self.assertIsNone(vrc_cache.get(self.filepath))
+        self.assertEqual("changedRig", vrc_parser.read(self.filepath, useCache=True)["vN"])
+
+    def test_sameSizeRewriteMisses(self):
+        vrc_parser.write(self.filepath, self.validatorData)
+        vrc_parser.read(self.filepath, useCache=True)
+        stat = os.stat(self.filepath)
+        data = dict(self.validatorData)
+        data[vrconst_serialization.KEY_VALIDATOR_NAME] = "testRug"
+        vrc_parser.write(self.filepath, data)
+        os.utime(self.filepath, (stat.st_atime, stat.st_mtime))
+        self.assertEqual(stat.st_size, os.stat(self.filepath).st_size)
+
+        self.assertIsNone(vrc_cache.get(self.filepath))
+        self.assertEqual("testRug", vrc_parser.read(self.filepath, useCache=True)["vN"])
+
+    @unittest.skipIf(not hasattr(os, "symlink"), "needs symlinks")
+    def test_vanishedEntriesSkipped(self):
+        vrc_parser.read(self.filepath, useCache=True)
+        # An entry another load prunes between listing the directory and stat'ing it
+        os.symlink(os.path.join(self.tempDir, "gone"), os.path.join(vrc_cache.cacheDir(), "gone" + vrconst_constants.CACHE_EXT))
+
+        self.assertEqual([self.filepath], [entry[3] for entry in vrc_cache.iterEntries()])
+        self.assertEqual(0, vrc_cache.prune())
+
+    def test_fromFileJSON(self):
+        expected = vrc_validator.Validator.fromData("testRig", self.validatorData)
+        vrc_validator.Validator.from_fileJSON(self.filepath)
+        self.assertIsNotNone(vrc_cache.get(self.filepath))
+
+        validator = vrc_validator.Validator.from_fileJSON(self.filepath)
+        self.assertEqual(expected.toData(), validator.toData())
+
+    def test_pruneEvictsLeastRecentlyUsed(self):
+        paths = list()
+        for x in range(3):
+            filepath = os.path.join(self.tempDir, "validator%s.json" % x)
+            shutil.copy(TESTVALIDATOR_PATH, filepath)
+            vrc_cache.put(filepath, self.validatorData)
+            paths.append(filepath)
+
+        entries = sorted(vrc_cache.iterEntries(), key=lambda entry: entry[3])
+        for x, (entryPath, _, _, _) in enumerate(entries):
+            os.utime(entryPath, (x, x))
+        vrc_cache.get(paths[0])  # most recently used now
+
+        self.assertEqual(1, vrc_cache.prune(entries[0][1] * 2))
+        self.assertIsNotNone(vrc_cache.get(paths[0]))
+        self.assertIsNone(vrc_cache.get(paths[1]))
+        self.assertIsNotNone(vrc_cache.get(paths[2]))
+
+    def test_cli(self):
+        vrc_parser.read(self.filepath, useCache=True)
+        self.assertEqual(0, vrc_cache.main(["list"]))
+        self.assertEqual(0, vrc_cache.main(["clear"]))
+        self.assertEqual([], list(vrc_cache.iterEntries()))
@@ -0,0 +1,76 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import compression as vrc_compression
+from validateRig.core import parser as vrc_parser
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_Compression(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+        # What a loaded validator saves, testValidator.json predates the schema version.
+        self.savedData = dict(self.validatorData)
+        self.savedData[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+        self.session = [self.validatorData, self.validatorData]
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_supported(self):
+        for eachName in ("a.json", "a.vrig", "a.JSON.GZ", "a.vrig.zlib"):
+            self.assertTrue(vrc_parser.isSupported(eachName), eachName)
+        for eachName in ("a.txt", "a.gz", "a.json.zlib.bak"):
+            self.assertFalse(vrc_parser.isSupported(eachName), eachName)
+
+        self.assertTrue(vrc_parser.isBinary("a.vrig.zlib"))
+        self.assertFalse(vrc_parser.isBinary("a.json.gz"))
+
+    def test_roundTrip(self):
+        plainPath = os.path.join(self.tempDir, "session.json")
+        vrc_parser.write(plainPath, self.session)
+        for eachName in ("session.json.gz", "session.vrig.zlib"):
+            filepath = os.path.join(self.tempDir, eachName)
+            vrc_parser.write(filepath, self.session)
+            self.assertLess(os.path.getsize(filepath), os.path.getsize(plainPath))
+            self.assertEqual(self.session, vrc_parser.read(filepath))
+
+            headers = list(vrc_parser.iterReadHeaders(filepath))
+            self.assertEqual([3, 3], [h[vrconst_serialization.KEY_VALIDATOR_NODECOUNT] for h in headers])
+            # Hydrating the second validator seeks past the first in the decompressed stream.
+            lazy = vrc_validator.LazyValidator.fromHeader(filepath, headers[1])
+            lazy.hydrate()
+            self.assertEqual(self.savedData, lazy.toData())
+
+        with gzip.open(os.path.join(self.tempDir, "session.json.gz"), "rb") as f:
+            self.assertEqual(self.session, json.loads(f.read().decode("utf-8")))
+
+    def test_zlibReaderSeek(self):
+        filepath = os.path.join(self.tempDir, "data.json.zlib")
+        payload = b"".join(b"%08d" % i for i in range(100000))
+        with open(filepath, "wb") as rawFile:
+            with vrc_compression.wrapWrite(rawFile, filepath) as f:
+                f.write(payload)
+
+        with vrc_compression.openRead(filepath) as f:
+            f.seek(400000)
+            self.assertEqual(b"00050000", f.read(8))
+            f.seek(80)
+            self.assertEqual(80, f.tell())
+            self.assertEqual(b"00000010", f.read(8))
+            self.assertEqual(payload[88:], f.read())
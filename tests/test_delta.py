@@ -0,0 +1,150 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import copy
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import cache as vrc_cache
+from validateRig.core import compression as vrc_compression
+from validateRig.core import delta as vrc_delta
+from validateRig.core import loader as vrc_loader
+from validateRig.core import parser as vrc_parser
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_Delta(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        vrc_cache.setCacheDir(os.path.join(self.tempDir, "cache"))
+        vrc_cache.setEnabled(True)
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.baseData = json.load(f)
+        self.baseData[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+
+        # Drop the first sourceNode, change a validityNode of the second and add a new one
+        self.revisedData = copy.deepcopy(self.baseData)
+        sourceNodes = self.revisedData[vrconst_serialization.KEY_VALIDATOR_NODES]
+        self.removed = sourceNodes.pop(0)[vrconst_serialization.KEY_NODELONGNAME]
+        modified = sourceNodes[0][vrconst_serialization.KEY_VAILIDITYNODES]
+        modified[0][vrconst_serialization.KEY_NODEDISPLAYNAME] = "changed"
+        added = copy.deepcopy(sourceNodes[0])
+        added[vrconst_serialization.KEY_NODELONGNAME] = "|addedNode"
+        added[vrconst_serialization.KEY_NODENAME] = "addedNode"
+        sourceNodes.append(added)
+
+    def tearDown(self):
+        vrc_cache.setCacheDir(None)
+        vrc_cache.setEnabled(None)
+        shutil.rmtree(self.tempDir)
+
+    def test_diffApply(self):
+        delta = vrc_delta.diff(copy.deepcopy(self.baseData), copy.deepcopy(self.revisedData))
+        patch = delta[vrconst_serialization.KEY_DELTA_VALIDATORS][0]
+        self.assertEqual([self.removed], patch[vrconst_serialization.KEY_DELTA_REMOVED])
+        self.assertEqual(["|addedNode"], [n["nLN"] for n in patch[vrconst_serialization.KEY_DELTA_ADDED]])
+        self.assertEqual(1, len(patch[vrconst_serialization.KEY_DELTA_MODIFIED]))
+        self.assertNotIn(vrconst_serialization.KEY_DELTA_ORDER, patch)
+
+        # Unchanged validityNodes are stored as their index in the base sourceNode
+        validityNodes = patch[vrconst_serialization.KEY_DELTA_MODIFIED][0][vrconst_serialization.KEY_VAILIDITYNODES]
+        self.assertIsInstance(validityNodes[0], dict)
+        self.assertEqual(list(range(1, len(validityNodes))), validityNodes[1:])
+
+        self.assertEqual(self.revisedData, vrc_delta.apply(copy.deepcopy(self.baseData), delta))
+
+    def test_reorderedSession(self):
+        self.revisedData[vrconst_serialization.KEY_VALIDATOR_NODES].reverse()
+        session = [self.revisedData]
+        delta = vrc_delta.diff([copy.deepcopy(self.baseData)], copy.deepcopy(session))
+        self.assertIn(vrconst_serialization.KEY_DELTA_ORDER, delta[vrconst_serialization.KEY_DELTA_VALIDATORS][0])
+        self.assertEqual(session, vrc_delta.apply([copy.deepcopy(self.baseData)], delta))
+
+    def test_writeRead(self):
+        basePath = os.path.join(self.tempDir, "rig_v001.json")
+        deltaPath = os.path.join(self.tempDir, "rig_v002.vdelta.json.gz")
+        vrc_parser.write(basePath, self.baseData)
+        vrc_delta.write(deltaPath, basePath, copy.deepcopy(self.revisedData))
+
+        self.assertTrue(vrc_delta.isDeltaFile(deltaPath))
+        self.assertFalse(vrc_delta.isDeltaFile(basePath))
+        self.assertIsNotNone(vrc_cache.get(basePath))
+        self.assertEqual(self.revisedData, vrc_delta.read(deltaPath))
+
+        validators = vrc_loader.loadFile(deltaPath)
+        self.assertEqual([self.revisedData], [v.toData() for v in validators])
+
+    def test_changedBase(self):
+        basePath = os.path.join(self.tempDir, "rig_v001.json")
+        deltaPath = os.path.join(self.tempDir, "rig_v002.vdelta.json")
+        vrc_parser.write(basePath, self.baseData)
+        vrc_delta.write(deltaPath, basePath, self.revisedData)
+        vrc_parser.write(basePath, self.revisedData)
+
+        self.assertRaises(ValueError, vrc_delta.read, deltaPath)
+
+    def test_changedBaseOfTheSameSize(self):
+        basePath = os.path.join(self.tempDir, "rig_v001.json")
+        deltaPath = os.path.join(self.tempDir, "rig_v002.vdelta.json")
+        vrc_parser.write(basePath, self.baseData)
+        vrc_delta.write(deltaPath, basePath, self.revisedData)
+
+        republished = copy.deepcopy(self.baseData)
+        republished[vrconst_serialization.KEY_VALIDATOR_NAME] = self.baseData[
+            vrconst_serialization.KEY_VALIDATOR_NAME
+        ][::-1]
+        size = os.path.getsize(basePath)
+        vrc_parser.write(basePath, republished)
+        self.assertEqual(size, os.path.getsize(basePath))
+
+        self.assertRaises(ValueError, vrc_delta.read, deltaPath)
+
+    def test_cachedBaseIsntReopened(self):
+        basePath = os.path.join(self.tempDir, "rig_v001.json")
+        deltaPath = os.path.join(self.tempDir, "rig_v002.vdelta.json")
+        vrc_parser.write(basePath, self.baseData)
+        vrc_delta.write(deltaPath, basePath, copy.deepcopy(self.revisedData))
+        self.assertIsNotNone(vrc_cache.get(basePath))
+
+        opened = list()
+        openRead = vrc_compression.openRead
+        fileHash = vrc_delta._fileHash
+
+        def _openRead(filepath):
+            opened.append(filepath)
+            return openRead(filepath)
+
+        def _fileHash(filepath):
+            opened.append(filepath)
+            return fileHash(filepath)
+
+        vrc_compression.openRead = _openRead
+        vrc_delta._fileHash = _fileHash
+        try:
+            self.assertEqual(self.revisedData, vrc_delta.read(deltaPath))
+        finally:
+            vrc_compression.openRead = openRead
+            vrc_delta._fileHash = fileHash
+
+        self.assertNotIn(basePath, opened)
+
+    def test_touchedBaseIsHashed(self):
+        basePath = os.path.join(self.tempDir, "rig_v001.json")
+        deltaPath = os.path.join(self.tempDir, "rig_v002.vdelta.json")
+        vrc_parser.write(basePath, self.baseData)
+        vrc_delta.write(deltaPath, basePath, copy.deepcopy(self.revisedData))
+
+        # Copied back over itself, same bytes under a new mtime / inode
+        copyPath = basePath + ".copy"
+        shutil.copy(basePath, copyPath)
+        os.utime(copyPath, (0, 0))
+        os.rename(copyPath, basePath)
+        self.assertEqual(self.revisedData, vrc_delta.read(deltaPath))
@@ -0,0 +1,60 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import unittest
+import logging
+
+from validateRig.const import testData as vrc_testData
+from validateRig.core import nodes as vrc_nodes
+from validateRig.core import journal as vrc_journal
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+
+class Test_Journal(unittest.TestCase):
+    def setUp(self):
+        self.sourceNodeLongName = "|{}:{}".format(vrc_testData.VALIDATOR_NAMESPACE, vrc_testData.SRC_NODENAME)
+        sourceNode = vrc_nodes.SourceNode(name=vrc_testData.SRC_NODENAME, longName=self.sourceNodeLongName)
+        defaultValueNode = vrc_nodes.DefaultValueNode(
+            name=vrc_testData.DEFAULT_NODENAME, longName=self.sourceNodeLongName
+        )
+        defaultValueNode.defaultValueData = {vrc_testData.DEFAULT_NODENAME: vrc_testData.DEFAULT_NODEVALUE}
+        sourceNode.addChild(defaultValueNode)
+
+        validator = vrc_validator.Validator(vrc_testData.VALIDATOR_NAME, vrc_testData.VALIDATOR_NAMESPACE)
+        validator.addSourceNode(sourceNode)
+        self.validator = vrc_validator.Validator.fromData(vrc_testData.VALIDATOR_NAME, validator.toData())
+        self.sourceNode = self.validator.findSourceNodeByLongName(self.sourceNodeLongName)
+        self.defaultValueNode = list(self.sourceNode.iterChildren())[0]
+
+    def test_cleanAfterLoad(self):
+        self.assertFalse(self.validator.dirty, "Validator is dirty straight after loading!")
+        self.assertFalse(self.sourceNode.dirty)
+        self.assertFalse(self.defaultValueNode.dirty)
+
+    def test_valueUpdate(self):
+        serial = self.validator.journal.serial
+        self.defaultValueNode.defaultValueData = {vrc_testData.DEFAULT_NODENAME: 1.0}
+
+        self.assertTrue(self.defaultValueNode.dirty)
+        self.assertTrue(self.sourceNode.dirty, "Dirty validityNode didn't flag its sourceNode!")
+        entries = list(self.validator.journal.iterEntries(since=serial))
+        self.assertEqual([vrc_journal.JOURNAL_UPDATED], [e.kind for e in entries])
+        self.assertEqual([self.sourceNode], self.validator.journal.changedSourceNodes(since=serial))
+        self.assertEqual([self.sourceNode], list(self.validator.iterDirtySourceNodes()))
+
+        self.validator.markClean()
+        self.assertFalse(self.validator.dirty)
+        self.assertFalse(self.defaultValueNode.dirty)
+
+    def test_addRemoveAndNameSpace(self):
+        newNode = vrc_nodes.SourceNode(name="newNode", longName="|newNode")
+        self.validator.addSourceNode(newNode)
+        self.validator.removeSourceNode(self.sourceNode)
+        self.validator.nameSpace = "fartyblartfast"
+        self.validator.updateNameSpaceInLongName(vrc_testData.VALIDATOR_NAMESPACE)
+
+        kinds = [e.kind for e in self.validator.journal.iterEntries()]
+        self.assertEqual(
+            [vrc_journal.JOURNAL_ADDED, vrc_journal.JOURNAL_REMOVED, vrc_journal.JOURNAL_NAMESPACE], kinds
+        )
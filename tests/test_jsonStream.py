@@ -0,0 +1,79 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+from collections import OrderedDict
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import jsonStream as vrc_jsonStream
+from validateRig.core import parser as vrc_parser
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_JSONStream(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _writeJSON(self, name, data, **kwargs):
+        filepath = os.path.join(self.tempDir, name)
+        with open(filepath, "wb") as f:
+            f.write(json.dumps(data, **kwargs).encode("utf-8"))
+
+        return filepath
+
+    def _readAll(self, filepath):
+        validators = list()
+        for eachHeader in vrc_parser.iterRead(filepath):
+            eachHeader[vrconst_serialization.KEY_VALIDATOR_NODES] = list(
+                eachHeader[vrconst_serialization.KEY_VALIDATOR_NODES]
+            )
+            validators.append(eachHeader)
+
+        return validators
+
+    def test_singleValidator(self):
+        self.assertEqual([self.validatorData], self._readAll(TESTVALIDATOR_PATH))
+
+    def test_sessionSaveSmallChunks(self):
+        # Nodes before the header keys and tiny chunks, so elements straddle many chunk boundaries
+        secondValidator = OrderedDict()
+        secondValidator[vrconst_serialization.KEY_VALIDATOR_NODES] = self.validatorData[
+            vrconst_serialization.KEY_VALIDATOR_NODES
+        ]
+        secondValidator[vrconst_serialization.KEY_VALIDATOR_NAME] = u"second\u00e9"
+        secondValidator[vrconst_serialization.KEY_VALIDATORNAMESPACE] = u"testRigNamespace"
+        session = [self.validatorData, secondValidator]
+        filepath = self._writeJSON("session.json", session, ensure_ascii=False)
+
+        with open(filepath, "rb") as f:
+            reader = vrc_jsonStream.JSONStreamReader(f, chunkSize=7)
+            names = list()
+            for _ in reader.iterArray():
+                for key in reader.iterObject():
+                    if key == vrconst_serialization.KEY_VALIDATOR_NAME:
+                        names.append(reader.decodeValue())
+                    else:
+                        reader.skipValue()
+
+        self.assertEqual([u"testRig", u"second\u00e9"], names)
+        self.assertEqual(session, self._readAll(filepath))
+
+    def test_validatorFromStream(self):
+        header = next(vrc_parser.iterRead(TESTVALIDATOR_PATH))
+        validator = vrc_validator.Validator.fromData(None, header)
+        expected = vrc_validator.Validator.fromData(None, self.validatorData)
+        self.assertEqual(expected.toData(), validator.toData())
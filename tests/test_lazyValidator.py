@@ -0,0 +1,104 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import parser as vrc_parser
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_LazyValidator(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+        # What a loaded validator saves, testValidator.json predates the schema version.
+        self.savedData = dict(self.validatorData)
+        self.savedData[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+
+        secondValidator = dict(self.validatorData)
+        secondValidator[vrconst_serialization.KEY_VALIDATOR_NAME] = "second"
+        secondValidator[vrconst_serialization.KEY_VALIDATOR_NODES] = self.validatorData[
+            vrconst_serialization.KEY_VALIDATOR_NODES
+        ][:1]
+        self.session = [self.validatorData, secondValidator]
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _lazyValidators(self, ext):
+        filepath = os.path.join(self.tempDir, "session{}".format(ext))
+        vrc_parser.write(filepath, self.session)
+
+        return [
+            vrc_validator.LazyValidator.fromHeader(filepath, header)
+            for header in vrc_parser.iterReadHeaders(filepath)
+        ]
+
+    def test_headers(self):
+        for ext in (".json", ".vrig"):
+            validators = self._lazyValidators(ext)
+            self.assertEqual(["testRig", "second"], [v.name for v in validators])
+            self.assertEqual([3, 1], [v.nodeCount for v in validators])
+            self.assertFalse(any(v.hydrated for v in validators))
+
+    def test_hydrateOnDemand(self):
+        for ext in (".json", ".vrig"):
+            lazy, second = self._lazyValidators(ext)
+            # Saving an untouched validator streams its nodes from disk.
+            self.assertEqual(self.savedData, lazy.toData())
+            self.assertFalse(lazy.hydrated)
+
+            sourceNodes = list(lazy.iterSourceNodes())
+            self.assertTrue(lazy.hydrated)
+            self.assertEqual(3, len(sourceNodes))
+            self.assertFalse(lazy.dirty, "Hydrating shouldn't dirty the validator!")
+            self.assertFalse(second.hydrated)
+
+            expected = vrc_validator.Validator.fromData("testRig", self.validatorData)
+            self.assertEqual(expected.toData(), lazy.toData())
+
+    def test_retargetBeforeHydrating(self):
+        lazy, _ = self._lazyValidators(".json")
+        lazy.nameSpace = "fartyblartfast"
+        lazy.updateNameSpaceInLongName("testRigNamespace")
+        self.assertFalse(lazy.hydrated)
+
+        longNames = [eachNode.longName for eachNode in lazy.iterSourceNodes()]
+        self.assertTrue(all("fartyblartfast:" in eachName for eachName in longNames))
+        self.assertFalse(any("testRigNamespace" in eachName for eachName in longNames))
+        self.assertTrue(lazy.dirty, "The retarget before hydrating got dropped from the journal!")
+
+    def test_saveOverTheLoadedFile(self):
+        for ext in (".json", ".vrig"):
+            filepath = os.path.join(self.tempDir, "session{}".format(ext))
+            lazy, second = self._lazyValidators(ext)
+            list(lazy.iterSourceNodes())
+            lazy.removeSourceNode(next(lazy.iterSourceNodes()))
+
+            # Writing over the file hydrates the validators still reading from it first
+            vrc_parser.write(filepath, [lazy.toData()])
+            self.assertTrue(second.hydrated)
+            self.assertEqual(1, len(list(second.iterSourceNodes())))
+
+    def test_fileChangedUnderneath(self):
+        lazy, second = self._lazyValidators(".json")
+        filepath = os.path.join(self.tempDir, "session.json")
+        otherPath = os.path.join(self.tempDir, "other.json")
+        vrc_parser.write(otherPath, [self.validatorData])
+        os.remove(filepath)
+        os.rename(otherPath, filepath)
+
+        with self.assertRaises(IOError):
+            second.hydrate()
+        self.assertFalse(second.hydrated)
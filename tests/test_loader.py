@@ -0,0 +1,59 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+from PySide2 import QtCore
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import loader as vrc_loader
+from validateRig.core import parser as vrc_parser
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_Loader(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            validatorData = json.load(f)
+
+        self.filepaths = list()
+        self.names = list()
+        for x, eachExt in enumerate(vrc_parser.SUPPORTED_EXTS * 2):
+            session = list()
+            for y in range(2):
+                data = dict(validatorData)
+                data[vrconst_serialization.KEY_VALIDATOR_NAME] = "rig{}_{}".format(x, y)
+                session.append(data)
+                self.names.append(data[vrconst_serialization.KEY_VALIDATOR_NAME])
+
+            filepath = os.path.join(self.tempDir, "session{}{}".format(x, eachExt))
+            vrc_parser.write(filepath, session)
+            self.filepaths.append(filepath)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_loadFiles(self):
+        thread = QtCore.QThread.currentThread()
+        validators = vrc_loader.loadFiles(self.filepaths, workers=3, thread=thread)
+        self.assertEqual(self.names, [v.name for v in validators])
+        self.assertTrue(all(v.hydrated and v.nodeCount == 3 for v in validators))
+        self.assertTrue(all(v.thread() is thread for v in validators), "Validators weren't moved to the thread!")
+
+    def test_loadFilesLazy(self):
+        validators = vrc_loader.loadFiles(self.filepaths, workers=3, lazy=True)
+        self.assertEqual(self.names, [v.name for v in validators])
+        self.assertFalse(any(v.hydrated for v in validators))
+
+    def test_iterLoadFiles(self):
+        loaded = dict(vrc_loader.iterLoadFiles(self.filepaths, workers=2))
+        self.assertEqual(sorted(self.filepaths), sorted(loaded))
+        self.assertEqual([], vrc_loader.loadFiles([]))
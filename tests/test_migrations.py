@@ -0,0 +1,88 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import migrations as vrc_migrations
+from validateRig.core import offsetIndex as vrc_offsetIndex
+from validateRig.core import parser as vrc_parser
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_Migrations(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+        self.nodeCount = len(self.validatorData[vrconst_serialization.KEY_VALIDATOR_NODES])
+
+        # Pretend the layout moved on a version, renaming the sourceNodes' displayName
+        self.schemaVersion = vrconst_serialization.SCHEMA_VERSION
+        vrconst_serialization.SCHEMA_VERSION = self.schemaVersion + 1
+        self.migrated = list()
+
+        @vrc_migrations.registerSourceNodeMigration(self.schemaVersion)
+        def renameDisplayName(sourceNodeData):
+            self.migrated.append(sourceNodeData[vrconst_serialization.KEY_NODELONGNAME])
+            sourceNodeData[vrconst_serialization.KEY_NODEDISPLAYNAME] = "migrated"
+            return sourceNodeData
+
+        self.migration = renameDisplayName
+
+    def tearDown(self):
+        vrconst_serialization.SCHEMA_VERSION = self.schemaVersion
+        vrc_migrations._SOURCENODE_MIGRATIONS[self.schemaVersion].remove(self.migration)
+        shutil.rmtree(self.tempDir)
+
+    def test_unversionedDataIsVersionZero(self):
+        self.assertEqual(0, vrc_migrations.schemaVersion(self.validatorData))
+
+    def test_newerSchemaRaises(self):
+        self.validatorData[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION + 1
+        with self.assertRaises(ValueError):
+            vrc_validator.Validator.fromData("testRig", self.validatorData)
+
+    def test_migrateWhileHydrating(self):
+        filepath = os.path.join(self.tempDir, "old.json")
+        vrc_parser.write(filepath, self.validatorData)
+
+        header = next(vrc_parser.iterReadHeaders(filepath))
+        lazy = vrc_validator.LazyValidator.fromHeader(filepath, header)
+        self.assertEqual([], self.migrated)
+
+        # Each sourceNode is migrated right before it's hydrated, not in a pass of its own.
+        addSourceNodeFromData = lazy.addSourceNodeFromData
+
+        def checkMigrated(data, **kwargs):
+            self.assertEqual(data[vrconst_serialization.KEY_NODELONGNAME], self.migrated[-1])
+            return addSourceNodeFromData(data, **kwargs)
+
+        lazy.addSourceNodeFromData = checkMigrated
+        lazy.hydrate()
+        self.assertEqual(self.nodeCount, len(self.migrated))
+        self.assertEqual(["migrated"] * self.nodeCount, [n.displayName for n in lazy.iterSourceNodes()])
+
+        data = lazy.toData()
+        self.assertEqual(vrconst_serialization.SCHEMA_VERSION, data[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION])
+
+        # Current data skips the registry
+        vrc_validator.Validator.fromData("testRig", data)
+        self.assertEqual(self.nodeCount, len(self.migrated))
+
+    def test_migrateIndexedRead(self):
+        filepath = os.path.join(self.tempDir, "old.vrig")
+        vrc_parser.write(filepath, self.validatorData)
+        longName = self.validatorData[vrconst_serialization.KEY_VALIDATOR_NODES][0][vrconst_serialization.KEY_NODELONGNAME]
+
+        nodeData = vrc_offsetIndex.readSourceNodeData(filepath, longName)
+        self.assertEqual("migrated", nodeData[vrconst_serialization.KEY_NODEDISPLAYNAME])
@@ -0,0 +1,76 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import unittest
+import logging
+
+from validateRig.const import testData as vrc_testData
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import nodes as vrc_nodes
+from validateRig.core import nodeTable as vrc_nodeTable
+
+logger = logging.getLogger(__name__)
+
+
+class Test_NodeTable(unittest.TestCase):
+    def setUp(self):
+        self.sourceNodeName = vrc_testData.SRC_NODENAME
+        self.sourceNode = vrc_nodes.SourceNode(name=self.sourceNodeName, longName=self.sourceNodeName)
+
+        self.connectionValidityNode = vrc_nodes.ConnectionValidityNode(
+            name=vrc_testData.VALIDITY_NODENAME, longName=vrc_testData.VALIDITY_NODENAME
+        )
+        self.connectionValidityNode.connectionData = {"srcData": {}, "destData": {}}
+
+        self.defaultValueNode = vrc_nodes.DefaultValueNode(
+            name=vrc_testData.DEFAULT_NODENAME, longName=vrc_testData.DEFAULT_NODENAME
+        )
+        self.defaultValueNode.defaultValueData = {vrc_testData.DEFAULT_NODENAME: vrc_testData.DEFAULT_NODEVALUE}
+
+        self.sourceNode.addChildren([self.connectionValidityNode, self.defaultValueNode])
+        self.columnarSourceNode = vrc_nodeTable.ColumnarSourceNode.fromData(self.sourceNode.toData())
+
+    def test_toDataMatchesSourceNode(self):
+        self.assertEqual(
+            self.sourceNode.toData(),
+            self.columnarSourceNode.toData(),
+            "ColumnarSourceNode.toData() does not match SourceNode.toData()!",
+        )
+
+    def test_rowViews(self):
+        children = list(self.columnarSourceNode.iterChildren())
+        self.assertEqual(2, len(children))
+        self.assertIsInstance(children[0], vrc_nodes.ConnectionValidityNode)
+        self.assertIsInstance(children[1], vrc_nodes.DefaultValueNode)
+        self.assertEqual(children[1].defaultValueData, self.defaultValueNode.defaultValueData)
+        self.assertEqual(children[1].parent, self.columnarSourceNode)
+
+        children[1].status = vrconst_constants.NODE_VALIDATION_FAILED
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, list(self.columnarSourceNode.iterChildren())[1].status)
+
+    def test_resetStatusAndFailedCount(self):
+        self.columnarSourceNode.resetStatus(vrconst_constants.NODE_VALIDATION_MISSINGSRC)
+        self.assertEqual(2, self.columnarSourceNode.failedCount())
+
+        self.columnarSourceNode.resetStatus(vrconst_constants.NODE_VALIDATION_PASSED)
+        self.assertEqual(0, self.columnarSourceNode.failedCount())
+
+    def test_removeChild(self):
+        defaultValueRow = list(self.columnarSourceNode.iterChildren())[1]
+        self.columnarSourceNode.removeChild(defaultValueRow)
+        self.columnarSourceNode.resetStatus(vrconst_constants.NODE_VALIDATION_FAILED)
+
+        self.assertEqual(1, len(self.columnarSourceNode.children))
+        self.assertEqual(1, self.columnarSourceNode.failedCount())
+        self.assertEqual(
+            [vrconst_serialization.NT_CONNECTIONVALIDITY],
+            [n[vrconst_serialization.KEY_NODETYPE] for n in self.columnarSourceNode.toData()[vrconst_serialization.KEY_VAILIDITYNODES]],
+        )
+
+        self.columnarSourceNode.table.compact()
+        self.assertEqual(1, len(self.columnarSourceNode.table))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    runner = unittest.TextTestRunner()
+    runner.run(unittest.TestSuite())
@@ -129,6 +129,18 @@ class Test_Nodes(unittest.TestCase):
             "baseNode.nameSpace is not %s" % self.nodeNameSpace,
         )
 
+    def test_node_hasNoInstanceDict(self):
+        for node in (self.baseNode, self.sourceNode, self.connectionValidityNode, self.defaultValueNode):
+            self.assertFalse(hasattr(node, "__dict__"), "%s has a per instance __dict__!" % type(node))
+
+        with self.assertRaises(AttributeError):
+            self.baseNode.data = dict()
+
+    def test_sourceNode_validityNodesParent(self):
+        dvNode = vrc_nodes.DefaultValueNode(name=self.defaultValueNodeName, longName=self.defaultValueNodeName)
+        srcNode = vrc_nodes.SourceNode(name=self.sourceNodeName, longName=self.sourceNodeName, validityNodes=[dvNode])
+        self.assertEqual(dvNode.parent, srcNode, "validityNodes passed to SourceNode are not parented!")
+
     def test_node_parent(self):
         self.assertEqual(
             self.defaultValueNode.parent,
@@ -151,6 +163,56 @@ class Test_Nodes(unittest.TestCase):
             currentDescendants, descendants, "iterDescendants doesn't match!"
         )
 
+    def test_sourceNode_iterDescendantsByType(self):
+        self.assertEqual(
+            [self.defaultValueNode],
+            list(self.sourceNode.iterDescendants(vrconst_serialization.NT_DEFAULTVALUE)),
+            "iterDescendants(NT_DEFAULTVALUE) doesn't match!",
+        )
+        self.assertEqual(
+            [self.connectionValidityNode],
+            list(self.sourceNode.iterDescendants(vrconst_serialization.NT_CONNECTIONVALIDITY)),
+            "iterDescendants(NT_CONNECTIONVALIDITY) doesn't match!",
+        )
+
+    def test_node_iterDescendantsFullDepth(self):
+        # Deeper than the maximum recursion depth, so a recursive walk would fail here.
+        depth = 2000
+        parent = self.baseNode
+        expected = list()
+        for x in range(depth):
+            child = vrc_nodes.Node(name="child{}".format(x), longName="child{}".format(x))
+            parent.addChild(child)
+            expected.append(child)
+            parent = child
+
+        self.assertEqual(expected, list(self.baseNode.iterDescendants()), "iterDescendants stopped short!")
+        self.assertEqual(
+            depth,
+            len(list(self.baseNode.iterDescendants(vrconst_serialization.NT_VALIDATIONNODE))),
+            "iterDescendants(NT_VALIDATIONNODE) stopped short!",
+        )
+
+    def test_node_removeChildUpdatesTypeBucket(self):
+        self.sourceNode.removeChild(self.defaultValueNode)
+        self.assertEqual([], list(self.sourceNode.iterChildren(vrconst_serialization.NT_DEFAULTVALUE)))
+        self.assertIsNone(self.defaultValueNode.parent)
+
+    def test_node_addChildIgnoresDuplicates(self):
+        self.sourceNode.addChildren([self.defaultValueNode, self.connectionValidityNode])
+        self.assertEqual(
+            [self.connectionValidityNode, self.defaultValueNode],
+            self.sourceNode.children,
+            "addChildren duplicated or reordered existing children!",
+        )
+
+    def test_node_removeChildren(self):
+        newNode = vrc_nodes.DefaultValueNode(name="newNode", longName="newNode")
+        self.sourceNode.addChildren([newNode], unique=True)
+        self.sourceNode.removeChildren([self.connectionValidityNode, newNode])
+        self.assertEqual([self.defaultValueNode], self.sourceNode.children, "removeChildren failed!")
+        self.assertIsNone(newNode.parent)
+
     def test_sourceNode_iterChildren(self):
         nodes = [n for n in self.sourceNode.iterChildren()]
 
@@ -184,6 +246,23 @@ class Test_Nodes(unittest.TestCase):
         )
 
     ## CONNECTION NODE SPECIFIC
+    def test_sourceNode_toDataIsCached(self):
+        data = self.sourceNode.toData()
+        self.assertIs(data, self.sourceNode.toData(), "Unchanged sourceNode rebuilt its data!")
+
+        self.defaultValueNode.defaultValueData = {self.defaultValueNodeName: self.defaultValueNodeValue}
+        newData = self.sourceNode.toData()
+        self.assertIsNot(data, newData, "Changed validityNode didn't invalidate its sourceNode's data!")
+        self.assertEqual(
+            {self.defaultValueNodeName: self.defaultValueNodeValue},
+            newData[vrconst_serialization.KEY_VAILIDITYNODES][1][vrconst_serialization.KEY_DEFAULTVALUEDATA],
+        )
+        self.assertIs(
+            newData[vrconst_serialization.KEY_VAILIDITYNODES][0],
+            data[vrconst_serialization.KEY_VAILIDITYNODES][0],
+            "Unchanged validityNode rebuilt its data!",
+        )
+
     def test_connectionValidityNode_name(self):
         self.assertEqual(
             self.connectionValidityNodeName,
@@ -0,0 +1,93 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import binaryCodec as vrc_binaryCodec
+from validateRig.core import offsetIndex as vrc_offsetIndex
+from validateRig.core import parser as vrc_parser
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_OffsetIndex(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+
+        secondValidator = dict(self.validatorData)
+        secondValidator[vrconst_serialization.KEY_VALIDATOR_NAME] = "second"
+        secondValidator[vrconst_serialization.KEY_VALIDATOR_NODES] = list(
+            reversed(self.validatorData[vrconst_serialization.KEY_VALIDATOR_NODES])
+        )
+        self.session = [self.validatorData, secondValidator]
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_readSourceNode(self):
+        for eachExt in vrc_parser.SUPPORTED_EXTS:
+            filepath = os.path.join(self.tempDir, "session{}".format(eachExt))
+            vrc_parser.write(filepath, self.session)
+            indexPath = vrc_offsetIndex.writeIndex(filepath)
+            self.assertTrue(os.path.isfile(indexPath))
+
+            for eachValidator in self.session:
+                validatorName = eachValidator[vrconst_serialization.KEY_VALIDATOR_NAME]
+                for eachNodeData in eachValidator[vrconst_serialization.KEY_VALIDATOR_NODES]:
+                    longName = eachNodeData[vrconst_serialization.KEY_NODELONGNAME]
+                    self.assertEqual(
+                        eachNodeData,
+                        vrc_offsetIndex.readSourceNodeData(filepath, longName, validatorName=validatorName),
+                        eachExt,
+                    )
+
+            self.assertIsNone(vrc_offsetIndex.readSourceNodeData(filepath, "|notInTheFile"))
+
+    def test_staleIndex(self):
+        filepath = os.path.join(self.tempDir, "session.json")
+        vrc_parser.write(filepath, self.session)
+        vrc_offsetIndex.writeIndex(filepath)
+        self.assertIsNotNone(vrc_offsetIndex.readIndex(filepath))
+
+        # Resaving with other data invalidates the index, reading rebuilds it.
+        vrc_parser.write(filepath, self.session[1:], sortKeys=False)
+        os.utime(filepath, (0, 0))
+        self.assertIsNone(vrc_offsetIndex.readIndex(filepath))
+
+        nodeData = self.session[1][vrconst_serialization.KEY_VALIDATOR_NODES][0]
+        longName = nodeData[vrconst_serialization.KEY_NODELONGNAME]
+        self.assertEqual(nodeData, vrc_offsetIndex.readSourceNodeData(filepath, longName))
+        self.assertIsNotNone(vrc_offsetIndex.readIndex(filepath))
+
+    def test_binaryStringOffsets(self):
+        # Enough unique longNames for the nodes' strings to sit past several string table offsets
+        nodes = self.validatorData[vrconst_serialization.KEY_VALIDATOR_NODES]
+        manyNodes = list()
+        for x in range(vrc_binaryCodec.STRING_STRIDE * 3):
+            nodeData = dict(nodes[x % len(nodes)])
+            nodeData[vrconst_serialization.KEY_NODELONGNAME] = "|root|node{}".format(x)
+            manyNodes.append(nodeData)
+        validatorData = dict(self.validatorData)
+        validatorData[vrconst_serialization.KEY_VALIDATOR_NODES] = manyNodes
+
+        for eachExt in (vrconst_constants.BINARY_EXT, vrconst_constants.BINARY_EXT + vrconst_constants.GZIP_EXT):
+            filepath = os.path.join(self.tempDir, "many{}".format(eachExt))
+            vrc_parser.write(filepath, validatorData)
+            index = vrc_offsetIndex.buildIndex(filepath)
+            self.assertTrue(len(index[vrc_offsetIndex.KEY_STRINGOFFSETS]) > 3, eachExt)
+            vrc_offsetIndex.writeIndex(filepath, index)
+
+            for eachNodeData in reversed(manyNodes):
+                longName = eachNodeData[vrconst_serialization.KEY_NODELONGNAME]
+                self.assertEqual(eachNodeData, vrc_offsetIndex.readSourceNodeData(filepath, longName), eachExt)
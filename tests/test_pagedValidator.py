@@ -0,0 +1,127 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import gc
+import weakref
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import validator as vrc_validator
+from validateRig.core.nodes import SourceNode, DefaultValueNode
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_PagedValidator(unittest.TestCase):
+    def setUp(self):
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+
+        self.expected = vrc_validator.Validator.fromData("testRig", self.validatorData)
+        self.validator = vrc_validator.PagedValidator.fromData("testRig", self.validatorData, cacheSize=1)
+        self.longNames = [n.longName for n in self.expected.iterSourceNodes()]
+
+    def tearDown(self):
+        self.validator.close()
+
+    def test_fromData(self):
+        self.assertEqual(3, self.validator.nodeCount)
+        self.assertFalse(self.validator.dirty)
+        self.assertEqual([], list(self.validator.iterDirtySourceNodes()))
+        self.assertEqual(self.expected.toData(), self.validator.toData())
+        self.assertEqual(self.longNames, [n.longName for n in self.validator.iterSourceNodes()])
+        self.assertTrue(self.validator.sourceNodeLongNameExists(self.longNames[1]))
+
+    def test_evictedChangesAreWrittenBack(self):
+        sourceNode = self.validator.findSourceNodeByLongName(self.longNames[0])
+        sourceNode.status = vrconst_constants.NODE_VALIDATION_FAILED
+        next(sourceNode.iterChildren()).defaultValueData = {"translate": [1.0, 0.0, 0.0]}
+        self.assertEqual([sourceNode], list(self.validator.iterDirtySourceNodes()))
+        self.validator.markClean()
+        del sourceNode
+        gc.collect()
+
+        # Only the last sourceNode is still hydrated, the first is read back from its page
+        self.assertEqual(3, len(list(self.validator.iterSourceNodes())))
+        sourceNode = self.validator.findSourceNodeByLongName(self.longNames[0])
+        self.assertFalse(sourceNode.dirty)
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, sourceNode.status)
+        self.assertEqual({"translate": [1.0, 0.0, 0.0]}, next(sourceNode.iterChildren()).defaultValueData)
+
+    def test_journalReleasesEvictedChanges(self):
+        sourceNode = self.validator.findSourceNodeByLongName(self.longNames[0])
+        next(sourceNode.iterChildren()).defaultValueData = {"translate": [1.0, 0.0, 0.0]}
+        ref = weakref.ref(sourceNode)
+        del sourceNode
+        list(self.validator.iterSourceNodes())
+        gc.collect()
+        self.assertIsNone(ref(), "The journal kept an evicted sourceNode alive!")
+
+        self.assertTrue(self.validator.dirty)
+        changed = self.validator.changedSourceNodes()
+        self.assertEqual([self.longNames[0]], [n.longName for n in changed])
+        self.assertEqual([self.longNames[0]], [n.longName for n in self.validator.iterDirtySourceNodes()])
+        self.assertEqual({"translate": [1.0, 0.0, 0.0]}, next(changed[0].iterChildren()).defaultValueData)
+
+        self.validator.markClean()
+        self.assertFalse(self.validator.dirty)
+        self.assertEqual([], list(self.validator.iterDirtySourceNodes()))
+
+    def test_liveSourceNodesKeepTheirIdentity(self):
+        sourceNode = self.validator.findSourceNodeByLongName(self.longNames[0])
+        list(self.validator.iterSourceNodes())
+        self.assertIs(sourceNode, self.validator.findSourceNodeByLongName(self.longNames[0]))
+        self.assertTrue(self.validator.removeSourceNode(sourceNode))
+        self.assertFalse(self.validator.sourceNodeLongNameExists(self.longNames[0]))
+        self.assertEqual(self.longNames[1:], [n.longName for n in self.validator.iterSourceNodes()])
+
+    def test_addReplace(self):
+        newNode = SourceNode(name="newNode", longName="|newNode")
+        newNode.addChild(DefaultValueNode(name="visibility", longName="|newNode"))
+        self.assertTrue(self.validator.addSourceNode(newNode))
+        self.assertRaises(IndexError, self.validator.addSourceNode, SourceNode(name="newNode", longName="|newNode"))
+
+        replacement = SourceNode.fromData(self.validatorData[vrconst_serialization.KEY_VALIDATOR_NODES][0])
+        self.assertTrue(self.validator.addSourceNode(replacement, force=True))
+        self.expected.addSourceNode(SourceNode.fromData(newNode.toData()))
+        self.assertEqual(self.longNames + ["|newNode"], [n.longName for n in self.validator.iterSourceNodes()])
+        self.assertEqual(self.expected.toData(), self.validator.toData())
+        self.assertTrue(self.validator.dirty)
+
+    def test_renameSourceNode(self):
+        sourceNode = self.validator.findSourceNodeByLongName(self.longNames[0])
+        sourceNode.longName = "|renamed"
+        self.assertRaises(IndexError, setattr, sourceNode, "longName", self.longNames[1])
+
+        self.assertIs(sourceNode, self.validator.findSourceNodeByLongName("|renamed"))
+        self.assertFalse(self.validator.sourceNodeLongNameExists(self.longNames[0]))
+        self.validator.flush()
+        del sourceNode
+        self.assertEqual(["|renamed"] + self.longNames[1:], [n.longName for n in self.validator.iterSourceNodes()])
+
+    def test_nameSpaceRetarget(self):
+        sourceNode = self.validator.findSourceNodeByLongName(self.longNames[0])
+        for eachValidator in (self.validator, self.expected):
+            eachValidator.nameSpace = "otherNamespace"
+            eachValidator.updateNameSpaceInLongName("testRigNamespace")
+
+        self.assertEqual(self.expected.toData(), self.validator.toData())
+        self.assertIs(sourceNode, self.validator.findSourceNodeByLongName(sourceNode.longName))
+        self.assertTrue(sourceNode.longName.endswith("otherNamespace:bodyIsh_ctrl"))
+
+    def test_hydratingRetargetedPagesKeepsResolvedNames(self):
+        self.validator.nameSpace = "otherNamespace"
+        self.validator.updateNameSpaceInLongName("testRigNamespace")
+        context = self.validator.nameSpaceContext
+        version, generation = context.version, context.generation
+
+        # cacheSize=1, every sourceNode is hydrated from a page saved under the previous namespace
+        longNames = [n.longName for n in self.validator.iterSourceNodes()]
+        self.assertEqual((version, generation), (context.version, context.generation))
+        self.assertTrue(all(":" not in n or "otherNamespace:" in n for n in longNames))
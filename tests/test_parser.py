@@ -1,5 +1,8 @@
 #  Copyright (c) 2019.  James Dunlop
 
+import os
+import shutil
+import tempfile
 import unittest
 import logging
 from validateRig.core import parser as vrc_parser
@@ -12,8 +15,10 @@ class Test_Parser(unittest.TestCase):
         self.filepath = "C:/Temp/testOut.json"
         self.testOutData = {"testOut": "testVarOut"}
 
+        self.tempDir = tempfile.mkdtemp()
+
     def tearDown(self):
-        pass
+        shutil.rmtree(self.tempDir)
 
     def test_readwriteFile(self):
         self.assertTrue(vrc_parser.write(self.filepath, self.testOutData))
@@ -21,6 +26,29 @@ class Test_Parser(unittest.TestCase):
             vrc_parser.read(self.filepath), self.testOutData, "out data is not the same!"
         )
 
+    def test_streamedWrite(self):
+        filepath = os.path.join(self.tempDir, "streamed.json")
+        data = {"validators": ({"name": "v%s" % i, "nodes": list(range(i))} for i in range(5))}
+        self.assertTrue(vrc_parser.write(filepath, data, sortKeys=False))
+        self.assertEqual(
+            {"validators": [{"name": "v%s" % i, "nodes": list(range(i))} for i in range(5)]},
+            vrc_parser.read(filepath),
+        )
+
+    def test_failedWriteKeepsPreviousFile(self):
+        filepath = os.path.join(self.tempDir, "atomic.json")
+        vrc_parser.write(filepath, self.testOutData)
+
+        def brokenNodes():
+            yield {"fine": 1}
+            raise RuntimeError("Crashed mid save")
+
+        with self.assertRaises(RuntimeError):
+            vrc_parser.write(filepath, {"nodes": brokenNodes()})
+
+        self.assertEqual(self.testOutData, vrc_parser.read(filepath))
+        self.assertEqual(["atomic.json"], os.listdir(self.tempDir), "The temp file wasn't cleaned up!")
+
 
 if __name__ == "__main__":  # pragma: no cover
     runner = unittest.TextTestRunner()
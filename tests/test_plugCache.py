@@ -0,0 +1,62 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import unittest
+import logging
+
+from validateRig.core import plugCache as vrc_plugCache
+
+logger = logging.getLogger(__name__)
+
+
+class Test_PlugCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = vrc_plugCache.PlugCache(maxSize=3)
+
+    def test_hitsAndMisses(self):
+        self.assertIsNone(self.cache.get("|grp|ctrl", ("translate",)))
+        self.cache.put("|grp|ctrl", ("translate",), "plug")
+        self.assertEqual("plug", self.cache.get("|grp|ctrl", ("translate",)))
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1, "maxSize": 3}, self.cache.stats())
+
+        self.cache.resetStats()
+        self.assertEqual((0, 0), (self.cache.hits, self.cache.misses))
+
+    def test_leastRecentlyUsedEvicted(self):
+        for eachAttr in ("tx", "ty", "tz"):
+            self.cache.put("|ctrl", (eachAttr,), eachAttr)
+        self.cache.get("|ctrl", ("tx",))
+        self.cache.put("|ctrl", ("rx",), "rx")
+
+        self.assertEqual(3, len(self.cache))
+        self.assertNotIn(("|ctrl", ("ty",)), self.cache)
+        self.assertIn(("|ctrl", ("tx",)), self.cache)
+
+        # Evicting every plug of a node forgets the node
+        self.cache.put("|other", ("tx",), "tx")
+        self.cache.put("|other", ("ty",), "ty")
+        self.cache.put("|other", ("tz",), "tz")
+        self.assertEqual(0, self.cache.invalidateNode("|ctrl"))
+        self.assertEqual(0, self.cache.invalidateName("ctrl"))
+
+    def test_invalidateNode(self):
+        self.cache.put("|ctrl", ("tx",), "tx")
+        self.cache.put("|ctrl", ("cvs", "[0]"), "cv")
+        self.cache.put("|other", ("tx",), "tx")
+        self.assertEqual(2, self.cache.invalidateNode("|ctrl"))
+        self.assertEqual(1, len(self.cache))
+        self.assertIsNone(self.cache.get("|ctrl", ("tx",)))
+
+    def test_invalidateNameDropsDescendants(self):
+        self.cache.put("|grp|ns:ctrl", ("tx",), "tx")
+        self.cache.put("|grp|ns:ctrl|ns:child", ("tx",), "tx")
+        self.cache.put(":ns:curve", ("cvs", "[0]"), "cv")
+
+        self.assertEqual(2, self.cache.invalidateName("ns:ctrl"))
+        self.assertEqual(1, self.cache.invalidateName("ns:curve"))
+        self.assertEqual(0, len(self.cache))
+
+    def test_clear(self):
+        self.cache.put("|ctrl", ("tx",), "tx")
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.invalidateName("ctrl"))
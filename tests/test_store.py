@@ -0,0 +1,71 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+import simplejson as json
+
+from validateRig.const import serialization as vrconst_serialization
+from validateRig.core import cache as vrc_cache
+from validateRig.core import parser as vrc_parser
+from validateRig.core import store as vrc_store
+
+logger = logging.getLogger(__name__)
+
+TESTVALIDATOR_PATH = os.path.join(os.path.dirname(__file__), "testValidator.json")
+
+
+class Test_Store(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        vrc_cache.setCacheDir(os.path.join(self.tempDir, "cache"))
+        with open(TESTVALIDATOR_PATH, "r") as f:
+            self.validatorData = json.load(f)
+        self.validatorData[vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION] = vrconst_serialization.SCHEMA_VERSION
+
+        self.filepath = os.path.join(self.tempDir, "session.json")
+        secondData = dict(self.validatorData)
+        secondData[vrconst_serialization.KEY_VALIDATOR_NAME] = "secondRig"
+        secondData[vrconst_serialization.KEY_VALIDATORNAMESPACE] = "secondNamespace"
+        vrc_parser.write(self.filepath, [self.validatorData, secondData])
+
+        self.store = vrc_store.ValidatorStore(os.path.join(self.tempDir, "validators.db"))
+        self.validatorIds = self.store.importFile(self.filepath)
+
+    def tearDown(self):
+        self.store.close()
+        vrc_cache.setCacheDir(None)
+        shutil.rmtree(self.tempDir)
+
+    def test_exportData(self):
+        self.assertEqual(self.validatorData, self.store.exportData(self.validatorIds[0]))
+
+    def test_reimportReplaces(self):
+        self.store.importFile(self.filepath)
+        validators = list(self.store.iterValidators())
+        self.assertEqual(["secondRig", "testRig"], [row[1] for row in validators])
+        self.assertEqual(1, len(list(self.store.iterValidators(name="testRig"))))
+
+    def test_query(self):
+        rows = self.store.query(validatorName="testRig", attrName="rotateOrder", longName="*_ctrl")
+        self.assertEqual(
+            ["bodyIsh_ctrl", "body_ctrl", "master_ctrl"], [row[3].rsplit(":", 1)[-1] for row in rows]
+        )
+        self.assertEqual(2, len(self.store.query(attrName="rotateOrder", name="body*", nameSpace="testRigNamespace")))
+
+        sourceNodes = self.store.querySourceNodes(
+            nameSpace="second*", nodeType=vrconst_serialization.NT_CONNECTIONVALIDITY
+        )
+        self.assertEqual(["body_ctrl", "master_ctrl"], [n.name for n in sourceNodes])
+        expected = self.validatorData[vrconst_serialization.KEY_VALIDATOR_NODES][2]
+        self.assertEqual(expected, sourceNodes[1].toData())
+
+        self.assertEqual([], self.store.querySourceNodes(attrName="noSuchAttr"))
+
+    def test_removeValidator(self):
+        self.store.removeValidator(self.validatorIds[0])
+        self.assertEqual([], self.store.query(validatorName="testRig"))
+        self.assertEqual(3, len(self.store.query(validatorName="secondRig")))
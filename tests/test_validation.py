@@ -0,0 +1,231 @@
+#  Copyright (c) 2020.  James Dunlop
+
+import unittest
+import logging
+
+from validateRig.const import constants as vrconst_constants
+from validateRig.core import factory as vrc_factory
+from validateRig.core import fakeScene as vrc_fakeScene
+from validateRig.core import validation as vrc_validation
+from validateRig.core import validator as vrc_validator
+
+logger = logging.getLogger(__name__)
+
+MASTER = "|rig|master_ctrl"
+BODY = "|rig|master_ctrl|body_ctrl"
+CURVE = ":hermiteCrv1"
+
+
+def _defaultValueData(longName, attrName, value):
+    return {"nN": attrName, "nLN": longName, "nDN": attrName, "nT": 30, "dvD": {attrName: value}}
+
+
+def _connectionData(srcLongName, srcAttrName, srcValue, srcPlugData, destLongName, destValue, destPlugData):
+    return {
+        "nN": destLongName.split("|")[-1],
+        "nLN": destLongName,
+        "nDN": destLongName.split("|")[-1],
+        "nT": 20,
+        "cND": {
+            "srcData": {
+                "attrName": srcAttrName,
+                "attrValue": srcValue,
+                "nodeLongName": srcLongName,
+                "plugData": srcPlugData,
+            },
+            "destData": {"attrValue": destValue, "nodeLongName": destLongName, "plugData": destPlugData},
+        },
+    }
+
+
+VALIDATOR_DATA = {
+    "vN": "testRig",
+    "vNS": "",
+    "vNodes": [
+        {
+            "nN": "master_ctrl",
+            "nLN": MASTER,
+            "nDN": "master_ctrl",
+            "nT": 10,
+            "vdn": [
+                _defaultValueData(MASTER, "rotateOrder", 0),
+                _connectionData(
+                    MASTER, "translate", [0.0, 0.0, 0.0], [[False, False, "translate", None]],
+                    BODY, [0.0, 0.0, 0.0], [[False, False, "translate", None]],
+                ),
+                _connectionData(
+                    MASTER, "translateX", 0.0, [[False, True, "translateX", 0], [False, False, "translate", None]],
+                    CURVE, 0.0, [[False, True, "inTangentWeight", 0], [True, False, "cvs", 0]],
+                ),
+                _connectionData(
+                    MASTER, "worldMatrix", None, [[True, False, "worldMatrix", 0]],
+                    CURVE, None, [[False, False, "worldMtx", None]],
+                ),
+            ],
+        },
+        {
+            "nN": "body_ctrl",
+            "nLN": BODY,
+            "nDN": "body_ctrl",
+            "nT": 10,
+            "vdn": [_defaultValueData(BODY, "visibility", True)],
+        },
+    ],
+}
+
+
+class CountingBackend(vrc_fakeScene.FakeBackend):
+    def __init__(self, scene):
+        super(CountingBackend, self).__init__(scene)
+        self.existsCalls = list()
+
+    def exists(self, nodeLongName):
+        self.existsCalls.append(nodeLongName)
+        return super(CountingBackend, self).exists(nodeLongName)
+
+
+class Test_Validation(unittest.TestCase):
+    def setUp(self):
+        self.scene = vrc_fakeScene.FakeScene.fromValidatorData(VALIDATOR_DATA)
+        self.backend = vrc_fakeScene.FakeBackend(self.scene)
+        self.validator = vrc_validator.Validator.fromData("testRig", VALIDATOR_DATA)
+
+    def validate(self):
+        vrc_validation.validateValidatorSourceNodes(self.validator, backend=self.backend)
+
+    def statuses(self):
+        return [
+            [eachChild.status for eachChild in eachSourceNode.iterChildren()]
+            for eachSourceNode in self.validator.iterSourceNodes()
+        ]
+
+    def test_plugPath(self):
+        self.assertEqual(("translate",), vrc_fakeScene.plugPath([[False, False, "translate", None]]))
+        self.assertEqual(
+            ("cvs", "[0]", ".0"),
+            vrc_fakeScene.plugPath([[False, True, "inTangentWeight", 0], [True, False, "cvs", 0]]),
+        )
+
+    def test_validatePassed(self):
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, self.validator.status)
+        passed = vrconst_constants.NODE_VALIDATION_PASSED
+        self.assertEqual([[passed] * 4, [passed]], self.statuses())
+
+    def test_validateChangedValue(self):
+        self.scene.setValue(self.scene.plug(MASTER, ("rotateOrder",)), 3)
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, self.validator.status)
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, self.statuses()[0][0])
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, self.statuses()[1][0])
+
+    def test_validateBrokenConnection(self):
+        self.scene.disconnect(self.scene.plug(CURVE, ("cvs", "[0]", ".0")))
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, self.validator.status)
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, self.statuses()[0][2])
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, self.statuses()[0][3])
+
+    def test_validateMissingNodes(self):
+        self.scene.removeNode(BODY)
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_MISSINGSRC, self.validator.status)
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_MISSINGDEST, self.statuses()[0][1])
+        self.assertEqual([vrconst_constants.NODE_VALIDATION_MISSINGSRC], self.statuses()[1])
+
+    def test_repair(self):
+        self.scene.setValue(self.scene.plug(MASTER, ("rotateOrder",)), 3)
+        self.scene.setValue(self.scene.plug(BODY, ("visibility",)), False)
+        self.scene.disconnect(self.scene.plug(CURVE, ("cvs", "[0]", ".0")))
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, self.validator.status)
+
+        vrc_validation.repairValidatorSourceNodes(self.validator, backend=self.backend)
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, self.validator.status)
+        self.assertEqual(0, self.scene.plug(MASTER, ("rotateOrder",)).value)
+        self.assertIs(
+            self.scene.plug(MASTER, ("translate", ".0")), self.scene.plug(CURVE, ("cvs", "[0]", ".0")).source
+        )
+
+    def test_nodesResolvedOncePerRun(self):
+        backend = CountingBackend(self.scene)
+        vrc_validation.validateValidatorSourceNodes(self.validator, backend=backend)
+        self.assertEqual(sorted([MASTER, BODY, CURVE]), sorted(backend.existsCalls))
+
+        self.scene.removeNode(CURVE)
+        del backend.existsCalls[:]
+        vrc_validation.repairValidatorSourceNodes(self.validator, backend=backend)
+        self.assertEqual(sorted([MASTER, BODY, CURVE]), sorted(backend.existsCalls))
+
+    def test_plugsCachedBetweenRuns(self):
+        self.validate()
+        misses = self.backend.plugCache.misses
+        self.assertEqual(0, self.backend.plugCache.hits)
+
+        self.backend.plugCache.resetStats()
+        self.validate()
+        self.assertEqual(misses, self.backend.plugCache.hits)
+        self.assertEqual(0, self.backend.plugCache.misses)
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, self.validator.status)
+
+    def test_plugCacheInvalidatedBySceneChanges(self):
+        self.validate()
+        self.scene.removeNode(CURVE)
+        self.assertNotIn((CURVE, ("cvs", "[0]", ".0")), self.backend.plugCache)
+        self.assertNotIn((CURVE, ("worldMtx",)), self.backend.plugCache)
+
+        # A node coming back under the same name is resolved again, not served from the cache
+        self.scene.addPlug(CURVE, ("cvs", "[0]", ".0"), 0.0)
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, self.statuses()[0][2])
+        self.scene.connect(self.scene.plug(MASTER, ("translate", ".0")), self.scene.plug(CURVE, ("cvs", "[0]", ".0")))
+        self.scene.addPlug(CURVE, ("worldMtx",))
+        self.scene.connect(self.scene.plug(MASTER, ("worldMatrix", "[0]")), self.scene.plug(CURVE, ("worldMtx",)))
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, self.validator.status)
+
+    def test_renamedNodesAreMissing(self):
+        self.validate()
+        self.scene.renameNode("|rig|master_ctrl", "|rig|root_ctrl")
+        # body_ctrl is renamed along with its parent, only the curve's plugs are left
+        self.assertEqual([CURVE, CURVE], [eachLongName for eachLongName, _ in self.backend.plugCache._plugs])
+
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_MISSINGSRC, self.validator.status)
+        self.assertEqual(
+            [vrconst_constants.NODE_VALIDATION_MISSINGSRC], list(set(self.statuses()[0] + self.statuses()[1]))
+        )
+
+        self.scene.renameNode("|rig|root_ctrl", "|rig|master_ctrl")
+        self.validate()
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, self.validator.status)
+
+    def test_renameNameSpace(self):
+        scene = vrc_fakeScene.FakeScene()
+        scene.addPlug("|grp|ns:ctrl", ("tx",), 0.0)
+        scene.addPlug(":ns:curve", ("tx",), 0.0)
+        scene.addPlug("|other:ctrl", ("tx",), 0.0)
+        backend = vrc_fakeScene.FakeBackend(scene)
+        for eachLongName in scene.iterNodes():
+            backend.resolvePlug(eachLongName, eachLongName, "tx")
+
+        scene.renameNameSpace("ns", "newNs")
+        self.assertEqual([":newNs:curve", "|grp|newNs:ctrl", "|other:ctrl"], sorted(scene.iterNodes()))
+        self.assertEqual(1, len(backend.plugCache))
+        self.assertEqual("|grp|newNs:ctrl.tx", scene.plug("|grp|newNs:ctrl", ("tx",)).name())
+
+    def test_noBackend(self):
+        with self.assertRaises(RuntimeError):
+            vrc_validation.validateValidatorSourceNodes(self.validator)
+
+    def test_factoryBackend(self):
+        validator = vrc_factory.createValidator("testRig", data=VALIDATOR_DATA, backend=self.backend)
+        self.scene.setValue(self.scene.plug(MASTER, ("rotateOrder",)), 3)
+        validator.validate.emit(validator)
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_FAILED, validator.status)
+
+        validator.repair.emit(validator)
+        validator.validate.emit(validator)
+        self.assertEqual(vrconst_constants.NODE_VALIDATION_PASSED, validator.status)
+        self.assertEqual(0, self.scene.plug(MASTER, ("rotateOrder",)).value)
@@ -1,5 +1,6 @@
 #  Copyright (c) 2019.  James Dunlop
 
+import copy
 import unittest
 import logging
 
@@ -47,6 +48,7 @@ class Test_Validator(unittest.TestCase):
         self.validator.addSourceNode(self.sourceNode)
 
         self.expectedToData = {
+            vrconst_serialization.KEY_VALIDATOR_SCHEMAVERSION: vrconst_serialization.SCHEMA_VERSION,
             vrconst_serialization.KEY_VALIDATOR_NAME: vrc_testData.VALIDATOR_NAME,
             vrconst_serialization.KEY_VALIDATORNAMESPACE: vrc_testData.VALIDATOR_NAMESPACE,
             vrconst_serialization.KEY_VALIDATOR_NODES: [
@@ -133,6 +135,20 @@ class Test_Validator(unittest.TestCase):
             "{}:{}".format(vrc_testData.VALIDATOR_NAMESPACE, srcNode.name),
         )
 
+    def test_toggleLongNodeNamesIsLazy(self):
+        self.validator.toggleLongNodeNames(True)
+        self.assertEqual(self.connectionNodeLongName, self.connectionValidityNode.displayName)
+
+        # Retargeting the namespace is picked up by the displayNames without toggling again
+        newNamespace = "fartyblartfast"
+        currentNamspace = self.validator.nameSpace
+        self.validator.nameSpace = newNamespace
+        self.validator.updateNameSpaceInLongName(nameSpace=currentNamspace)
+        self.assertEqual(self.sourceNode.longName, self.sourceNode.displayName)
+
+        self.validator.toggleLongNodeNames(False)
+        self.assertEqual("{}:{}".format(newNamespace, self.sourceNodeName), self.sourceNode.displayName)
+
     def test_updateNameSpaceInLongName(self):
         currentNamspace = self.validator.nameSpace
         newNamespace = "fartyblartfast"
@@ -142,6 +158,68 @@ class Test_Validator(unittest.TestCase):
         result = newNamespace in srcNode.longName
         self.assertTrue(result)
 
+    def test_updateNameSpaceInLongNameRetargetsNodes(self):
+        destLongName = "|{}:destNode".format(vrc_testData.VALIDATOR_NAMESPACE)
+        self.connectionValidityNode.connectionData["destData"]["nodeLongName"] = destLongName
+        # The nodeLongName was added after the sourceNode went into the validator, re-add it so it is relativized
+        self.validator.addSourceNode(self.sourceNode, force=True)
+
+        currentNamspace = self.validator.nameSpace
+        newNamespace = "fartyblartfast"
+        self.validator.nameSpace = newNamespace
+        self.validator.updateNameSpaceInLongName(nameSpace=currentNamspace)
+
+        newSourceNodeLongName = "|{}:{}".format(newNamespace, self.sourceNodeName)
+        self.assertEqual(newSourceNodeLongName, self.sourceNode.longName)
+        self.assertEqual(
+            "|{}:{}".format(newNamespace, self.connectionNodeName), self.connectionValidityNode.longName
+        )
+        self.assertEqual(
+            "|{}:destNode".format(newNamespace),
+            self.connectionValidityNode.connectionData["destData"]["nodeLongName"],
+        )
+        self.assertIs(self.sourceNode, self.validator.findSourceNodeByLongName(newSourceNodeLongName))
+        self.assertIsNone(self.validator.findSourceNodeByLongName(self.sourceNodeLongName))
+        self.assertEqual(
+            newSourceNodeLongName,
+            self.validator.toData()[vrconst_serialization.KEY_VALIDATOR_NODES][0][vrconst_serialization.KEY_NODELONGNAME],
+        )
+
+    def test_updateNameSpaceInLongNameColumnar(self):
+        validator = vrc_validator.Validator.fromData(
+            name=vrc_testData.VALIDATOR_NAME, data=self.validator.toData(), columnar=True
+        )
+        newNamespace = "fartyblartfast"
+        validator.nameSpace = newNamespace
+        validator.updateNameSpaceInLongName(nameSpace=vrc_testData.VALIDATOR_NAMESPACE)
+
+        srcNode = list(validator.iterSourceNodes())[0]
+        self.assertEqual("|{}:{}".format(newNamespace, self.sourceNodeName), srcNode.longName)
+        self.assertEqual(
+            ["|{}:{}".format(newNamespace, self.connectionNodeName)], [n.longName for n in srcNode.iterChildren()]
+        )
+
+    def test_renameRowViewThenRetargetNameSpace(self):
+        validator = vrc_validator.Validator.fromData(
+            name=vrc_testData.VALIDATOR_NAME, data=self.validator.toData(), columnar=True
+        )
+        srcNode = list(validator.iterSourceNodes())[0]
+        validator.markClean()
+        rowView = list(srcNode.iterChildren())[0]
+        rowView.longName = "|{}:renamed".format(vrc_testData.VALIDATOR_NAMESPACE)
+        self.assertEqual([srcNode], list(validator.iterDirtySourceNodes()))
+
+        newNamespace = "fartyblartfast"
+        validator.nameSpace = newNamespace
+        validator.updateNameSpaceInLongName(nameSpace=vrc_testData.VALIDATOR_NAMESPACE)
+
+        longName = "|{}:renamed".format(newNamespace)
+        self.assertEqual(longName, list(srcNode.iterChildren())[0].longName)
+        validityData = validator.toData()[vrconst_serialization.KEY_VALIDATOR_NODES][0][
+            vrconst_serialization.KEY_VAILIDITYNODES
+        ]
+        self.assertEqual(longName, validityData[0][vrconst_serialization.KEY_NODELONGNAME])
+
     def test_addSourceNode(self):
         nodeName = "2ndSourceNode"
         srcNode = vrc_nodes.SourceNode(name=nodeName, longName=nodeName)
@@ -171,6 +249,29 @@ class Test_Validator(unittest.TestCase):
             self.validator.sourceNodeExists(srcNode), "validator.addSourceNode failed!",
         )
 
+    def test_addSourceNodeFromDataInternsNames(self):
+        nodeName = "3rdSourceNode"
+        srcNode = vrc_nodes.SourceNode(name=nodeName, longName="|" + nodeName)
+        srcNode.addChildren(
+            [
+                vrc_nodes.DefaultValueNode(name="translateX", longName="|" + nodeName),
+                vrc_nodes.DefaultValueNode(name="translateY", longName="|" + nodeName),
+            ]
+        )
+        data = copy.deepcopy(srcNode.toData())
+        # Fresh string copies, so the identity check below can only pass through the validator's stringPool
+        data[vrconst_serialization.KEY_NODELONGNAME] = "".join(["|", nodeName])
+        for eachData in data[vrconst_serialization.KEY_VAILIDITYNODES]:
+            eachData[vrconst_serialization.KEY_NODELONGNAME] = "".join(["|", nodeName])
+        self.validator.addSourceNodeFromData(data)
+
+        loaded = self.validator.findSourceNodeByLongName("|" + nodeName)
+        for eachChild in loaded.iterChildren():
+            self.assertIs(
+                loaded.longName, eachChild.longName, "validityNode longName was not interned with its sourceNode!"
+            )
+        self.assertIn(loaded.longName, self.validator.stringPool)
+
     def test_removeSourceNode(self):
         nodeName = "toRemove"
         tmpSourceNode = vrc_nodes.SourceNode(name=nodeName, longName=nodeName)
@@ -197,6 +298,48 @@ class Test_Validator(unittest.TestCase):
             "Apparent Idontexist sourceNode exists?! It should not!",
         )
 
+    def test_replaceExistingSourceNodeKeepsOrder(self):
+        tmp01 = vrc_nodes.SourceNode("Src1", "|Src1")
+        self.validator.addSourceNode(tmp01)
+        replacement = vrc_nodes.SourceNode(self.sourceNodeName, self.sourceNodeLongName)
+        self.validator.addSourceNode(replacement, force=True)
+
+        nodes = list(self.validator.iterSourceNodes())
+        self.assertEqual([replacement, tmp01], nodes, "Replaced sourceNode moved in the validator!")
+        self.assertEqual(
+            replacement,
+            self.validator.findSourceNodeByLongName(self.sourceNodeLongName),
+            "findSourceNodeByLongName did not return the replacement sourceNode!",
+        )
+
+    def test_removeSourceNodeSameLongNameDifferentNode(self):
+        srcN = vrc_nodes.SourceNode(self.sourceNodeName, self.sourceNodeLongName)
+        self.assertFalse(
+            self.validator.removeSourceNode(srcN),
+            "Removed a sourceNode that was never added to the validator!",
+        )
+        self.assertTrue(self.validator.sourceNodeLongNameExists(self.sourceNodeLongName))
+
+    def test_renameSourceNode(self):
+        tmp01 = vrc_nodes.SourceNode("Src1", "|Src1")
+        self.validator.addSourceNode(tmp01)
+        self.sourceNode.longName = "|renamed"
+
+        self.assertIs(self.sourceNode, self.validator.findSourceNodeByLongName("|renamed"))
+        self.assertFalse(self.validator.sourceNodeLongNameExists(self.sourceNodeLongName))
+        self.assertEqual([self.sourceNode, tmp01], list(self.validator.iterSourceNodes()), "Renamed sourceNode moved!")
+        self.assertTrue(self.validator.removeSourceNode(self.sourceNode))
+
+    def test_renameSourceNodeToExisting(self):
+        tmp01 = vrc_nodes.SourceNode("Src1", "|Src1")
+        self.validator.addSourceNode(tmp01)
+        with self.assertRaises(IndexError):
+            tmp01.longName = self.sourceNodeLongName
+
+        self.assertEqual("|Src1", tmp01.longName)
+        self.assertIs(tmp01, self.validator.findSourceNodeByLongName("|Src1"))
+        self.assertIs(self.sourceNode, self.validator.findSourceNodeByLongName(self.sourceNodeLongName))
+
     def test_addSourceNodes(self):
         tmp01 = vrc_nodes.SourceNode(
             "Src1", "|{}:Src1".format(vrconst_serialization.KEY_VALIDATORNAMESPACE)
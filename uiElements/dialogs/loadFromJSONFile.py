@@ -6,5 +6,5 @@ class LoadFromJSONFileDialog(QtWidgets.QFileDialog):
     def __init__(self, parent=None, *args, **kwargs):
         super(LoadFromJSONFileDialog, self).__init__(parent=parent, *args, **kwargs)
 
-        self.setNameFilter("*.json")
+        self.setNameFilter("Validators (*.json *.vrig *.json.gz *.vrig.zlib)")
         self.setViewMode(QtWidgets.QFileDialog.Detail)
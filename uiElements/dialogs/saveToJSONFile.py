@@ -6,6 +6,8 @@ class SaveJSONToFileDialog(QtWidgets.QFileDialog):
     def __init__(self, parent=None, *args, **kwargs):
         super(SaveJSONToFileDialog, self).__init__(parent=parent, *args, **kwargs)
 
-        self.setNameFilter("*.json")
+        self.setNameFilters(
+            ["JSON (*.json)", "Binary (*.vrig)", "Compressed JSON (*.json.gz)", "Compressed binary (*.vrig.zlib)"]
+        )
         self.setAcceptMode(QtWidgets.QFileDialog.AcceptSave)
         self.setViewMode(QtWidgets.QFileDialog.Detail)
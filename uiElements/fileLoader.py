@@ -0,0 +1,34 @@
+#  Copyright (c) 2020.  James Dunlop
+import logging
+from PySide2 import QtCore
+
+from validateRig.core import loader as vrc_loader
+
+logger = logging.getLogger(__name__)
+
+
+class FileLoaderSignals(QtCore.QObject):
+    # Created on the GUI thread, so emitting these from a worker queues the slots onto the GUI thread.
+    loaded = QtCore.Signal(str, object, name="loaded")  # filepath, list[Validator]
+    failed = QtCore.Signal(str, str, name="failed")  # filepath, error message
+
+
+class FileLoaderRunnable(QtCore.QRunnable):
+    """Parses and hydrates one file on a QThreadPool, the validators are moved to the GUI thread when done."""
+
+    def __init__(self, filepath, thread):
+        # type: (str, QtCore.QThread) -> None
+        super(FileLoaderRunnable, self).__init__()
+        self.filepath = filepath
+        self.thread = thread
+        self.signals = FileLoaderSignals()
+
+    def run(self):
+        try:
+            validators = vrc_loader.loadFile(self.filepath, thread=self.thread)
+        except Exception as e:
+            logger.exception("Failed to load %s" % self.filepath)
+            self.signals.failed.emit(self.filepath, str(e))
+            return
+
+        self.signals.loaded.emit(self.filepath, validators)
@@ -17,6 +17,7 @@ class TreeWidgetItem(QtWidgets.QTreeWidgetItem):
         super(TreeWidgetItem, self).__init__(*args, **kwargs)
         self._node = node
         self._reportStatus = node.status
+        self._childrenPopulated = False  # SourceNode items build their validityNode items when first expanded
 
         self.setColumnFontStyle()
 
@@ -30,20 +31,37 @@ class TreeWidgetItem(QtWidgets.QTreeWidgetItem):
     def nodeType(self):
         return self.node().nodeType
 
-    def updateDisplayName(self,):
-        columnId = vrconst_constants.SRC_NODENAME_COLUMN
-        qtRole = QTDISPLAYROLE
-        value = self.node().displayName
-        if self.nodeType() == vrc_serialization.NT_SOURCENODE:
-            self.updateColumnData(columnId, qtRole, value)
+    def childrenPopulated(self):
+        return self._childrenPopulated
 
-        if self.nodeType() == vrc_serialization.NT_CONNECTIONVALIDITY:
-            destNodeNameColId = vrconst_constants.DEST_NODENAME_COLUMN
-            self.updateColumnData(destNodeNameColId, qtRole, value)
+    def setChildrenPopulated(self, populated):
+        # type: (bool) -> None
+        self._childrenPopulated = populated
+
+    def displayNameColumn(self):
+        # type: () -> int
+        """:return: the column showing the node's displayName, None if this item doesn't show it"""
+        nodeType = self.nodeType()
+        if nodeType == vrc_serialization.NT_SOURCENODE:
+            return vrconst_constants.SRC_NODENAME_COLUMN
+
+        if nodeType == vrc_serialization.NT_CONNECTIONVALIDITY:
+            return vrconst_constants.DEST_NODENAME_COLUMN
 
-        for x in range(self.childCount()):
-            childTWI = self.child(x)
-            childTWI.updateDisplayName()
+        return None
+
+    def data(self, column, role):
+        # The displayName is read from the node when the row is painted, so toggling the validator's
+        # displayName mode doesn't need to touch every item.
+        if role == QTDISPLAYROLE and column == self.displayNameColumn():
+            return self.node().displayName
+
+        return super(TreeWidgetItem, self).data(column, role)
+
+    def updateDisplayName(self,):
+        """Tells the view the displayName changed, the value itself is read lazily in data()"""
+        if self.displayNameColumn() is not None:
+            self.emitDataChanged()
 
     def updateColumnData(self, columnId, qtRole, value):
         # type: (int, QtCore.Qt.DisplayRole, str) -> None
@@ -29,12 +29,68 @@ class ValidationTreeWidget(QtWidgets.QTreeWidget):
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.widgetUnderMouse = None
         self._validator = validator
+        self._populated = False
+        self._pendingExpandDepth = None
+        self.itemExpanded.connect(self.populateChildItems)
         # delegate = Delegate()
         # self.setItemDelegate(delegate)
 
     def validator(self):
         return self._validator
 
+    def populated(self):
+        return self._populated
+
+    def populate(self):
+        """
+        Adds an item per sourceNode of the validator, hydrating it if it's a LazyValidator. The validityNode items
+        of a sourceNode are only built when its row is first expanded, see populateChildItems.
+        """
+        if self._populated:
+            return
+
+        self._populated = True
+        for sourceNode in self.validator().iterSourceNodes():
+            item = self.__addTopLevelTreeWidgetItemFromSourceNode(sourceNode)
+            item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+            # Crashes maya
+            # cuitwi_factory.setSourceNodeItemWidgetsFromNode(
+            #     node=sourceNode, treewidget=self, twi=item
+            # )
+
+        self.resizeColumnToContents(vrconst_constants.SRC_NODENAME_COLUMN)
+        self.resizeColumnToContents(vrconst_constants.DEST_NODENAME_COLUMN)
+
+        if self._pendingExpandDepth is not None:
+            depth = self._pendingExpandDepth
+            self._pendingExpandDepth = None
+            self.expandToDepth(depth)
+
+    def populateChildItems(self, treeWidgetItem):
+        # type: (QtWidgets.QTreeWidgetItem) -> None
+        if treeWidgetItem.parent() is not None or treeWidgetItem.childrenPopulated():
+            return
+
+        ValidationTreeWidget.addValidityNodesToTreeWidgetItem(treeWidgetItem.node(), treeWidgetItem)
+
+    def populateAllChildItems(self):
+        for treeWidgetItem in self.iterTopLevelTreeWidgetItems():
+            self.populateChildItems(treeWidgetItem)
+
+    def expandAll(self):
+        # expandAll / expandToDepth don't emit itemExpanded, so build the rows up front.
+        self.populateAllChildItems()
+        super(ValidationTreeWidget, self).expandAll()
+
+    def expandToDepth(self, depth):
+        # type: (int) -> None
+        if not self._populated:
+            self._pendingExpandDepth = depth
+            return
+
+        self.populateAllChildItems()
+        super(ValidationTreeWidget, self).expandToDepth(depth)
+
     def iterTopLevelTreeWidgetItems(self):
         for x in range(self.topLevelItemCount()):
             treeWidgetItem = self.topLevelItem(x)
@@ -254,6 +310,9 @@ class ValidationTreeWidget(QtWidgets.QTreeWidget):
             #     node=eachValidityNode, treewidget=treeWidget, twi=treewidgetItem
             # )
 
+        sourceNodeTreeWItm.setChildrenPopulated(True)
+        sourceNodeTreeWItm.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.DontShowIndicatorWhenChildless)
+
 
 class Delegate(QtWidgets.QStyledItemDelegate):
     def paint(self, painter, option, qmodelidx):